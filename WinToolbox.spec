@@ -24,6 +24,9 @@ hiddenimports += collect_submodules('services')
 hiddenimports += collect_submodules('ui')
 hiddenimports += collect_submodules('utils')
 
+# 二维码识别依赖为延迟导入，需显式声明
+hiddenimports += ['cv2', 'numpy', 'PIL.Image', 'PIL.ImageFile', 'PIL.ImageTk', 'PIL.ImageGrab']
+
 # 添加 pyzbar 相关的隐藏导入
 hiddenimports += ['pyzbar', 'pyzbar.pyzbar', 'pyzbar.wrapper', 'pyzbar.locations']
 
@@ -1,35 +1,102 @@
 """应用入口"""
 
+import argparse
+import sys
 import tkinter as tk
 
 from services.settings import SettingsService
 from ui import WinToolboxApp
 from utils.admin import set_taskbar_icon
-from utils.logger import enable_console_log, logger
+from utils.profiler import startup_profiler
 
 
-def main() -> None:
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="Windows 系统工具箱")
+    parser.add_argument(
+        "--startup-trace",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="FILE",
+        help="记录启动各阶段耗时并输出 Trace Event JSON（默认写入日志目录下的 startup_trace.json）"
+    )
+    parser.add_argument(
+        "--startup-budget",
+        type=float,
+        default=None,
+        metavar="MS",
+        help="启动基准模式：首次空闲后退出，启动耗时超过 MS 毫秒时返回非零退出码（同时指定 --startup-trace 时才写追踪文件）"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
     """主函数"""
-    # 初始化日志
-    settings = SettingsService.get()
-    if settings.console_log:
-        enable_console_log()
+    args = _parse_args(argv)
+    if args.startup_trace is not None or args.startup_budget is not None:
+        startup_profiler.enable(args.startup_trace)
+
+    with startup_profiler.phase("settings"):
+        settings = SettingsService.get()
+
+    # 初始化日志（在此导入以便计入启动追踪）
+    with startup_profiler.phase("logger"):
+        from utils.logger import enable_console_log, logger
+        if settings.console_log:
+            enable_console_log()
 
     logger.info("=" * 50)
     logger.info("Windows 系统工具箱启动")
     logger.info("=" * 50)
 
     # 设置任务栏图标（必须在创建窗口前调用）
-    set_taskbar_icon()
+    with startup_profiler.phase("set_taskbar_icon"):
+        set_taskbar_icon()
+
+    with startup_profiler.phase("tk.Tk"):
+        root = tk.Tk()
 
-    root = tk.Tk()
-    WinToolboxApp(root)
+    with startup_profiler.phase("WinToolboxApp.__init__"):
+        WinToolboxApp(root)
 
     logger.info("主窗口已创建")
+
+    startup_ms: list[float] = []
+
+    def on_first_idle() -> None:
+        """首次进入空闲：写出启动追踪"""
+        startup_profiler.mark("first_idle")
+        startup_ms.append(startup_profiler.elapsed_ms())
+        path = startup_profiler.save()
+        logger.info(f"启动耗时: {startup_ms[0]:.1f} ms" + (f", 追踪文件: {path}" if path else ""))
+        if args.startup_budget is not None:
+            root.destroy()
+
+    if startup_profiler.enabled:
+        root.after_idle(on_first_idle)
+
     root.mainloop()
 
+    from services.downloads import DownloadManager
+    from services.tasks import TaskService
+    from services.watcher import WatcherService
+    DownloadManager.shutdown()
+    WatcherService.shutdown()
+    TaskService.shutdown()
+
+    if startup_profiler.enabled:
+        # 追加记录启动后打开的选项卡
+        startup_profiler.save()
+
     logger.info("应用程序退出")
 
+    if args.startup_budget is not None and startup_ms:
+        if startup_ms[0] > args.startup_budget:
+            print(f"启动耗时 {startup_ms[0]:.1f} ms 超过预算 {args.startup_budget:.1f} ms", file=sys.stderr)
+            sys.exit(1)
+        print(f"启动耗时 {startup_ms[0]:.1f} ms（预算 {args.startup_budget:.1f} ms）")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,6 @@
+"""性能基准脚本
+
+在项目根目录以模块方式运行，例如：
+
+    uv run python -m benchmarks.bench_ipconfig
+"""
@@ -0,0 +1,83 @@
+"""Sysinternals 安装状态基准：逐个 os.path.exists 与目录快照的对比
+
+给每次 stat/scandir 加上固定延迟，模拟重定向到网络位置的用户目录或虚拟文件系统。
+"""
+
+import os
+import tempfile
+import time
+from collections.abc import Callable
+
+from ui.tabs.sysinternals import SYSINTERNALS_TOOLS
+from utils.fs import DirectorySnapshot
+
+# 每次文件系统调用的附加延迟（秒）
+LATENCY = 0.001
+# 模拟的搜索框按键次数
+KEYSTROKES = 40
+
+
+class SlowFilesystem:
+    """给 os.stat 和 os.scandir 加延迟并计数"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self._stat = os.stat
+        self._scandir = os.scandir
+
+    def _wrap(self, func: Callable) -> Callable:
+        def slow(*args, **kwargs):
+            self.calls += 1
+            time.sleep(self.latency)
+            return func(*args, **kwargs)
+        return slow
+
+    def __enter__(self) -> "SlowFilesystem":
+        os.stat = self._wrap(self._stat)
+        os.scandir = self._wrap(self._scandir)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        os.stat = self._stat
+        os.scandir = self._scandir
+
+
+def measure(label: str, statuses: Callable[[], list[bool]]) -> None:
+    """模拟 KEYSTROKES 次搜索输入，每次都重新得到全部工具的安装状态"""
+    with SlowFilesystem(LATENCY) as fs:
+        start = time.perf_counter()
+        for _ in range(KEYSTROKES):
+            installed = sum(statuses())
+        elapsed = (time.perf_counter() - start) / KEYSTROKES
+    print(f"{label}: {elapsed * 1000:.2f} ms/次, {fs.calls / KEYSTROKES:.0f} 次文件系统调用/次, 已安装 {installed}")
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tools_dir:
+        for exe, _, _ in SYSINTERNALS_TOOLS[::2]:
+            open(os.path.join(tools_dir, exe), "wb").close()
+        for i in range(100):
+            open(os.path.join(tools_dir, f"other{i}.dll"), "wb").close()
+        # 避免修改时间过近导致快照每次都重新扫描
+        past = time.time() - 60
+        os.utime(tools_dir, (past, past))
+
+        print(f"{len(SYSINTERNALS_TOOLS)} 个工具, 每次 stat/scandir 附加 {LATENCY * 1000:.0f} ms, {KEYSTROKES} 次按键平均")
+        measure(
+            "逐个 os.path.exists",
+            lambda: [os.path.exists(os.path.join(tools_dir, exe)) for exe, _, _ in SYSINTERNALS_TOOLS]
+        )
+
+        snapshot = DirectorySnapshot()
+
+        def from_snapshot() -> list[bool]:
+            # 与 SysinternalsTab._filter_tools 相同：整个列表只查询一次快照
+            names = snapshot.names(tools_dir)
+            return [exe.lower() in names for exe, _, _ in SYSINTERNALS_TOOLS]
+
+        measure("目录快照", from_snapshot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""下载基准：本地限速服务器上单连接与分段并行下载的耗时对比"""
+
+import os
+import tempfile
+import time
+
+from benchmarks.local_server import LocalServer
+from services.downloader import Downloader
+
+SIZE = 16 * 1024 * 1024
+# 每个连接的速率（字节/秒），模拟按连接限速的镜像站
+RATE = 4 * 1024 * 1024
+
+
+def main() -> None:
+    os.environ["NO_PROXY"] = os.environ["no_proxy"] = "127.0.0.1"
+    server = LocalServer()
+    server.files["/tool.zip"] = os.urandom(SIZE)
+    server.rate = RATE
+    server.start()
+    print(f"{SIZE // 1024 // 1024} MiB, 每连接限速 {RATE // 1024 // 1024} MiB/s")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for segments in (1, Downloader.SEGMENTS):
+                dest = os.path.join(tmp, f"tool-{segments}.zip")
+                start = time.perf_counter()
+                Downloader(segments=segments).download(server.url("/tool.zip"), dest)
+                elapsed = time.perf_counter() - start
+                label = "单连接" if segments == 1 else f"{segments} 段并行"
+                print(f"{label}: {elapsed:.2f} s ({SIZE / elapsed / 1024 / 1024:.1f} MiB/s)")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
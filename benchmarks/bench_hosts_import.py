@@ -0,0 +1,67 @@
+"""HOSTS 屏蔽列表导入基准：导入 500k 行时的内存峰值（tracemalloc）和耗时
+
+峰值超过上限时返回非零退出码，上限可通过环境变量 WINTOOLBOX_HOSTS_IMPORT_CEILING_MB 调整。
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_hosts import make_blocklist
+from services.hosts import HostsService
+
+LINES = 500_000
+# 内存峰值上限（MB）
+CEILING_MB = float(os.environ.get("WINTOOLBOX_HOSTS_IMPORT_CEILING_MB", "64"))
+
+
+def measure(label: str, content: str) -> float:
+    """把 content 作为屏蔽列表导入只有 localhost 的 HOSTS，返回内存峰值（MB）"""
+    with tempfile.TemporaryDirectory() as directory:
+        hosts = os.path.join(directory, "hosts")
+        with open(hosts, "w", encoding="utf-8") as f:
+            f.write("127.0.0.1 localhost\n")
+        blocklist = os.path.join(directory, "list.txt")
+        with open(blocklist, "w", encoding="utf-8") as f:
+            f.write(content)
+        HostsService.set_path(hosts)
+        HostsService._config_dir = directory
+        HostsService._backup_dir = os.path.join(directory, "backups")
+        HostsService._journal_file = os.path.join(directory, "hosts_journal.jsonl")
+
+        start = time.perf_counter()
+        result = HostsService.import_blocklists([blocklist])
+        elapsed = time.perf_counter() - start
+
+        # 恢复 HOSTS 后在 tracemalloc 下再导入一次（追踪会显著拖慢速度，耗时以上一次为准）
+        tracemalloc.start()
+        try:
+            with open(hosts, "w", encoding="utf-8") as f:
+                f.write("127.0.0.1 localhost\n")
+            HostsService.import_blocklists([blocklist])
+            peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        finally:
+            tracemalloc.stop()
+
+    size = len(content.encode("utf-8")) / 1024 / 1024
+    print(
+        f"{label}: {size:.1f} MB 源文件, 新增 {result.added}, 跳过 {result.skipped}, "
+        f"耗时 {elapsed:.2f} s, 内存峰值 {peak:.1f} MB"
+    )
+    return peak
+
+
+def main() -> None:
+    peak = measure(f"{LINES} 行，全部为新域名", make_blocklist(LINES, "\n"))
+    # 同样 500k 行，只有 50k 个不同域名：峰值只随新增域名数量增长
+    repeated = make_blocklist(LINES // 10, "\n")
+    measure(f"{LINES} 行，50k 个域名重复 10 次", repeated * 10)
+
+    if peak > CEILING_MB:
+        sys.exit(f"内存峰值 {peak:.1f} MB 超过上限 {CEILING_MB:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
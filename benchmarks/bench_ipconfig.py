@@ -0,0 +1,62 @@
+"""ipconfig /all 解析基准：合成大量适配器，验证解析耗时随适配器数线性增长"""
+
+import time
+
+from services.network import NetworkService
+
+ADAPTER_BLOCK = """以太网适配器 以太网 {index}:
+
+   连接特定的 DNS 后缀 . . . . . . . : lan
+   描述. . . . . . . . . . . . . . . : Intel(R) Ethernet Connection #{index}
+   物理地址. . . . . . . . . . . . . : 00-1A-2B-3C-{hi:02X}-{lo:02X}
+   DHCP 已启用 . . . . . . . . . . . : 是
+   自动配置已启用. . . . . . . . . . : 是
+   IPv6 地址 . . . . . . . . . . . . : 240e:3b0:1234::{index:x}(首选)
+   本地链接 IPv6 地址. . . . . . . . : fe80::1c2d:3e4f:5a6b:{index:x}%12(首选)
+   IPv4 地址 . . . . . . . . . . . . : 10.{hi}.{lo}.100(首选)
+   子网掩码  . . . . . . . . . . . . : 255.255.255.0
+   获得租约的时间  . . . . . . . . . : 2026年10月18日 8:00:00
+   租约过期的时间  . . . . . . . . . : 2026年10月19日 8:00:00
+   默认网关. . . . . . . . . . . . . : fe80::1%12
+                                       10.{hi}.{lo}.1
+   DHCP 服务器 . . . . . . . . . . . : 10.{hi}.{lo}.1
+   DNS 服务器  . . . . . . . . . . . : 10.{hi}.{lo}.1
+                                       114.114.114.114
+                                       240e:3b0::1
+   TCPIP 上的 NetBIOS  . . . . . . . : 已启用
+
+"""
+
+SIZES = (50, 500, 5000)
+REPEAT = 5
+
+
+def make_output(count: int) -> str:
+    """生成含 count 个适配器的 ipconfig /all 输出"""
+    blocks = ["\nWindows IP 配置\n\n   主机名  . . . . . . . . . . . . . : BENCH\n\n"]
+    for index in range(count):
+        blocks.append(ADAPTER_BLOCK.format(index=index, hi=index >> 8 & 0xFF, lo=index & 0xFF))
+    return "".join(blocks)
+
+
+def measure(count: int) -> float:
+    """解析 count 个适配器的最短耗时（秒）"""
+    output = make_output(count)
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        adapters = NetworkService._parse_ipconfig(output)
+        best = min(best, time.perf_counter() - start)
+    assert len(adapters) == count
+    return best
+
+
+def main() -> None:
+    print(f"{'适配器数':>8} {'耗时(ms)':>10} {'每个适配器(us)':>14}")
+    for count in SIZES:
+        elapsed = measure(count)
+        print(f"{count:>8} {elapsed * 1000:>10.2f} {elapsed / count * 1_000_000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""路由表增量刷新基准：10k 条路由反复刷新，每次只有少量变化"""
+
+import random
+import time
+
+from services.route import RouteEntry, RouteService
+
+ROUTES = 10_000
+REFRESHES = 50
+# 每次刷新新增、删除和修改跃点数的路由数
+CHANGES = 5
+
+
+def make_routes(count: int, seed: int = 1) -> list[RouteEntry]:
+    """生成 count 条互不相同的路由（模拟 VPN 推送的大量 /24、/32 路由）"""
+    rng = random.Random(seed)
+    gateways = [(10 << 24) | (i << 8) | 1 for i in range(16)]
+    routes = []
+    for i in range(count):
+        prefix = 32 if i % 4 == 0 else 24
+        destination = ((172 << 24) | (i << 8)) & 0xFFFFFFFF
+        if prefix == 32:
+            destination |= 5
+        gateway = rng.choice(gateways)
+        routes.append(RouteEntry(destination, prefix, gateway, gateway + 99, rng.randint(1, 300)))
+    return routes
+
+
+def mutate(routes: list[RouteEntry], rng: random.Random, serial: int) -> list[RouteEntry]:
+    """删除、修改、新增少量路由后返回新路由表"""
+    routes = list(routes)
+    for _ in range(CHANGES):
+        del routes[rng.randrange(len(routes))]
+    for _ in range(CHANGES):
+        i = rng.randrange(len(routes))
+        old = routes[i]
+        routes[i] = RouteEntry(old.destination_ip, old.prefix, old.gateway_ip, old.interface_ip, old.metric + 1)
+    for n in range(CHANGES):
+        routes.append(RouteEntry((192 << 24) | (serial * CHANGES + n) << 8, 24, None, (10 << 24) | 99, 25))
+    return routes
+
+
+def main() -> None:
+    rng = random.Random(2)
+    snapshots = [make_routes(ROUTES)]
+    for serial in range(REFRESHES):
+        snapshots.append(mutate(snapshots[-1], rng, serial))
+
+    start = time.perf_counter()
+    changes = 0
+    for old, new in zip(snapshots, snapshots[1:], strict=False):
+        diff = RouteService.diff(old, new)
+        changes += len(diff.added) + len(diff.removed) + len(diff.changed)
+    elapsed = (time.perf_counter() - start) / REFRESHES
+
+    print(f"{ROUTES} 条路由, {REFRESHES} 次刷新, 平均每次 {changes / REFRESHES:.0f} 处变化")
+    print(f"差异计算: {elapsed * 1000:.1f} ms/次（只需把这些变化应用到 Treeview）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""路由条目表示方式基准：50k 条路由，整数 slots 记录 vs 字符串 dataclass"""
+
+import ipaddress
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from benchmarks.bench_route_diff import make_routes
+from services.route import RouteEntry, ipv4_to_int
+
+ROUTES = 50_000
+
+
+@dataclass
+class StringRouteEntry:
+    """改为整数记录之前的表示：所有字段都是字符串"""
+    destination: str
+    mask: str
+    gateway: str
+    interface: str
+    metric: str
+
+
+def measure(label: str, build: Callable[[], list]) -> list:
+    """统计从文本行建立列表的耗时和占用内存（tracemalloc 会拖慢解析，两者分开测量）"""
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    routes = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label}: 解析 {elapsed * 1000:.1f} ms, 内存 {size / 1024 / 1024:.1f} MiB")
+    return routes
+
+
+def timed(label: str, func: Callable[[], object]) -> None:
+    start = time.perf_counter()
+    func()
+    print(f"  {label}: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+def main() -> None:
+    # route print 中的路由行
+    lines = [f"{r.destination} {r.mask} {r.gateway} {r.interface} {r.metric}" for r in make_routes(ROUTES)]
+    address = ipv4_to_int("172.16.100.5")
+    print(f"{ROUTES} 条路由")
+
+    old = measure("字符串 dataclass", lambda: [StringRouteEntry(*line.split()) for line in lines])
+    timed("按目标排序", lambda: sorted(old, key=lambda r: ipaddress.IPv4Address(r.destination)))
+    timed("按跃点数排序", lambda: sorted(old, key=lambda r: int(r.metric)))
+    timed("按网关筛选", lambda: [r for r in old if r.gateway == "10.0.3.1"])
+    timed("包含查找", lambda: [
+        r for r in old
+        if ipaddress.IPv4Address("172.16.100.5") in ipaddress.IPv4Network(f"{r.destination}/{r.mask}")
+    ])
+
+    new = measure("整数 slots 记录", lambda: [RouteEntry.parse(*line.split()) for line in lines])
+    gateway = ipv4_to_int("10.0.3.1")
+    timed("按目标排序", lambda: sorted(new, key=lambda r: (r.destination_ip, r.prefix)))
+    timed("按跃点数排序", lambda: sorted(new, key=lambda r: r.metric))
+    timed("按网关筛选", lambda: [r for r in new if r.gateway_ip == gateway])
+    timed("包含查找", lambda: [r for r in new if r.contains(address)])
+
+
+if __name__ == "__main__":
+    main()
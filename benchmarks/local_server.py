@@ -0,0 +1,111 @@
+"""本地 HTTP 替身服务器，供下载相关的基准和测试使用"""
+
+import hashlib
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LocalServer:
+    """本地 HTTP 替身服务器
+
+    files 为 路径 -> 内容；支持 Range（含后缀范围）/If-Range 和 If-None-Match，记录每次请求的路径和请求头。
+    truncate 中的每一项截断一个响应：只发送该字节数后断开连接。
+    rate 限制每个连接的发送速度（字节/秒，0 为不限）。
+    """
+
+    LAST_MODIFIED = "Sun, 18 Oct 2026 08:00:00 GMT"
+
+    def __init__(self):
+        self.files: dict[str, bytes] = {}
+        self.requests: list[tuple[str, dict[str, str]]] = []
+        self.truncate: list[int] = []
+        self.rate = 0
+        self.range_support = True
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_port}{path}"
+
+    def etag(self, path: str) -> str:
+        return '"' + hashlib.sha1(self.files[path]).hexdigest() + '"'
+
+    def count(self, path: str) -> int:
+        """某个路径收到的请求数"""
+        return sum(1 for requested, _ in self.requests if requested == path)
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append((self.path, dict(self.headers)))
+                    limit = server.truncate.pop(0) if server.truncate else None
+                data = server.files.get(self.path)
+                if data is None:
+                    self.send_error(404)
+                    return
+                etag = server.etag(self.path)
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                start, end = 0, len(data) - 1
+                match = re.fullmatch(r"bytes=(\d*)-(\d*)", self.headers.get("Range", ""))
+                if_range = self.headers.get("If-Range")
+                partial = bool(match) and server.range_support and if_range in (None, etag, server.LAST_MODIFIED)
+                if partial and match:
+                    if match.group(1):
+                        start = int(match.group(1))
+                        end = min(int(match.group(2)) if match.group(2) else end, end)
+                    else:
+                        # 后缀范围：最后 N 个字节
+                        start = max(len(data) - int(match.group(2)), 0)
+                    if start > end:
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{len(data)}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+                else:
+                    self.send_response(200)
+                self.send_header("Content-Length", str(end - start + 1))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", server.LAST_MODIFIED)
+                self.end_headers()
+                self._send(data[start:end + 1], limit)
+
+            def _send(self, body: bytes, limit: int | None) -> None:
+                if limit is not None:
+                    body = body[:limit]
+                chunk = 16 * 1024
+                for i in range(0, len(body), chunk):
+                    self.wfile.write(body[i:i + chunk])
+                    if server.rate:
+                        time.sleep(chunk / server.rate)
+                if limit is not None:
+                    self.wfile.flush()
+                    self.close_connection = True
+
+        return Handler
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
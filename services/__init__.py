@@ -1,13 +1,40 @@
-"""服务层模块"""
+"""服务层模块
+
+导出项按需导入，仅在首次使用时加载对应服务。
+"""
+
+import importlib
+from typing import Any
+
+# 导出名 -> 子模块名
+_EXPORTS = {
+    "HostsService": "hosts",
+    "RouteService": "route",
+    "NetworkService": "network",
+    "SettingsService": "settings",
+    "AppSettings": "settings",
+    "ToolsService": "tools",
+    "ToolInfo": "tools",
+    "TaskService": "tasks",
+    "WatcherService": "watcher",
+    "NetworkWatcher": "watcher",
+    "DownloadManager": "downloads",
+    "DownloadJob": "downloads",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-from .hosts import HostsService
-from .network import NetworkService
-from .route import RouteService
-from .settings import AppSettings, SettingsService
-from .tools import ToolInfo, ToolsService
 
 __all__ = [
     "HostsService", "RouteService", "NetworkService",
     "SettingsService", "AppSettings",
-    "ToolsService", "ToolInfo"
+    "ToolsService", "ToolInfo",
+    "TaskService",
+    "WatcherService", "NetworkWatcher",
+    "DownloadManager", "DownloadJob"
 ]
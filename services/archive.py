@@ -0,0 +1,259 @@
+"""压缩包解压服务
+
+多个线程并行解压 zip 成员（每个线程使用独立的 ZipFile 句柄，解压缩时会释放 GIL），
+目标位置已存在大小和 CRC32 都相同的文件时跳过，不重复写入。
+解压时同时计算每个文件的 SHA-256，保存为安装清单，之后可以并行校验并只修复损坏的文件。
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import zipfile
+import zlib
+from collections.abc import Collection
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from utils.logger import logger
+
+# 安装清单文件名（位于安装目录中）
+MANIFEST_FILE = ".wintoolbox-manifest.json"
+# 清单中没有记录 CRC32 时的占位值
+UNKNOWN_CRC = -1
+
+# 文件记录：(大小, SHA-256, CRC32)
+FileRecord = tuple[int, str, int]
+
+
+@dataclass
+class ExtractResult:
+    """解压结果"""
+    extracted: list[str] = field(default_factory=list)  # 写入的文件（成员名）
+    skipped: list[str] = field(default_factory=list)    # 内容相同而跳过的文件
+    # 成员名 -> (大小, SHA-256, CRC32)，包含写入和跳过的文件
+    files: dict[str, FileRecord] = field(default_factory=dict)
+
+
+# 读取/写入文件的块大小
+_CRC_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """计算文件的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_CRC_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _existing_sha256(path: str, info: zipfile.ZipInfo) -> str | None:
+    """磁盘上的文件与压缩包成员内容相同（先比较大小，再比较 CRC32）时返回其 SHA-256
+
+    CRC32 和 SHA-256 在同一次读取中计算。
+    """
+    try:
+        if os.path.getsize(path) != info.file_size:
+            return None
+        crc = 0
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(_CRC_CHUNK_SIZE):
+                crc = zlib.crc32(chunk, crc)
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest() if crc == info.CRC else None
+
+
+def _target_path(dest_dir: str, name: str) -> str | None:
+    """成员在目标目录中的路径，不安全的路径（绝对路径、..）返回 None"""
+    parts = [p for p in name.replace("\\", "/").split("/") if p not in ("", ".")]
+    if not parts or ".." in parts or ":" in parts[0]:
+        return None
+    return os.path.join(dest_dir, *parts)
+
+
+class ArchiveService:
+    """压缩包解压服务"""
+
+    # 并行解压的线程数
+    MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+    @classmethod
+    def extract_zip(
+        cls,
+        zip_path: str,
+        dest_dir: str,
+        workers: int | None = None,
+        skip_identical: bool = True,
+        members: Collection[str] | None = None
+    ) -> ExtractResult:
+        """解压 zip 到 dest_dir
+
+        成员按大小均衡分配给多个线程并行解压；skip_identical 时跳过内容相同的已有文件；
+        指定 members 时只解压这些成员（用于修复）。
+        """
+        started = time.perf_counter()
+        wanted = set(members) if members is not None else None
+        with zipfile.ZipFile(zip_path) as zf:
+            infos = [
+                info for info in zf.infolist()
+                if not info.is_dir() and (wanted is None or info.filename in wanted)
+            ]
+            for info in zf.infolist():
+                if info.is_dir():
+                    target = _target_path(dest_dir, info.filename)
+                    if target:
+                        os.makedirs(target, exist_ok=True)
+
+        workers = max(1, min(workers or cls.MAX_WORKERS, len(infos)))
+        batches: list[list[zipfile.ZipInfo]] = [[] for _ in range(workers)]
+        loads = [0] * workers
+        # 从大到小分配给当前负载最小的线程
+        for info in sorted(infos, key=lambda i: i.file_size, reverse=True):
+            index = loads.index(min(loads))
+            batches[index].append(info)
+            loads[index] += info.file_size
+
+        result = ExtractResult()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wintoolbox-extract") as pool:
+            futures = [
+                pool.submit(cls._extract_batch, zip_path, dest_dir, batch, skip_identical)
+                for batch in batches if batch
+            ]
+            for future in futures:
+                extracted, skipped, files = future.result()
+                result.extracted.extend(extracted)
+                result.skipped.extend(skipped)
+                result.files.update(files)
+
+        logger.debug(
+            f"解压完成: 写入 {len(result.extracted)} 个, 跳过 {len(result.skipped)} 个, "
+            f"耗时 {time.perf_counter() - started:.2f} 秒"
+        )
+        return result
+
+    @staticmethod
+    def _extract_batch(
+        zip_path: str,
+        dest_dir: str,
+        batch: list[zipfile.ZipInfo],
+        skip_identical: bool
+    ) -> tuple[list[str], list[str], dict[str, FileRecord]]:
+        """在当前线程中解压一组成员（使用独立的 ZipFile 句柄），写入时计算 SHA-256"""
+        extracted: list[str] = []
+        skipped: list[str] = []
+        files: dict[str, FileRecord] = {}
+        with zipfile.ZipFile(zip_path) as zf:
+            for info in batch:
+                target = _target_path(dest_dir, info.filename)
+                if target is None:
+                    logger.warning(f"跳过不安全的压缩包路径: {info.filename}")
+                    continue
+                if skip_identical:
+                    sha256 = _existing_sha256(target, info)
+                    if sha256 is not None:
+                        skipped.append(info.filename)
+                        files[info.filename] = (info.file_size, sha256, info.CRC)
+                        continue
+
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                digest = hashlib.sha256()
+                with zf.open(info) as src, open(target, "wb") as dst:
+                    while chunk := src.read(_CRC_CHUNK_SIZE):
+                        digest.update(chunk)
+                        dst.write(chunk)
+                # 保留压缩包中的修改时间
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                os.utime(target, (mtime, mtime))
+                extracted.append(info.filename)
+                files[info.filename] = (info.file_size, digest.hexdigest(), info.CRC)
+        return extracted, skipped, files
+
+    @staticmethod
+    def link_members(src_dir: str, dest_dir: str, names: Collection[str]) -> None:
+        """把 src_dir 中的成员文件放到 dest_dir 的相同位置（优先硬链接，不支持时复制）"""
+        for name in names:
+            src = _target_path(src_dir, name)
+            dest = _target_path(dest_dir, name)
+            if src is None or dest is None:
+                continue
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            try:
+                os.link(src, dest)
+            except OSError:
+                shutil.copy2(src, dest)
+
+    @staticmethod
+    def swap_dirs(new_dir: str, target_dir: str) -> None:
+        """用 new_dir 替换 target_dir（两次重命名），替换失败时恢复原目录"""
+        old_dir = target_dir + ".old"
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.exists(target_dir):
+            os.rename(target_dir, old_dir)
+        try:
+            os.rename(new_dir, target_dir)
+        except OSError:
+            if os.path.exists(old_dir):
+                os.rename(old_dir, target_dir)
+            raise
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+@dataclass
+class InstallManifest:
+    """安装清单：压缩包的 SHA-256 和解压出的每个文件的大小、SHA-256、CRC32
+
+    增量更新得到的安装没有完整的压缩包，archive_sha256 为空。
+    """
+    archive_sha256: str
+    files: dict[str, FileRecord] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, install_dir: str) -> "InstallManifest | None":
+        """读取安装目录中的清单，不存在或无法解析时返回 None"""
+        try:
+            with open(os.path.join(install_dir, MANIFEST_FILE), encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(
+                archive_sha256=data["archive_sha256"],
+                files={
+                    name: (int(record[0]), record[1], int(record[2]) if len(record) > 2 else UNKNOWN_CRC)
+                    for name, record in data["files"].items()
+                },
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"读取安装清单失败: {e}")
+            return None
+
+    def save(self, install_dir: str) -> None:
+        path = os.path.join(install_dir, MANIFEST_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"archive_sha256": self.archive_sha256, "files": self.files}, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def verify(self, install_dir: str, workers: int | None = None) -> list[str]:
+        """并行重新计算所有文件的 SHA-256，返回缺失或内容不符的成员名"""
+        def is_bad(item: tuple[str, FileRecord]) -> bool:
+            name, (size, sha256, _) = item
+            path = _target_path(install_dir, name)
+            try:
+                # 大小不同时不必计算哈希
+                return path is None or os.path.getsize(path) != size or file_sha256(path) != sha256
+            except OSError:
+                return True
+
+        items = list(self.files.items())
+        if not items:
+            return []
+        with ThreadPoolExecutor(
+            max_workers=workers or ArchiveService.MAX_WORKERS,
+            thread_name_prefix="wintoolbox-verify"
+        ) as pool:
+            return [name for (name, _), bad in zip(items, pool.map(is_bad, items), strict=True) if bad]
@@ -0,0 +1,301 @@
+"""下载缓存
+
+按内容（SHA-256）保存下载过的文件，索引记录 URL 对应的内容及其 ETag/Last-Modified。
+再次下载同一 URL 时先发送条件请求，服务器返回 304 时直接使用缓存，不再重新下载；
+不同 URL 内容相同时只保存一份。缓存总大小超过上限时按最近使用时间淘汰。
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+
+from services.downloader import Downloader, RateLimiter
+from utils.logger import logger
+
+
+@dataclass
+class CacheEntry:
+    """URL 对应的缓存内容"""
+    sha256: str
+    size: int
+    etag: str = ""
+    last_modified: str = ""
+
+
+class DownloadCache:
+    """按内容寻址的下载缓存"""
+
+    # 默认缓存大小上限（字节）
+    MAX_SIZE = 1024 * 1024 * 1024
+    INDEX_FILE = "index.json"
+
+    def __init__(
+        self,
+        root: str,
+        max_size: int | None = None,
+        downloader_factory: Callable[..., Downloader] = Downloader
+    ):
+        self.root = root
+        self.max_size = self.MAX_SIZE if max_size is None else max_size
+        # 每次下载使用新的下载器，多个下载可以同时进行
+        self._downloader_factory = downloader_factory
+        self._lock = threading.Lock()
+        # 同一 URL 同时只有一个获取过程，后到的等待并直接使用其结果
+        self._url_locks: dict[str, threading.Lock] = {}
+        # url -> CacheEntry
+        self._entries: dict[str, CacheEntry] = {}
+        # sha256 -> 最近使用时间
+        self._used: dict[str, float] = {}
+        self._load_index()
+
+    @property
+    def blobs_dir(self) -> str:
+        return os.path.join(self.root, "blobs")
+
+    @property
+    def staging_dir(self) -> str:
+        """下载暂存目录（保存未完成的 .part，可续传）"""
+        return os.path.join(self.root, "staging")
+
+    def blob_path(self, sha256: str) -> str:
+        return os.path.join(self.blobs_dir, sha256)
+
+    def lookup(self, url: str) -> str | None:
+        """URL 已缓存且文件存在时返回缓存文件路径"""
+        entry = self.entry(url)
+        if entry and os.path.exists(self.blob_path(entry.sha256)):
+            return self.blob_path(entry.sha256)
+        return None
+
+    def lookup_content(self, sha256: str) -> str | None:
+        """按内容（SHA-256）查找缓存文件，只更新最近使用时间，不改变 URL 对应的记录"""
+        sha256 = sha256.lower()
+        path = self.blob_path(sha256)
+        with self._lock:
+            if not os.path.exists(path):
+                return None
+            self._used[sha256] = time.time()
+            self._save_index()
+        return path
+
+    def entry(self, url: str) -> CacheEntry | None:
+        """URL 对应的缓存记录"""
+        with self._lock:
+            return self._entries.get(url)
+
+    def discard(self, url: str) -> None:
+        """删除 URL 的缓存记录，内容不再被其他 URL 引用时一并删除"""
+        with self._lock:
+            entry = self._entries.pop(url, None)
+            if entry and not self._is_referenced(entry.sha256):
+                self._remove_blob(entry.sha256)
+                self._used.pop(entry.sha256, None)
+            self._save_index()
+
+    def fetch(
+        self,
+        url: str,
+        progress_callback: Callable[[int, int], None] | None = None,
+        cancel_event: threading.Event | None = None,
+        sha256: str = "",
+        limiter: RateLimiter | None = None
+    ) -> str:
+        """返回 url 内容的缓存文件路径，必要时下载
+
+        指定 sha256 且缓存中已有该内容时直接使用，不访问网络；
+        否则已有缓存时发送带 If-None-Match/If-Modified-Since 的条件请求，304 时直接使用缓存；
+        条件请求因网络错误失败时也使用缓存。返回的文件属于缓存，调用方不要修改或删除。
+        limiter 为多个下载共享的限速器。
+        """
+        with self._lock:
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+        with url_lock:
+            return self._fetch(url, progress_callback, cancel_event, sha256, limiter)
+
+    def _fetch(
+        self,
+        url: str,
+        progress_callback: Callable[[int, int], None] | None,
+        cancel_event: threading.Event | None,
+        sha256: str,
+        limiter: RateLimiter | None
+    ) -> str:
+        entry = self.entry(url)
+        sha256 = sha256.lower()
+        if sha256 and os.path.exists(self.blob_path(sha256)):
+            if not entry or entry.sha256 != sha256:
+                entry = CacheEntry(sha256=sha256, size=os.path.getsize(self.blob_path(sha256)))
+            logger.info(f"缓存中已有指定内容: {url}")
+            if progress_callback:
+                progress_callback(entry.size, entry.size)
+            return self._touch(url, entry)
+
+        if entry and not os.path.exists(self.blob_path(entry.sha256)):
+            entry = None
+
+        if entry and (entry.etag or entry.last_modified):
+            try:
+                if self._not_modified(url, entry):
+                    logger.info(f"资源未变化，使用缓存: {url}")
+                    if progress_callback:
+                        progress_callback(entry.size, entry.size)
+                    return self._touch(url, entry)
+            except (urllib.error.URLError, http.client.HTTPException, TimeoutError, ConnectionError) as e:
+                logger.warning(f"条件请求失败，使用缓存: {e}")
+                return self._touch(url, entry)
+
+        return self._download(url, progress_callback, cancel_event, limiter)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            for sha256 in list(self._used):
+                self._remove_blob(sha256)
+            self._entries.clear()
+            self._used.clear()
+            self._save_index()
+        logger.info("下载缓存已清空")
+
+    def total_size(self) -> int:
+        """缓存文件的总大小（字节）"""
+        with self._lock:
+            return self._total_size()
+
+    # 下载与校验
+
+    def _not_modified(self, url: str, entry: CacheEntry) -> bool:
+        """发送条件请求，资源未变化（304）时返回 True"""
+        headers = {"User-Agent": Downloader.USER_AGENT}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            # 资源已变化时不读取响应体，交给下载器重新下载（支持续传和分段）
+            with urllib.request.urlopen(request, timeout=Downloader.TIMEOUT):
+                return False
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return True
+            logger.debug(f"条件请求返回 HTTP {e.code}，重新下载")
+            return False
+
+    def _download(
+        self,
+        url: str,
+        progress_callback: Callable[[int, int], None] | None,
+        cancel_event: threading.Event | None,
+        limiter: RateLimiter | None
+    ) -> str:
+        """下载到暂存目录，按内容移入缓存"""
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        staged = os.path.join(self.staging_dir, name)
+        downloader = self._downloader_factory(limiter=limiter)
+        downloader.download(url, staged, progress_callback, cancel_event)
+        validators = downloader.validators
+
+        # 下载器边下载边计算了 SHA-256
+        sha256 = downloader.sha256
+        entry = CacheEntry(
+            sha256=sha256,
+            size=os.path.getsize(staged),
+            etag=validators.get("etag", ""),
+            last_modified=validators.get("last_modified", ""),
+        )
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        blob = self.blob_path(sha256)
+        if os.path.exists(blob):
+            # 其他 URL 已缓存相同内容
+            os.remove(staged)
+        else:
+            os.replace(staged, blob)
+
+        logger.debug(f"已缓存: {url} -> {sha256}")
+        path = self._touch(url, entry)
+        with self._lock:
+            self._evict(keep=sha256)
+        return path
+
+    # 索引
+
+    def _touch(self, url: str, entry: CacheEntry) -> str:
+        """记录 URL 对应的内容并更新最近使用时间"""
+        with self._lock:
+            old = self._entries.get(url)
+            self._entries[url] = entry
+            self._used[entry.sha256] = time.time()
+            if old and old.sha256 != entry.sha256 and not self._is_referenced(old.sha256):
+                self._remove_blob(old.sha256)
+                self._used.pop(old.sha256, None)
+            self._save_index()
+        return self.blob_path(entry.sha256)
+
+    def _evict(self, keep: str) -> None:
+        """超过大小上限时按最近使用时间淘汰（不淘汰 keep）"""
+        total = self._total_size()
+        for sha256 in sorted(self._used, key=self._used.__getitem__):
+            if total <= self.max_size:
+                break
+            if sha256 == keep:
+                continue
+            total -= self._blob_size(sha256)
+            self._remove_blob(sha256)
+            del self._used[sha256]
+            for url in [u for u, e in self._entries.items() if e.sha256 == sha256]:
+                del self._entries[url]
+            logger.debug(f"淘汰缓存: {sha256}")
+        self._save_index()
+
+    def _is_referenced(self, sha256: str) -> bool:
+        return any(entry.sha256 == sha256 for entry in self._entries.values())
+
+    def _total_size(self) -> int:
+        return sum(self._blob_size(sha256) for sha256 in self._used)
+
+    def _blob_size(self, sha256: str) -> int:
+        try:
+            return os.path.getsize(self.blob_path(sha256))
+        except OSError:
+            return 0
+
+    def _remove_blob(self, sha256: str) -> None:
+        try:
+            os.remove(self.blob_path(sha256))
+        except FileNotFoundError:
+            pass
+
+    def _load_index(self) -> None:
+        try:
+            with open(os.path.join(self.root, self.INDEX_FILE), encoding="utf-8") as f:
+                data = json.load(f)
+            self._entries = {url: CacheEntry(**value) for url, value in data.get("entries", {}).items()}
+            self._used = {sha256: float(t) for sha256, t in data.get("used", {}).items()}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"读取下载缓存索引失败，已忽略: {e}")
+            self._entries, self._used = {}, {}
+
+        # 丢弃文件已不存在的记录
+        self._used = {s: t for s, t in self._used.items() if os.path.exists(self.blob_path(s))}
+        self._entries = {u: e for u, e in self._entries.items() if e.sha256 in self._used}
+
+    def _save_index(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, self.INDEX_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "entries": {url: asdict(entry) for url, entry in self._entries.items()},
+                "used": self._used,
+            }, f, indent=2)
+        os.replace(tmp_path, path)
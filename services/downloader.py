@@ -0,0 +1,514 @@
+"""流式下载器
+
+按块流式写入 .part 文件，中断后通过 HTTP Range 从已下载的位置续传；
+.part 文件和校验信息（ETag/Last-Modified、分段进度）保存在磁盘上，程序重启后仍可续传。
+服务器支持 Range 时，大文件拆成多个分段并行下载到预分配的文件中，否则退回单连接。
+网络错误按指数退避重试，只要有新数据写入就重新计算重试次数。
+下载过程中按偏移顺序计算 SHA-256：分段下载时先到的后续分段数据暂存在内存中，
+前面的数据到齐后依次计入，完成后不需要再读一遍文件。暂存超过 HASH_BUFFER_SIZE 的数据
+和续传前已下载的部分不在内存中，完成时从文件中补算（只读这部分）。
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.logger import logger
+
+# Content-Range: bytes 100-199/1000
+_CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+class DownloadError(Exception):
+    """下载失败"""
+
+
+class DownloadCancelledError(DownloadError):
+    """下载被取消（已下载的部分保留，可续传）"""
+
+
+class _ResourceChangedError(DownloadError):
+    """服务器上的资源已变化或不再支持分段，需要重新下载"""
+
+
+class _SegmentAbortedError(DownloadError):
+    """其他分段失败，本分段随之中止"""
+
+
+class RateLimiter:
+    """令牌桶限速器，多个下载共享时限制总带宽；rate 为 0 表示不限速"""
+
+    # 空闲时最多积累的额度（秒）
+    BURST = 1.0
+
+    def __init__(self, rate: float = 0, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        # 已预约额度用到的时间点
+        self._available = time.monotonic()
+
+    def set_rate(self, rate: float) -> None:
+        """设置速率（字节/秒）"""
+        with self._lock:
+            self.rate = rate
+            self._available = time.monotonic()
+
+    def consume(self, size: int) -> None:
+        """消耗 size 字节的额度，超出速率时等待"""
+        with self._lock:
+            if self.rate <= 0:
+                return
+            now = time.monotonic()
+            self._available = max(self._available, now - self.BURST) + size / self.rate
+            wait = self._available - now
+        if wait > 0:
+            self._sleep(wait)
+
+
+class Downloader:
+    """支持断点续传的流式下载器"""
+
+    # 每次读取/写入的块大小（字节）
+    CHUNK_SIZE = 256 * 1024
+    # 连续失败的最大重试次数
+    MAX_RETRIES = 5
+    # 重试等待：BACKOFF_BASE * 2^n 秒，最长 BACKOFF_MAX 秒
+    BACKOFF_BASE = 1.0
+    BACKOFF_MAX = 30.0
+    # 分段并行下载的段数，以及每段的最小大小（字节）
+    SEGMENTS = 4
+    MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+    # 分段下载时暂存乱序数据块用于计算 SHA-256 的内存上限（字节），超出部分完成时从文件补算
+    HASH_BUFFER_SIZE = 32 * 1024 * 1024
+    # 分段下载时每写入多少字节保存一次进度
+    META_SAVE_INTERVAL = 1024 * 1024
+    # 连接/读取超时（秒）
+    TIMEOUT = 30
+    USER_AGENT = "WinToolbox"
+
+    # 可重试的 HTTP 状态码
+    RETRY_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        chunk_size: int | None = None,
+        max_retries: int | None = None,
+        backoff_base: float | None = None,
+        timeout: float | None = None,
+        segments: int | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        limiter: RateLimiter | None = None
+    ):
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.segments = self.SEGMENTS if segments is None else segments
+        self.max_retries = self.MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = self.BACKOFF_BASE if backoff_base is None else backoff_base
+        self.timeout = timeout or self.TIMEOUT
+        self._sleep = sleep
+        self.limiter = limiter
+        # 最近一次完成的下载的 ETag/Last-Modified 和 SHA-256
+        self.validators: dict[str, str] = {}
+        self.sha256 = ""
+        # 边下载边计算的 SHA-256，_hashed 为已计算的连续字节数
+        self._hash_lock = threading.Lock()
+        self._hasher = hashlib.sha256()
+        self._hashed = 0
+        # 尚未轮到计算的数据块：偏移 -> 数据，_buffered 为其总大小
+        self._pending: dict[int, bytes] = {}
+        self._buffered = 0
+
+    @staticmethod
+    def part_path(dest: str) -> str:
+        """未完成下载的数据文件"""
+        return dest + ".part"
+
+    @staticmethod
+    def meta_path(dest: str) -> str:
+        """未完成下载的校验信息文件"""
+        return dest + ".part.json"
+
+    def download(
+        self,
+        url: str,
+        dest: str,
+        progress_callback: Callable[[int, int], None] | None = None,
+        cancel_event: threading.Event | None = None
+    ) -> str:
+        """下载 url 到 dest，返回 dest
+
+        服务器支持 Range 且文件较大时分段并行下载，否则单连接下载。
+        progress_callback(已下载字节, 总字节) 只在总大小已知时调用；
+        cancel_event 被设置时抛出 DownloadCancelledError，已下载部分保留。
+        """
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        part = self.part_path(dest)
+        meta = self._load_meta(dest, url)
+        self._reset_hash()
+
+        # 已有单连接下载的进度时继续单连接续传
+        single_in_progress = os.path.exists(part) and not meta.get("segments")
+        if self.segments > 1 and not single_in_progress:
+            try:
+                if meta.get("segments") or self._probe(url, dest, meta):
+                    self._download_segments(url, dest, meta, progress_callback, cancel_event)
+                    return self._finish(dest, meta)
+            except _ResourceChangedError:
+                logger.debug("资源已变化，改为单连接重新下载")
+                self._reset(dest)
+                meta = {}
+
+        self._retry(
+            lambda: self._transfer(url, dest, os.path.getsize(part) if os.path.exists(part) else 0,
+                                   meta, progress_callback, cancel_event),
+            lambda: os.path.getsize(part) if os.path.exists(part) else 0
+        )
+        return self._finish(dest, meta)
+
+    def _finish(self, dest: str, meta: dict) -> str:
+        """下载完成，.part 改为正式文件"""
+        part = self.part_path(dest)
+        # 补算没有暂存在内存中的部分（续传前已下载的数据或超出暂存上限的数据块）
+        self._catch_up_hash(part, os.path.getsize(part))
+        os.replace(part, dest)
+        self.sha256 = self._hasher.hexdigest()
+        self.validators = {"etag": meta.get("etag", ""), "last_modified": meta.get("last_modified", "")}
+        self._remove_meta(dest)
+        logger.debug(f"下载完成: {dest}")
+        return dest
+
+    def _retry(self, attempt: Callable[[], None], progress: Callable[[], int]) -> None:
+        """执行 attempt，网络错误按指数退避重试；progress 返回已下载字节数，用于判断本次是否有进展"""
+        failures = 0
+        while True:
+            before = progress()
+            try:
+                attempt()
+                return
+            except DownloadError:
+                raise
+            except urllib.error.HTTPError as e:
+                if e.code not in self.RETRY_STATUS:
+                    raise DownloadError(f"HTTP {e.code}: {e.reason}") from e
+                error: Exception = e
+            except (urllib.error.URLError, http.client.HTTPException, TimeoutError, ConnectionError) as e:
+                error = e
+
+            # 本次有新数据写入时重新计算重试次数
+            failures = 0 if progress() > before else failures + 1
+            if failures > self.max_retries:
+                raise DownloadError(f"下载失败（已重试 {self.max_retries} 次）: {error}") from error
+            delay = min(self.backoff_base * (2 ** max(failures - 1, 0)), self.BACKOFF_MAX)
+            logger.warning(f"下载中断，{delay:.1f} 秒后重试 ({failures}/{self.max_retries}): {error}")
+            self._sleep(delay)
+
+    # SHA-256
+
+    def _reset_hash(self) -> None:
+        with self._hash_lock:
+            self._hasher = hashlib.sha256()
+            self._hashed = 0
+            self._pending.clear()
+            self._buffered = 0
+
+    def _update_hash(self, offset: int, chunk: bytes) -> None:
+        """写入位于 offset 的数据块：与已计算部分连续时计入 SHA-256，否则在上限内暂存"""
+        with self._hash_lock:
+            if offset != self._hashed:
+                if self._buffered + len(chunk) <= self.HASH_BUFFER_SIZE:
+                    self._pending[offset] = chunk
+                    self._buffered += len(chunk)
+                return
+            self._hasher.update(chunk)
+            self._hashed += len(chunk)
+            self._drain_pending()
+
+    def _drain_pending(self) -> None:
+        """依次计入紧接已计算部分的暂存数据块（调用方需持有 _hash_lock）"""
+        while (chunk := self._pending.pop(self._hashed, None)) is not None:
+            self._buffered -= len(chunk)
+            self._hasher.update(chunk)
+            self._hashed += len(chunk)
+
+    def _catch_up_hash(self, part: str, end: int) -> None:
+        """补算 [_hashed, end) 部分的 SHA-256：暂存的数据块直接使用，其余从文件读取"""
+        with self._hash_lock:
+            self._drain_pending()
+            if self._hashed >= end:
+                return
+            with open(part, "rb") as f:
+                while self._hashed < end:
+                    # 读到下一个暂存的数据块为止
+                    stop = min((offset for offset in self._pending if offset > self._hashed), default=end)
+                    f.seek(self._hashed)
+                    chunk = f.read(min(self.chunk_size, stop - self._hashed, end - self._hashed))
+                    if not chunk:
+                        break
+                    self._hasher.update(chunk)
+                    self._hashed += len(chunk)
+                    self._drain_pending()
+
+    # 分段并行下载
+
+    def _probe(self, url: str, dest: str, meta: dict) -> bool:
+        """探测服务器是否支持 Range 且文件足够大，是则写入分段信息"""
+        request = urllib.request.Request(url, headers={"User-Agent": self.USER_AGENT, "Range": "bytes=0-0"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                if response.status != 206:
+                    logger.debug("服务器不支持 Range，使用单连接下载")
+                    return False
+                match = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+                etag = response.headers.get("ETag", "")
+                last_modified = response.headers.get("Last-Modified", "")
+        except (urllib.error.URLError, http.client.HTTPException, TimeoutError, ConnectionError) as e:
+            logger.debug(f"Range 探测失败，使用单连接下载: {e}")
+            return False
+
+        if not match or match.group(3) == "*":
+            return False
+        total = int(match.group(3))
+        count = min(self.segments, total // self.MIN_SEGMENT_SIZE)
+        if count < 2:
+            return False
+
+        size = total // count
+        segments = [[i * size, (i + 1) * size - 1 if i < count - 1 else total - 1, 0] for i in range(count)]
+        with open(self.part_path(dest), "wb") as f:
+            # 预分配完整大小，各分段直接写入各自的位置
+            f.truncate(total)
+        meta.update({"url": url, "total": total, "etag": etag, "last_modified": last_modified, "segments": segments})
+        self._save_meta(dest, meta)
+        logger.debug(f"分 {count} 段并行下载, 共 {total} 字节")
+        return True
+
+    def _download_segments(
+        self,
+        url: str,
+        dest: str,
+        meta: dict,
+        progress_callback: Callable[[int, int], None] | None,
+        cancel_event: threading.Event | None
+    ) -> None:
+        """并行下载所有未完成的分段"""
+        part = self.part_path(dest)
+        total = meta["total"]
+        segments: list[list[int]] = meta["segments"]
+        if not os.path.exists(part) or os.path.getsize(part) != total:
+            raise _ResourceChangedError("未完成的分段下载文件已损坏")
+
+        lock = threading.Lock()
+        # 任一分段失败时通知其他分段停止
+        abort = threading.Event()
+        state = {"saved": sum(segment[2] for segment in segments)}
+
+        def downloaded() -> int:
+            return sum(segment[2] for segment in segments)
+
+        def on_chunk(segment: list[int], chunk: bytes) -> None:
+            self._update_hash(segment[0] + segment[2], chunk)
+            with lock:
+                segment[2] += len(chunk)
+                done = downloaded()
+                if done - state["saved"] >= self.META_SAVE_INTERVAL:
+                    state["saved"] = done
+                    self._save_meta(dest, meta)
+            if progress_callback:
+                progress_callback(done, total)
+
+        def run(segment: list[int]) -> None:
+            try:
+                self._retry(
+                    lambda: self._fetch_segment(url, part, meta, segment, on_chunk, cancel_event, abort),
+                    lambda: segment[2]
+                )
+            except BaseException:
+                abort.set()
+                raise
+
+        # 续传时先补算第一段已下载部分，之后第一段可以边下载边计算
+        self._catch_up_hash(part, segments[0][0] + segments[0][2])
+        pending = [segment for segment in segments if segment[0] + segment[2] <= segment[1]]
+        try:
+            with ThreadPoolExecutor(max_workers=len(pending) or 1, thread_name_prefix="wintoolbox-download") as pool:
+                futures = [pool.submit(run, segment) for segment in pending]
+                outcomes = [f.exception() for f in futures]
+        finally:
+            with lock:
+                self._save_meta(dest, meta)
+
+        # 优先报告真正的失败原因，而不是因其他分段失败而中止的分段
+        errors: list[BaseException] = [e for e in outcomes if e is not None]
+        for error in errors:
+            if not isinstance(error, _SegmentAbortedError):
+                raise error
+        if errors:
+            raise errors[0]
+
+    def _fetch_segment(
+        self,
+        url: str,
+        part: str,
+        meta: dict,
+        segment: list[int],
+        on_chunk: Callable[[list[int], bytes], None],
+        cancel_event: threading.Event | None,
+        abort: threading.Event
+    ) -> None:
+        """下载一个分段的剩余部分，写入预分配文件中的对应位置"""
+        start, end, done = segment
+        if start + done > end:
+            return
+
+        headers = {"User-Agent": self.USER_AGENT, "Range": f"bytes={start + done}-{end}"}
+        etag = meta.get("etag", "")
+        validator = (etag if not etag.startswith("W/") else "") or meta.get("last_modified")
+        if validator:
+            headers["If-Range"] = validator
+
+        request = urllib.request.Request(url, headers=headers)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            match = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+            if response.status != 206 or not match or int(match.group(1)) != start + done:
+                raise _ResourceChangedError("服务器未按请求返回分段")
+
+            with open(part, "r+b") as f:
+                f.seek(start + done)
+                while segment[0] + segment[2] <= end:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise DownloadCancelledError("下载已取消")
+                    if abort.is_set():
+                        raise _SegmentAbortedError("其他分段下载失败")
+                    chunk = response.read(min(self.chunk_size, end - (segment[0] + segment[2]) + 1))
+                    if not chunk:
+                        raise http.client.IncompleteRead(b"", end - (segment[0] + segment[2]) + 1)
+                    if self.limiter:
+                        self.limiter.consume(len(chunk))
+                    f.write(chunk)
+                    on_chunk(segment, chunk)
+
+    def _transfer(
+        self,
+        url: str,
+        dest: str,
+        offset: int,
+        meta: dict,
+        progress_callback: Callable[[int, int], None] | None,
+        cancel_event: threading.Event | None
+    ) -> None:
+        """发起一次请求并写入数据；网络错误向上抛出"""
+        part = self.part_path(dest)
+        headers = {"User-Agent": self.USER_AGENT}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            # 资源已变化时服务器返回完整内容而不是片段
+            # 弱 ETag 不能用于 If-Range
+            etag = meta.get("etag", "")
+            validator = (etag if not etag.startswith("W/") else "") or meta.get("last_modified")
+            if validator:
+                headers["If-Range"] = validator
+
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            response = urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and offset:
+                if offset == meta.get("total"):
+                    # 已全部下载，只是上次没来得及改名
+                    return
+                logger.debug("续传位置无效，重新下载")
+                self._reset(dest)
+                meta.clear()
+                return self._transfer(url, dest, 0, meta, progress_callback, cancel_event)
+            raise
+
+        with response:
+            total = self._handle_headers(response, dest, url, offset, meta)
+            mode = "ab" if response.status == 206 else "wb"
+            downloaded = offset if mode == "ab" else 0
+            if mode == "ab":
+                self._catch_up_hash(part, offset)
+            else:
+                self._reset_hash()
+
+            with open(part, mode) as f:
+                while True:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise DownloadCancelledError("下载已取消")
+                    chunk = response.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    if self.limiter:
+                        self.limiter.consume(len(chunk))
+                    f.write(chunk)
+                    self._update_hash(downloaded, chunk)
+                    downloaded += len(chunk)
+                    if progress_callback and total > 0:
+                        progress_callback(downloaded, total)
+
+        if total > 0 and downloaded < total:
+            raise http.client.IncompleteRead(b"", total - downloaded)
+
+    def _handle_headers(self, response, dest: str, url: str, offset: int, meta: dict) -> int:
+        """检查响应头并更新校验信息，返回总大小（未知时为 0）"""
+        if response.status == 206:
+            match = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+            if not match or int(match.group(1)) != offset:
+                self._reset(dest)
+                raise DownloadError("服务器返回的续传范围与请求不符")
+            total = int(match.group(3)) if match.group(3) != "*" else 0
+            logger.debug(f"从 {offset} 字节处续传")
+        else:
+            if offset:
+                logger.debug("服务器不支持续传或资源已变化，重新下载")
+            total = int(response.headers.get("Content-Length") or 0)
+
+        meta.update({
+            "url": url,
+            "total": total,
+            "etag": response.headers.get("ETag", "") if response.status != 206 else meta.get("etag", ""),
+            "last_modified": (
+                response.headers.get("Last-Modified", "") if response.status != 206 else meta.get("last_modified", "")
+            ),
+        })
+        self._save_meta(dest, meta)
+        return total
+
+    def _load_meta(self, dest: str, url: str) -> dict:
+        """读取续传校验信息，URL 不同时丢弃旧的 .part"""
+        try:
+            with open(self.meta_path(dest), encoding="utf-8") as f:
+                meta: dict = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+
+        if meta.get("url") != url:
+            self._reset(dest)
+            return {}
+        return meta
+
+    def _save_meta(self, dest: str, meta: dict) -> None:
+        with open(self.meta_path(dest), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def _remove_meta(self, dest: str) -> None:
+        try:
+            os.remove(self.meta_path(dest))
+        except FileNotFoundError:
+            pass
+
+    def _reset(self, dest: str) -> None:
+        """删除未完成的下载"""
+        for path in (self.part_path(dest), self.meta_path(dest)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,176 @@
+"""下载管理服务
+
+所有工具下载都提交到这里统一排队：同一工具的重复提交合并为一个任务，
+同时进行的下载数和总带宽由设置控制。下载界面读取任务状态，
+进度（含速度、剩余时间）经 progress 通道限频后交给主线程。
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from services.downloader import RateLimiter
+from services.progress import ProgressChannel
+from services.settings import SettingsService
+from services.tools import ToolsService
+from utils.logger import logger
+
+
+@dataclass(eq=False)
+class DownloadJob:
+    """下载任务"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    job_id: str                 # 工具 ID，同一工具同时只有一个任务
+    name: str
+    update: bool = False        # 更新已安装的工具（尽量增量更新）
+    state: str = QUEUED
+    downloaded: int = 0
+    total: int = 0
+    message: str = ""
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    # 结果为 (是否成功, 信息)
+    future: "Future[tuple[bool, str]]" = field(default_factory=Future)
+
+    @property
+    def active(self) -> bool:
+        """是否仍在排队或下载中"""
+        return self.state in (self.QUEUED, self.RUNNING)
+
+
+class DownloadManager:
+    """下载管理服务"""
+
+    # 线程池大小（同时下载数的上限）
+    MAX_WORKERS = 8
+
+    _lock = threading.Lock()
+    _executor: ThreadPoolExecutor | None = None
+    _jobs: dict[str, DownloadJob] = {}
+    _pending: deque[DownloadJob] = deque()
+    _running = 0
+    _limiter = RateLimiter()
+    # 所有任务共用的进度通道（以任务 ID 区分），由下载面板在主线程取出
+    progress = ProgressChannel()
+
+    @classmethod
+    def submit(cls, tool_id: str, update: bool = False) -> DownloadJob:
+        """提交下载任务；该工具已在排队或下载中时返回已有任务"""
+        tool = ToolsService.get_tool(tool_id)
+        with cls._lock:
+            job = cls._jobs.get(tool_id)
+            if job is not None and job.active:
+                logger.debug(f"下载任务已存在: {tool_id}")
+                return job
+
+            job = DownloadJob(job_id=tool_id, name=tool.name if tool else tool_id, update=update)
+            # 重新提交的任务排到列表末尾
+            cls._jobs.pop(tool_id, None)
+            cls._jobs[tool_id] = job
+            cls._pending.append(job)
+            logger.info(f"加入下载队列: {job.name}")
+            cls._dispatch()
+        return job
+
+    @classmethod
+    def cancel(cls, job_id: str) -> None:
+        """取消任务（排队中的直接移除，下载中的在下一个数据块时停止）"""
+        with cls._lock:
+            job = cls._jobs.get(job_id)
+            if job is None or not job.active:
+                return
+            job.cancel_event.set()
+            if job.state == DownloadJob.QUEUED:
+                cls._pending.remove(job)
+                cls._finish(job, False, "下载已取消")
+
+    @classmethod
+    def get_jobs(cls) -> list[DownloadJob]:
+        """所有任务（按提交顺序）"""
+        with cls._lock:
+            return list(cls._jobs.values())
+
+    @classmethod
+    def clear_finished(cls) -> None:
+        """移除已结束的任务"""
+        with cls._lock:
+            cls._jobs = {job_id: job for job_id, job in cls._jobs.items() if job.active}
+
+    @classmethod
+    def apply_settings(cls) -> None:
+        """应用设置中的并发数和带宽上限"""
+        settings = SettingsService.get()
+        cls._limiter.set_rate(max(settings.download_limit_kb, 0) * 1024)
+        with cls._lock:
+            cls._dispatch()
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """取消所有任务并关闭线程池"""
+        with cls._lock:
+            for job in cls._jobs.values():
+                job.cancel_event.set()
+            while cls._pending:
+                cls._finish(cls._pending.popleft(), False, "下载已取消")
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
+
+    @classmethod
+    def _max_concurrent(cls) -> int:
+        return max(1, min(SettingsService.get().max_downloads, cls.MAX_WORKERS))
+
+    @classmethod
+    def _dispatch(cls) -> None:
+        """在并发数允许时启动排队的任务（调用时持有 _lock）"""
+        while cls._pending and cls._running < cls._max_concurrent():
+            job = cls._pending.popleft()
+            job.state = DownloadJob.RUNNING
+            cls._running += 1
+            if cls._executor is None:
+                cls._limiter.set_rate(max(SettingsService.get().download_limit_kb, 0) * 1024)
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=cls.MAX_WORKERS,
+                    thread_name_prefix="wintoolbox-download-job"
+                )
+            cls._executor.submit(cls._run, job)
+
+    @classmethod
+    def _run(cls, job: DownloadJob) -> None:
+        """在线程池中执行下载任务"""
+        success, msg = False, ""
+
+        def on_progress(downloaded: int, total: int) -> None:
+            job.downloaded = downloaded
+            job.total = total
+            cls.progress.report(job.job_id, downloaded, total)
+
+        try:
+            install = ToolsService.update if job.update else ToolsService.download
+            success, msg = install(job.job_id, on_progress, job.cancel_event, cls._limiter)
+        except Exception as e:
+            logger.error(f"下载任务失败: {job.name}, 错误: {e}")
+            msg = f"下载失败: {e}"
+        finally:
+            with cls._lock:
+                cls._running -= 1
+                cls._finish(job, success, msg)
+                cls._dispatch()
+
+    @classmethod
+    def _finish(cls, job: DownloadJob, success: bool, msg: str) -> None:
+        if success:
+            job.state = DownloadJob.DONE
+        elif job.cancel_event.is_set():
+            job.state = DownloadJob.CANCELLED
+        else:
+            job.state = DownloadJob.FAILED
+        job.message = msg
+        cls.progress.finish(job.job_id, job.downloaded, job.total)
+        job.future.set_result((success, msg))
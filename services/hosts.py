@@ -1,48 +1,767 @@
 """HOSTS 文件服务"""
 
+import json
 import os
-from dataclasses import dataclass
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import IO
 
 from utils.logger import logger
 
 
+@dataclass(eq=False, slots=True)
+class HostsLine:
+    """HOSTS 文件中的一行（保留原始文本，含行尾换行符）"""
+    raw: str
+    ip: str = ""
+    domains: list[str] = field(default_factory=list)
+    comment: str = ""
+
+    @property
+    def is_entry(self) -> bool:
+        """是否为映射条目（否则为注释或空行）"""
+        return bool(self.ip)
+
+    @classmethod
+    def parse(cls, raw: str) -> "HostsLine":
+        """解析一行"""
+        if "#" in raw:
+            body, _, comment = raw.partition("#")
+            comment = comment.rstrip("\r\n")
+        else:
+            body, comment = raw, ""
+        parts = body.split()
+        if len(parts) >= 2:
+            return cls(raw, parts[0], parts[1:], comment)
+        return cls(raw, "", [], comment)
+
+
 @dataclass
 class HostsEntry:
     """HOSTS 条目"""
     ip: str
     domain: str
+    line: HostsLine | None = field(default=None, repr=False, compare=False)
+
+
+@dataclass
+class HostsPatch:
+    """HOSTS 变更：新增和删除的 (IP, 域名) 映射"""
+    added: list[tuple[str, str]] = field(default_factory=list)
+    removed: list[tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        """是否没有任何变更"""
+        return not self.added and not self.removed
+
+    def inverse(self) -> "HostsPatch":
+        """反向变更（用于撤销）"""
+        return HostsPatch(added=list(self.removed), removed=list(self.added))
+
+    @classmethod
+    def between(cls, old: Iterable[tuple[str, str]], new: Iterable[tuple[str, str]]) -> "HostsPatch":
+        """计算两组映射之间的差异（域名不区分大小写）"""
+        old_map = {(ip, domain.lower()): (ip, domain) for ip, domain in old}
+        new_map = {(ip, domain.lower()): (ip, domain) for ip, domain in new}
+        return cls(
+            added=[pair for key, pair in new_map.items() if key not in old_map],
+            removed=[pair for key, pair in old_map.items() if key not in new_map],
+        )
+
+    def to_dict(self) -> dict:
+        return {"added": [list(p) for p in self.added], "removed": [list(p) for p in self.removed]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HostsPatch":
+        return cls(
+            added=[(pair[0], pair[1]) for pair in data.get("added", [])],
+            removed=[(pair[0], pair[1]) for pair in data.get("removed", [])],
+        )
+
+
+def _address_family(ip: str) -> int:
+    """IPv6 与 IPv4 地址分开比较冲突"""
+    return 6 if ":" in ip else 4
+
+
+@dataclass
+class HostsImportResult:
+    """屏蔽列表导入结果"""
+    added: int = 0        # 新增的域名
+    skipped: int = 0      # 已存在相同映射或重复的域名
+    conflicts: int = 0    # 已映射到其他 IP 的域名（保留原有映射）
+    invalid: int = 0      # 无法识别的行
+
+
+# 域名（已转为小写）
+_DOMAIN_RE = re.compile(r"^(?=.{1,253}$)[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9_])?(?:\.[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9_])?)*$")
+# adblock 规则，如 "||example.com^"、"||example.com^$important"
+_ADBLOCK_RE = re.compile(r"^\|\|([^/^$*|]+)\^(?:\$(?:important|all|document))?$")
+# hosts 行首的 IP 地址
+_IP_RE = re.compile(r"^(?:\d{1,3}(?:\.\d{1,3}){3}|[0-9a-f:]*:[0-9a-f:.]*(?:%\w+)?)$", re.IGNORECASE)
+# 屏蔽列表中常见的本机名称，不导入
+_LOCAL_NAMES = frozenset({
+    "localhost", "localhost.localdomain", "local", "broadcasthost", "0.0.0.0",
+    "ip6-localhost", "ip6-loopback", "ip6-localnet", "ip6-mcastprefix",
+    "ip6-allnodes", "ip6-allrouters", "ip6-allhosts",
+})
+
+
+def parse_blocklist_line(line: str) -> list[str] | None:
+    """解析屏蔽列表中的一行，返回其中的域名（小写）
+
+    支持 hosts 格式、每行一个域名和 adblock 格式（仅 "||域名^" 规则）；
+    注释和空行返回空列表，无法识别的行返回 None。
+    """
+    line = line.strip()
+    if not line or line[0] in "#![":
+        return []
+
+    if line.startswith("||"):
+        match = _ADBLOCK_RE.match(line)
+        if not match:
+            return None
+        tokens = [match.group(1)]
+    else:
+        if line.startswith("@@"):
+            # adblock 例外规则
+            return None
+        tokens = line.split("#", 1)[0].split()
+        if len(tokens) > 1:
+            if not _IP_RE.match(tokens[0]):
+                return None
+            tokens = tokens[1:]
+
+    domains = []
+    for token in tokens:
+        domain = token.lower().rstrip(".")
+        if domain in _LOCAL_NAMES:
+            continue
+        # 纯 IP 地址也符合域名的字符规则，需单独排除
+        if not _DOMAIN_RE.match(domain) or _IP_RE.match(domain):
+            return None
+        domains.append(domain)
+    return domains
+
+
+def iter_blocklist(path: str, result: HostsImportResult | None = None) -> Iterator[str]:
+    """逐行读取屏蔽列表文件，依次产出其中的域名（不会整体读入内存）"""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            domains = parse_blocklist_line(line)
+            if domains is None:
+                if result is not None:
+                    result.invalid += 1
+                continue
+            yield from domains
+
+
+class HostsDocument:
+    """结构化的 HOSTS 文件
+
+    按行保存原始文本，序列化结果与读取内容逐字节一致；
+    维护 域名 -> 条目 的哈希索引，查找为 O(1)。
+    """
+
+    def __init__(self, lines: list[HostsLine] | None = None, newline: str = os.linesep):
+        self.lines: list[HostsLine] = lines or []
+        self.newline = newline
+        self._index: dict[str, list[HostsLine]] = {}
+        self._build_index()
+
+    @classmethod
+    def parse(cls, content: str) -> "HostsDocument":
+        """解析 HOSTS 内容（需保留原始换行符）"""
+        lines = [HostsLine.parse(raw) for raw in content.splitlines(keepends=True)]
+        newline = os.linesep
+        for line in lines:
+            if line.raw.endswith("\r\n"):
+                newline = "\r\n"
+                break
+            if line.raw.endswith("\n"):
+                newline = "\n"
+                break
+        return cls(lines, newline)
+
+    def serialize(self) -> str:
+        """序列化为文本"""
+        return "".join(line.raw for line in self.lines)
+
+    def _build_index(self) -> None:
+        """重建域名索引"""
+        self._index = {}
+        for line in self.lines:
+            self._index_line(line)
+
+    def _index_line(self, line: HostsLine) -> None:
+        index = self._index
+        for domain in line.domains:
+            key = domain.lower()
+            lines = index.get(key)
+            if lines is None:
+                index[key] = [line]
+            elif lines[-1] is not line:
+                lines.append(line)
+
+    def _unindex_line(self, line: HostsLine) -> None:
+        for domain in line.domains:
+            key = domain.lower()
+            lines = [item for item in self._index.get(key, []) if item is not line]
+            if lines:
+                self._index[key] = lines
+            else:
+                self._index.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __contains__(self, domain: str) -> bool:
+        return domain.lower() in self._index
+
+    def lookup(self, domain: str) -> list[HostsEntry]:
+        """查找域名对应的所有条目"""
+        key = domain.lower()
+        return [
+            HostsEntry(line.ip, name, line)
+            for line in self._index.get(key, [])
+            for name in line.domains
+            if name.lower() == key
+        ]
+
+    def domains(self) -> Iterable[str]:
+        """所有已映射的域名（小写）"""
+        return self._index.keys()
+
+    def search(self, keyword: str, limit: int | None = None) -> list[HostsLine]:
+        """按域名搜索条目所在的行：精确匹配优先，其次为包含关键字的域名"""
+        key = keyword.strip().lower()
+        if not key:
+            return list(self.lines)
+
+        groups = [self._index.get(key, [])]
+        groups.extend(lines for domain, lines in self._index.items() if key in domain and domain != key)
+
+        result: list[HostsLine] = []
+        seen: set[int] = set()
+        for lines in groups:
+            for line in lines:
+                if id(line) not in seen:
+                    seen.add(id(line))
+                    result.append(line)
+                    if limit is not None and len(result) >= limit:
+                        return result
+        return result
+
+    def entries(self) -> Iterator[HostsEntry]:
+        """按文件顺序遍历所有条目"""
+        for line in self.lines:
+            for domain in line.domains:
+                yield HostsEntry(line.ip, domain, line)
+
+    def entry_pairs(self) -> list[tuple[str, str]]:
+        """所有 (IP, 域名) 映射"""
+        return [(line.ip, domain) for line in self.lines for domain in line.domains]
+
+    def has_entry(self, ip: str, domain: str) -> bool:
+        """是否已存在该映射"""
+        return any(entry.ip == ip for entry in self.lookup(domain))
+
+    def apply(self, patch: HostsPatch) -> HostsPatch:
+        """应用变更，只改动涉及的行；返回实际生效的变更"""
+        applied = HostsPatch()
+        # 被删除的行最后一次性移除，大量删除（如撤销导入）时不必逐行在列表中查找
+        dropped: set[int] = set()
+        for ip, domain in patch.removed:
+            if self._remove(domain, ip, dropped):
+                applied.removed.append((ip, domain))
+        if dropped:
+            self.lines = [line for line in self.lines if id(line) not in dropped]
+        for ip, domain in patch.added:
+            if not self.has_entry(ip, domain):
+                self.add(ip, domain)
+                applied.added.append((ip, domain))
+        return applied
+
+    def duplicates(self) -> dict[str, list[HostsEntry]]:
+        """重复条目：同一域名被映射到同一 IP 多次"""
+        result = {}
+        for domain, lines in self._index.items():
+            entries = self.lookup(domain) if len(lines) > 1 else []
+            ips = [e.ip for e in entries]
+            if len(set(ips)) < len(ips):
+                result[domain] = entries
+        return result
+
+    def conflicts(self) -> dict[str, list[HostsEntry]]:
+        """冲突条目：同一域名在同一地址族下被映射到不同 IP"""
+        result = {}
+        for domain, lines in self._index.items():
+            if len(lines) > 1:
+                families: dict[int, set[str]] = {}
+                for line in lines:
+                    families.setdefault(_address_family(line.ip), set()).add(line.ip)
+                if any(len(ips) > 1 for ips in families.values()):
+                    result[domain] = self.lookup(domain)
+        return result
+
+    def add(self, ip: str, domain: str) -> HostsLine:
+        """在末尾追加一个条目"""
+        if self.lines and not self.lines[-1].raw.endswith(("\n", "\r")):
+            self.lines[-1].raw += self.newline
+        line = HostsLine(f"{ip}\t{domain}{self.newline}", ip, [domain])
+        self.lines.append(line)
+        self._index_line(line)
+        return line
+
+    def remove_line(self, line: HostsLine) -> None:
+        """删除一行"""
+        self.lines.remove(line)
+        self._unindex_line(line)
+
+    def remove(self, domain: str, ip: str | None = None) -> int:
+        """删除域名的映射（可限定 IP），返回删除的条目数
+
+        行内只有该域名时删除整行，否则仅从行内移除该域名。
+        """
+        dropped: set[int] = set()
+        removed = self._remove(domain, ip, dropped)
+        if dropped:
+            self.lines = [line for line in self.lines if id(line) not in dropped]
+        return removed
+
+    def _remove(self, domain: str, ip: str | None, dropped: set[int]) -> int:
+        """删除域名的映射；需要整行删除的行只从索引中移除并记入 dropped，由调用方从行列表中删除"""
+        key = domain.lower()
+        removed = 0
+        handled: set[int] = set()
+        for entry in self.lookup(domain):
+            line = entry.line
+            if line is None or id(line) in handled or (ip is not None and entry.ip != ip):
+                continue
+            handled.add(id(line))
+
+            remaining = [d for d in line.domains if d.lower() != key]
+            removed += len(line.domains) - len(remaining)
+            if not remaining:
+                self._unindex_line(line)
+                dropped.add(id(line))
+                continue
+
+            self._unindex_line(line)
+            ending = line.raw[len(line.raw.rstrip("\r\n")):]
+            comment = f"\t#{line.comment}" if line.comment else ""
+            line.raw = f"{line.ip}\t{' '.join(remaining)}{comment}{ending}"
+            line.domains = remaining
+            self._index_line(line)
+        return removed
+
+
+def _copy_acl(src: str, dst: str) -> bool:
+    """把 src 的 DACL（含是否继承）复制到 dst，成功返回 True
+
+    仅 Windows 需要：其他平台的权限位已由 shutil.copymode 复制。
+    所有者需要特权才能修改，保持为当前用户。
+    """
+    if sys.platform != "win32":
+        return True
+
+    import ctypes
+    from ctypes import wintypes
+
+    se_file_object = 1
+    dacl_security_information = 0x00000004
+    protected_dacl_security_information = 0x80000000
+    unprotected_dacl_security_information = 0x20000000
+    se_dacl_protected = 0x1000
+
+    advapi32 = ctypes.WinDLL("advapi32")
+    kernel32 = ctypes.WinDLL("kernel32")
+    dacl = ctypes.c_void_p()
+    descriptor = ctypes.c_void_p()
+    error = advapi32.GetNamedSecurityInfoW(
+        ctypes.c_wchar_p(src), se_file_object, dacl_security_information,
+        None, None, ctypes.byref(dacl), None, ctypes.byref(descriptor)
+    )
+    if error:
+        logger.debug(f"读取 HOSTS 权限失败: {error}")
+        return False
+    try:
+        control = wintypes.WORD()
+        revision = wintypes.DWORD()
+        if not advapi32.GetSecurityDescriptorControl(descriptor, ctypes.byref(control), ctypes.byref(revision)):
+            return False
+        info = dacl_security_information | (
+            protected_dacl_security_information if control.value & se_dacl_protected
+            else unprotected_dacl_security_information
+        )
+        error = advapi32.SetNamedSecurityInfoW(ctypes.c_wchar_p(dst), se_file_object, info, None, None, dacl, None)
+        if error:
+            logger.debug(f"设置临时文件权限失败: {error}")
+        return error == 0
+    finally:
+        kernel32.LocalFree(descriptor)
+
+
+# 日志记录开头的编号，如 {"id": 12, ...}
+_JOURNAL_ID_RE = re.compile(r'^\{"id": (\d+)[,}]')
+# 读取和复制大记录时的分块大小
+_JOURNAL_CHUNK_SIZE = 64 * 1024
 
 
 class HostsService:
-    """HOSTS 文件管理服务"""
+    """HOSTS 文件管理服务
+
+    写入均通过临时文件 + 原子替换完成，写入前可保留备份；
+    每次写入的条目变更（新增/删除的映射）都记录到追加式日志中，可逐条撤销。
+    """
 
     HOSTS_PATH = r"C:\Windows\System32\drivers\etc\hosts"
+    # 环境变量可覆盖 HOSTS 路径（用于测试）
+    HOSTS_PATH_ENV = "WINTOOLBOX_HOSTS_PATH"
+    # 保留的备份数量（0 表示不备份）
+    BACKUP_COUNT = 5
+
+    _path: str | None = None
+    _config_dir = os.path.join(os.path.expanduser("~"), ".wintoolbox")
+    _backup_dir = os.path.join(_config_dir, "hosts_backups")
+    _journal_file = os.path.join(_config_dir, "hosts_journal.jsonl")
 
     @classmethod
     def get_path(cls) -> str:
         """获取 HOSTS 文件路径"""
-        return cls.HOSTS_PATH
+        return cls._path or os.environ.get(cls.HOSTS_PATH_ENV) or cls.HOSTS_PATH
+
+    @classmethod
+    def set_path(cls, path: str | None) -> None:
+        """设置 HOSTS 文件路径（None 恢复默认）"""
+        cls._path = path
 
     @classmethod
     def get_directory(cls) -> str:
         """获取 HOSTS 文件所在目录"""
-        return os.path.dirname(cls.HOSTS_PATH)
+        return os.path.dirname(cls.get_path())
 
     @classmethod
     def read(cls) -> str:
         """读取 HOSTS 文件内容"""
-        logger.debug(f"读取 HOSTS 文件: {cls.HOSTS_PATH}")
-        with open(cls.HOSTS_PATH, encoding="utf-8") as f:
+        path = cls.get_path()
+        logger.debug(f"读取 HOSTS 文件: {path}")
+        with open(path, encoding="utf-8") as f:
             return f.read()
 
     @classmethod
-    def write(cls, content: str) -> None:
-        """写入 HOSTS 文件内容"""
-        logger.info(f"写入 HOSTS 文件: {cls.HOSTS_PATH}")
-        with open(cls.HOSTS_PATH, "w", encoding="utf-8") as f:
-            f.write(content)
+    def write(cls, content: str, journal: bool = True) -> None:
+        """写入 HOSTS 文件内容（换行符按平台转换）"""
+        path = cls.get_path()
+        logger.info(f"写入 HOSTS 文件: {path}")
+        old_pairs = cls._disk_pairs() if journal else []
+        cls._atomic_write(content, newline=None)
+        if journal:
+            cls._journal_rewrite(old_pairs, HostsDocument.parse(content).entry_pairs())
+        logger.info("HOSTS 文件保存成功")
+
+    @classmethod
+    def load(cls) -> HostsDocument:
+        """读取并解析 HOSTS 文件（保留原始换行符）"""
+        path = cls.get_path()
+        logger.debug(f"解析 HOSTS 文件: {path}")
+        with open(path, encoding="utf-8", newline="") as f:
+            document = HostsDocument.parse(f.read())
+        logger.debug(f"HOSTS 文件共 {len(document)} 行")
+        return document
+
+    @classmethod
+    def save(cls, document: HostsDocument, journal: bool = True) -> None:
+        """保存结构化 HOSTS 内容（逐字节写出原始文本）"""
+        path = cls.get_path()
+        logger.info(f"写入 HOSTS 文件: {path}")
+        old_pairs = cls._disk_pairs() if journal else []
+        cls._atomic_write(document.serialize(), newline="")
+        if journal:
+            cls._journal_rewrite(old_pairs, document.entry_pairs())
         logger.info("HOSTS 文件保存成功")
 
+    @classmethod
+    def _disk_pairs(cls) -> list[tuple[str, str]]:
+        """磁盘上当前的映射（文件不存在时为空）"""
+        if not os.path.exists(cls.get_path()):
+            return []
+        return cls.load().entry_pairs()
+
+    @classmethod
+    def _journal_rewrite(cls, old_pairs: list[tuple[str, str]], new_pairs: list[tuple[str, str]]) -> None:
+        """整体写入后把映射的变化记入日志（注释和格式的修改不记录，撤销时只恢复条目）"""
+        patch = HostsPatch.between(old_pairs, new_pairs)
+        if not patch.is_empty:
+            cls._append_journal(patch)
+
+    @classmethod
+    def apply_patch(cls, patch: HostsPatch, journal: bool = True) -> HostsPatch:
+        """把变更应用到磁盘上的 HOSTS 文件，返回实际生效的变更
+
+        只改动新增/删除条目所在的行，其余内容保持不变；生效的变更记入日志。
+        """
+        document = cls.load()
+        applied = document.apply(patch)
+        if applied.is_empty:
+            logger.debug("HOSTS 无需变更")
+            return applied
+
+        logger.info(f"应用 HOSTS 变更: 新增 {len(applied.added)} 条, 删除 {len(applied.removed)} 条")
+        cls._atomic_write(document.serialize(), newline="")
+        if journal:
+            cls._append_journal(applied)
+        return applied
+
+    @classmethod
+    def import_blocklists(cls, paths: Iterable[str], ip: str = "0.0.0.0", dry_run: bool = False) -> HostsImportResult:
+        """把屏蔽列表文件合并到 HOSTS，所有新增域名映射到 ip
+
+        单遍流式处理：逐行读取源文件，新条目直接写入临时文件后原子替换，
+        新增的映射同时分块写入临时日志文件，最后整条拼接到变更日志中，可整体撤销。
+        内存中只保留用于去重的新增域名，与源文件大小无关。
+        已存在相同映射的域名计为跳过，已映射到其他 IP 的域名计为冲突且不写入。
+        """
+        document = cls.load()
+        result = HostsImportResult()
+
+        if dry_run:
+            for _ in cls._merge_blocklists(document, list(paths), ip, result, None):
+                pass
+            return result
+
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as added:
+            chunks = cls._merge_blocklists(document, list(paths), ip, result, added)
+            tmp_path = cls._write_temp(chunks, newline="")
+            if result.added:
+                cls._replace(tmp_path)
+                added.seek(0)
+                cls._append_journal_spooled(added)
+            else:
+                os.remove(tmp_path)
+        logger.info(
+            f"导入屏蔽列表: 新增 {result.added}, 跳过 {result.skipped}, "
+            f"冲突 {result.conflicts}, 无法识别 {result.invalid}"
+        )
+        return result
+
+    @staticmethod
+    def _merge_blocklists(
+        document: HostsDocument,
+        paths: list[str],
+        ip: str,
+        result: HostsImportResult,
+        added: IO[str] | None
+    ) -> Iterator[str]:
+        """依次产出合并后的文件内容：原有内容 + 每个源文件的新增条目
+
+        新增的映射以逗号分隔的 JSON 数组写入 added（日志记录中 "added" 数组的内容）。
+        """
+        newline = document.newline
+        content = document.serialize()
+        yield content
+        if content and not content.endswith(("\n", "\r")):
+            yield newline
+
+        family = _address_family(ip)
+        ip_json = json.dumps(ip, ensure_ascii=False)
+        # 只记录本次新增或冲突的域名；已有相同映射的重复域名由索引判断为跳过
+        seen: set[str] = set()
+        for path in paths:
+            header = f"# 导入自 {os.path.basename(path)}{newline}"
+            for domain in iter_blocklist(path, result):
+                if domain in seen:
+                    result.skipped += 1
+                    continue
+
+                if domain in document:
+                    ips = {e.ip for e in document.lookup(domain) if _address_family(e.ip) == family}
+                    if ip in ips:
+                        result.skipped += 1
+                        continue
+                    if ips:
+                        seen.add(domain)
+                        result.conflicts += 1
+                        continue
+
+                if header:
+                    yield header
+                    header = ""
+                seen.add(domain)
+                if added is not None:
+                    # 域名已通过 _DOMAIN_RE 校验，不含需要 JSON 转义的字符
+                    added.write(f'{"," if result.added else ""}[{ip_json}, "{domain}"]')
+                result.added += 1
+                yield f"{ip}\t{domain}{newline}"
+
+    @classmethod
+    def undo(cls) -> HostsPatch | None:
+        """撤销最近一次未撤销的变更，没有可撤销的变更时返回 None"""
+        path = cls.get_path()
+        records = [r for r in cls.read_journal() if r.get("path") == path]
+        undone = {r["undo_of"] for r in records if r.get("undo_of") is not None}
+        for record in reversed(records):
+            if record.get("undo_of") is None and record["id"] not in undone:
+                patch = HostsPatch.from_dict(record).inverse()
+                applied = cls.apply_patch(patch, journal=False)
+                cls._append_journal(applied, undo_of=record["id"])
+                logger.info(f"已撤销 HOSTS 变更 #{record['id']}")
+                return applied
+        return None
+
+    @classmethod
+    def read_journal(cls) -> list[dict]:
+        """读取变更日志"""
+        records: list[dict] = []
+        if not os.path.exists(cls._journal_file):
+            return records
+        with open(cls._journal_file, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # 忽略写入中断留下的残行
+                    logger.warning(f"跳过损坏的 HOSTS 日志行: {line[:80]}")
+        return records
+
+    @classmethod
+    def _last_journal_id(cls) -> int:
+        """最后一条日志记录的编号
+
+        导入的记录可能很大，每行只读取开头的编号，其余部分分块跳过；
+        写入中断留下的残行同样占用编号，不影响编号递增。
+        """
+        last = 0
+        if not os.path.exists(cls._journal_file):
+            return last
+        with open(cls._journal_file, encoding="utf-8") as f:
+            while head := f.readline(64):
+                match = _JOURNAL_ID_RE.match(head)
+                if match:
+                    last = int(match.group(1))
+                line = head
+                while line and not line.endswith("\n"):
+                    line = f.readline(_JOURNAL_CHUNK_SIZE)
+        return last
+
+    @classmethod
+    def _journal_record(cls, patch: HostsPatch, undo_of: int | None = None) -> dict:
+        """变更记录（编号为下一个可用编号）"""
+        return {
+            "id": cls._last_journal_id() + 1,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "path": cls.get_path(),
+            "undo_of": undo_of,
+            **patch.to_dict(),
+        }
+
+    @classmethod
+    def _append_journal(cls, patch: HostsPatch, undo_of: int | None = None) -> None:
+        """追加一条变更记录"""
+        record = cls._journal_record(patch, undo_of)
+        os.makedirs(cls._config_dir, exist_ok=True)
+        with open(cls._journal_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    @classmethod
+    def _append_journal_spooled(cls, added: IO[str]) -> None:
+        """追加一条只有新增映射的变更记录，"added" 数组的内容从 added 中分块复制"""
+        record = cls._journal_record(HostsPatch())
+        del record["added"]
+        head = json.dumps(record, ensure_ascii=False)
+        os.makedirs(cls._config_dir, exist_ok=True)
+        with open(cls._journal_file, "a", encoding="utf-8") as f:
+            f.write(head[:-1] + ', "added": [')
+            shutil.copyfileobj(added, f, _JOURNAL_CHUNK_SIZE)
+            f.write("]}\n")
+
+    @classmethod
+    def _atomic_write(cls, content: str | Iterable[str], newline: str | None) -> None:
+        """写入临时文件后原子替换，避免写入中断损坏 HOSTS"""
+        cls._replace(cls._write_temp(content, newline))
+
+    @classmethod
+    def _write_temp(cls, content: str | Iterable[str], newline: str | None) -> str:
+        """把内容（字符串或分块迭代器）写入 HOSTS 同目录下的临时文件，返回其路径"""
+        path = cls.get_path()
+        directory = os.path.dirname(path) or "."
+        chunks = [content] if isinstance(content, str) else content
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".hosts.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline=newline) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(path):
+                shutil.copymode(path, tmp_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return tmp_path
+
+    @classmethod
+    def _replace(cls, tmp_path: str) -> None:
+        """备份当前文件后用临时文件原子替换
+
+        替换后文件使用临时文件的权限，因此先把原文件的 ACL 复制过去；
+        无法复制时改为在备份之后原地覆盖写入，保留原文件的 ACL。
+        """
+        path = cls.get_path()
+        try:
+            if not os.path.exists(path):
+                os.replace(tmp_path, path)
+                return
+            cls._backup(path)
+            if _copy_acl(path, tmp_path):
+                os.replace(tmp_path, path)
+            else:
+                logger.warning(f"无法复制 HOSTS 文件的权限，改为原地写入: {path}")
+                shutil.copyfile(tmp_path, path)
+                os.remove(tmp_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def _backup(cls, path: str) -> None:
+        """备份当前文件，只保留最近 BACKUP_COUNT 份"""
+        if cls.BACKUP_COUNT <= 0:
+            return
+        os.makedirs(cls._backup_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{time.time_ns() % 1_000_000_000:09d}"
+        shutil.copy2(path, os.path.join(cls._backup_dir, f"hosts.{stamp}.bak"))
+
+        backups = sorted(f for f in os.listdir(cls._backup_dir) if f.startswith("hosts.") and f.endswith(".bak"))
+        for name in backups[:-cls.BACKUP_COUNT]:
+            try:
+                os.remove(os.path.join(cls._backup_dir, name))
+            except OSError as e:
+                logger.warning(f"删除旧 HOSTS 备份失败: {name}, {e}")
+
+    @classmethod
+    def list_backups(cls) -> list[str]:
+        """列出备份文件（从旧到新）"""
+        if not os.path.exists(cls._backup_dir):
+            return []
+        return [
+            os.path.join(cls._backup_dir, f)
+            for f in sorted(os.listdir(cls._backup_dir))
+            if f.startswith("hosts.") and f.endswith(".bak")
+        ]
+
     @staticmethod
     def format_entry(ip: str, domain: str) -> str:
         """格式化 HOSTS 条目"""
@@ -1,83 +1,262 @@
 """网络信息服务"""
 
+import ipaddress
 import re
-from dataclasses import dataclass
+import threading
+import time
+from dataclasses import dataclass, field
 
 from utils.system import run_command
 
 
-@dataclass
+@dataclass(slots=True)
 class AdapterInfo:
-    """网络适配器信息"""
+    """网络适配器信息
+
+    ipv4/mask/gateway/dns 为首选值（用于表格显示），完整的多值字段见对应列表。
+    地址保留 ipconfig 的原始文本（IPv6 可能带区域 ID），整数形式和 ipaddress 对象按需生成。
+    """
     name: str = ""
     ipv4: str = ""
     mask: str = ""
     gateway: str = ""
     dns: str = ""
     mac: str = ""
+    description: str = ""
+    dns_suffix: str = ""
+    media_state: str = ""
+    dhcp_enabled: bool = False
+    autoconfig_enabled: bool = False
+    dhcp_server: str = ""
+    dhcpv6_iaid: str = ""
+    dhcpv6_duid: str = ""
+    lease_obtained: str = ""
+    lease_expires: str = ""
+    netbios: str = ""
+    ipv4_addresses: list[str] = field(default_factory=list)
+    masks: list[str] = field(default_factory=list)
+    ipv6_addresses: list[str] = field(default_factory=list)
+    gateways: list[str] = field(default_factory=list)
+    dns_servers: list[str] = field(default_factory=list)
+    wins_servers: list[str] = field(default_factory=list)
+    extra: dict[str, str] = field(default_factory=dict)  # 未识别的字段
+
+    @property
+    def ipv4_int(self) -> int | None:
+        """首选 IPv4 地址的整数形式"""
+        try:
+            return int(ipaddress.IPv4Address(self.ipv4))
+        except ValueError:
+            return None
+
+    @property
+    def interface(self) -> ipaddress.IPv4Interface | None:
+        """首选 IPv4 地址及其子网（用于网段包含判断）"""
+        try:
+            return ipaddress.IPv4Interface(f"{self.ipv4}/{self.mask}")
+        except ValueError:
+            return None
+
+
+# 适配器标题行，如 "Ethernet adapter 以太网:"、"以太网适配器 以太网:"
+_ADAPTER_HEADER_RE = re.compile(r"^\S.*(?:adapter|适配器).*:\s*$", re.IGNORECASE)
+# 字段行，如 "   IPv4 Address. . . . . : 192.168.1.100(Preferred)"
+_FIELD_RE = re.compile(r"^\s+(?P<label>\S[^:]*?)[ .]*[ .]:(?: (?P<value>.*))?$")
+# 续行（多值字段的后续值），如 "                           8.8.8.8"
+_CONTINUATION_RE = re.compile(r"^\s+(?P<value>\S+)\s*$")
+# 地址后缀，如 "(Preferred)"、"(首选)"
+_ADDRESS_SUFFIX_RE = re.compile(r"\([^()]*\)$")
+
+# 字段类型
+_EXTRA = -1    # 未识别字段
+_TEXT = 0      # 文本
+_FLAG = 1      # 是/否
+_LIST = 2      # 多值
+_ADDRESS = 3   # 多值地址（去除状态后缀）
+
+# 字段表：标签 -> (属性名, 字段类型)，中英文标签均可识别
+_FIELD_TABLE: dict[str, tuple[str, int]] = {}
+for _labels, _attr, _kind in [
+    (("Description", "描述"), "description", _TEXT),
+    (("Physical Address", "物理地址"), "mac", _TEXT),
+    (("Connection-specific DNS Suffix", "连接特定的 DNS 后缀"), "dns_suffix", _TEXT),
+    (("Media State", "媒体状态"), "media_state", _TEXT),
+    (("DHCP Enabled", "DHCP 已启用"), "dhcp_enabled", _FLAG),
+    (("Autoconfiguration Enabled", "自动配置已启用"), "autoconfig_enabled", _FLAG),
+    (("IPv4 Address", "IP Address", "Autoconfiguration IPv4 Address",
+      "IPv4 地址", "IP 地址", "自动配置 IPv4 地址"), "ipv4_addresses", _ADDRESS),
+    (("Subnet Mask", "子网掩码"), "masks", _LIST),
+    (("IPv6 Address", "Temporary IPv6 Address", "Link-local IPv6 Address",
+      "IPv6 地址", "临时 IPv6 地址", "本地链接 IPv6 地址"), "ipv6_addresses", _ADDRESS),
+    (("Default Gateway", "默认网关"), "gateways", _ADDRESS),
+    (("DHCP Server", "DHCP 服务器"), "dhcp_server", _TEXT),
+    (("DHCPv6 IAID",), "dhcpv6_iaid", _TEXT),
+    (("DHCPv6 Client DUID", "DHCPv6 客户端 DUID"), "dhcpv6_duid", _TEXT),
+    (("DNS Servers", "DNS 服务器"), "dns_servers", _ADDRESS),
+    (("Primary WINS Server", "Secondary WINS Server", "主 WINS 服务器", "辅助 WINS 服务器"),
+     "wins_servers", _ADDRESS),
+    (("NetBIOS over Tcpip", "TCPIP 上的 NetBIOS"), "netbios", _TEXT),
+    (("Lease Obtained", "获得租约的时间"), "lease_obtained", _TEXT),
+    (("Lease Expires", "租约过期的时间"), "lease_expires", _TEXT),
+]:
+    for _label in _labels:
+        _FIELD_TABLE[_label] = (_attr, _kind)
+
+
+@dataclass
+class IPConfigSnapshot:
+    """一次 ipconfig /all 的结果快照"""
+    output: str = ""
+    adapters: list[AdapterInfo] = field(default_factory=list)
+    timestamp: float = 0.0
+
+    @property
+    def age(self) -> float:
+        """快照已存在的秒数"""
+        return time.monotonic() - self.timestamp
 
 
 class NetworkService:
     """网络信息服务"""
 
+    # ipconfig 命令超时（秒）
+    COMMAND_TIMEOUT = 30
+    # 快照缓存有效期（秒）
+    SNAPSHOT_TTL = 5.0
+
+    _snapshot: IPConfigSnapshot | None = None
+    _snapshot_lock = threading.Lock()
+
     @classmethod
-    def get_ipconfig_output(cls) -> str:
-        """获取 ipconfig /all 输出"""
-        result = run_command(["ipconfig", "/all"])
+    def get_snapshot(cls, max_age: float | None = None) -> IPConfigSnapshot:
+        """获取 ipconfig 快照（原始输出 + 适配器列表，只启动一次进程）
+
+        缓存未超过 max_age 秒（默认 SNAPSHOT_TTL）时直接复用，max_age=0 强制刷新。
+        """
+        if max_age is None:
+            max_age = cls.SNAPSHOT_TTL
+
+        with cls._snapshot_lock:
+            snapshot = cls._snapshot
+            if snapshot is not None and snapshot.age <= max_age:
+                return snapshot
+
+            return cls._store_snapshot(cls.fetch_output())
+
+    @classmethod
+    def fetch_output(cls) -> str:
+        """执行 ipconfig /all 并返回原始输出（不使用缓存）"""
+        result = run_command(["ipconfig", "/all"], timeout=cls.COMMAND_TIMEOUT)
         return str(result.stdout) if result.stdout else ""
 
     @classmethod
-    def get_adapters(cls) -> list[AdapterInfo]:
+    def snapshot_from_output(cls, output: str) -> IPConfigSnapshot:
+        """由 ipconfig /all 原始输出建立快照，并更新快照缓存"""
+        with cls._snapshot_lock:
+            return cls._store_snapshot(output)
+
+    @classmethod
+    def _store_snapshot(cls, output: str) -> IPConfigSnapshot:
+        """解析输出并写入缓存（调用方需持有 _snapshot_lock）"""
+        snapshot = IPConfigSnapshot(
+            output=output,
+            adapters=cls._parse_ipconfig(output),
+            timestamp=time.monotonic()
+        )
+        cls._snapshot = snapshot
+        return snapshot
+
+    @classmethod
+    def invalidate_snapshot(cls) -> None:
+        """清除快照缓存"""
+        with cls._snapshot_lock:
+            cls._snapshot = None
+
+    @classmethod
+    def get_ipconfig_output(cls, max_age: float | None = None) -> str:
+        """获取 ipconfig /all 输出"""
+        return cls.get_snapshot(max_age).output
+
+    @classmethod
+    def get_adapters(cls, max_age: float | None = None) -> list[AdapterInfo]:
         """获取所有网络适配器信息"""
-        output = cls.get_ipconfig_output()
-        return cls._parse_ipconfig(output)
+        return cls.get_snapshot(max_age).adapters
 
     @classmethod
     def _parse_ipconfig(cls, output: str) -> list[AdapterInfo]:
-        """解析 ipconfig 输出"""
-        adapters = []
+        """解析 ipconfig /all 输出（单遍扫描）"""
+        adapters: list[AdapterInfo] = []
         current: AdapterInfo | None = None
+        # 最近一个字段，用于把续行归入多值字段
+        last_attr = ""
+        last_kind = _TEXT
+
+        for line in output.splitlines():
+            if not line.strip():
+                continue
 
-        for line in output.split("\n"):
             # 检测适配器名称
-            if "适配器" in line or "adapter" in line.lower():
-                if current and current.ipv4:
-                    adapters.append(current)
-                name = line.replace(":", "").strip()
-                current = AdapterInfo(name=name)
-            elif current:
-                line = line.strip()
-                cls._parse_adapter_line(current, line)
+            if not line[0].isspace():
+                if current:
+                    cls._finish_adapter(current, adapters)
+                current = None
+                if _ADAPTER_HEADER_RE.match(line):
+                    current = AdapterInfo(name=line.replace(":", "").strip())
+                last_attr = ""
+                continue
+
+            if current is None:
+                continue
+
+            match = _FIELD_RE.match(line)
+            if match:
+                label = match.group("label")
+                value = (match.group("value") or "").strip()
+                attr, kind = _FIELD_TABLE.get(label, ("", _TEXT))
+                if not attr:
+                    current.extra[label] = value
+                    last_attr, last_kind = label, _EXTRA
+                    continue
+                cls._set_field(current, attr, kind, value)
+                last_attr, last_kind = attr, kind
+                continue
+
+            match = _CONTINUATION_RE.match(line)
+            if match and last_attr:
+                value = match.group("value")
+                if last_kind == _EXTRA:
+                    current.extra[last_attr] = f"{current.extra[last_attr]}, {value}".lstrip(", ")
+                elif last_kind >= _LIST:
+                    cls._set_field(current, last_attr, last_kind, value)
 
         # 添加最后一个适配器
-        if current and current.ipv4:
-            adapters.append(current)
+        if current:
+            cls._finish_adapter(current, adapters)
 
         return adapters
 
-    @classmethod
-    def _parse_adapter_line(cls, adapter: AdapterInfo, line: str) -> None:
-        """解析适配器信息行"""
-        ip_pattern = r"(\d+\.\d+\.\d+\.\d+)"
-        mac_pattern = r"([0-9A-Fa-f-]{17})"
+    @staticmethod
+    def _set_field(adapter: AdapterInfo, attr: str, kind: int, value: str) -> None:
+        """按字段类型写入适配器信息"""
+        if kind == _TEXT:
+            setattr(adapter, attr, value)
+        elif kind == _FLAG:
+            setattr(adapter, attr, value.lower() in ("yes", "是"))
+        elif value:
+            if kind == _ADDRESS:
+                value = _ADDRESS_SUFFIX_RE.sub("", value)
+            getattr(adapter, attr).append(value)
 
-        if "IPv4" in line or "IP Address" in line:
-            match = re.search(ip_pattern, line)
-            if match:
-                adapter.ipv4 = match.group(1)
-        elif "子网掩码" in line or "Subnet Mask" in line:
-            match = re.search(ip_pattern, line)
-            if match:
-                adapter.mask = match.group(1)
-        elif "默认网关" in line or "Default Gateway" in line:
-            match = re.search(ip_pattern, line)
-            if match:
-                adapter.gateway = match.group(1)
-        elif "DNS 服务器" in line or "DNS Servers" in line:
-            match = re.search(ip_pattern, line)
-            if match:
-                adapter.dns = match.group(1)
-        elif "物理地址" in line or "Physical Address" in line:
-            match = re.search(mac_pattern, line)
-            if match:
-                adapter.mac = match.group(1)
+    @staticmethod
+    def _finish_adapter(adapter: AdapterInfo, adapters: list[AdapterInfo]) -> None:
+        """填充首选值，只保留配置了 IPv4 地址的适配器（与表格显示一致）"""
+        if not adapter.ipv4_addresses:
+            return
+
+        adapter.ipv4 = adapter.ipv4_addresses[0]
+        adapter.mask = adapter.masks[0] if adapter.masks else ""
+        # 优先显示 IPv4 网关
+        ipv4_gateways = [g for g in adapter.gateways if ":" not in g]
+        adapter.gateway = (ipv4_gateways or adapter.gateways or [""])[0]
+        adapter.dns = adapter.dns_servers[0] if adapter.dns_servers else ""
+        adapters.append(adapter)
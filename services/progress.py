@@ -0,0 +1,112 @@
+"""下载进度通道
+
+下载线程每写入一个数据块就报告一次进度，通道按最高频率合并这些报告，
+并计算下载速度和剩余时间后放入队列；主线程用 after() 定时取出，工作线程不直接操作 Tk 控件。
+被合并的报告只保留最新一条，在主线程下一次取出时补发，进度停止变化时显示的也是最新值。
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
+class ProgressUpdate:
+    """一次进度更新"""
+    downloaded: int
+    total: int                # 0 表示总大小未知
+    speed: float = 0.0        # 字节/秒
+    eta: float | None = None  # 剩余秒数，无法估计时为 None
+    done: bool = False
+
+    @property
+    def percent(self) -> int | None:
+        return self.downloaded * 100 // self.total if self.total else None
+
+
+@dataclass(slots=True)
+class _KeyState:
+    last_emit: float = float("-inf")
+    # 被限频合并、尚未发出的最新进度 (已下载, 总大小)
+    pending: tuple[int, int] | None = None
+    # 最近 SPEED_WINDOW 秒内的 (时间, 已下载字节)
+    samples: deque = field(default_factory=deque)
+
+
+class ProgressChannel:
+    """线程安全、限频的进度通道"""
+
+    # 每个任务每秒最多发出的更新次数
+    MAX_RATE = 20
+    # 计算速度的时间窗口（秒）
+    SPEED_WINDOW = 3.0
+    # 主线程取出更新的间隔（毫秒）
+    POLL_MS = 1000 // MAX_RATE
+
+    def __init__(self, max_rate: float | None = None, clock: Callable[[], float] = time.monotonic):
+        self.min_interval = 1.0 / (max_rate or self.MAX_RATE)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._states: dict[Hashable, _KeyState] = {}
+        self._queue: queue.SimpleQueue[tuple[Hashable, ProgressUpdate]] = queue.SimpleQueue()
+
+    def report(self, key: Hashable, downloaded: int, total: int) -> None:
+        """报告 key 的进度（任意线程），距上次发出不足最小间隔时合并，下载完成时总会发出"""
+        now = self._clock()
+        with self._lock:
+            state = self._states.setdefault(key, _KeyState())
+            complete = total > 0 and downloaded >= total
+            if now - state.last_emit < self.min_interval and not complete:
+                state.pending = (downloaded, total)
+                return
+            state.last_emit = now
+            state.pending = None
+            update = self._measure(state, now, downloaded, total)
+        self._queue.put((key, update))
+
+    def finish(self, key: Hashable, downloaded: int, total: int) -> None:
+        """任务结束：发出最终状态并清除 key 的统计"""
+        with self._lock:
+            self._states.pop(key, None)
+        self._queue.put((key, ProgressUpdate(downloaded, total, done=True)))
+
+    def drain(self) -> dict[Hashable, ProgressUpdate]:
+        """取出所有待处理的更新，每个 key 只保留最新的一条（在主线程调用）
+
+        距上次发出已满最小间隔的 key，补发被合并的最新进度。
+        """
+        now = self._clock()
+        with self._lock:
+            for key, state in self._states.items():
+                if state.pending is not None and now - state.last_emit >= self.min_interval:
+                    downloaded, total = state.pending
+                    state.pending = None
+                    state.last_emit = now
+                    self._queue.put((key, self._measure(state, now, downloaded, total)))
+
+        latest: dict[Hashable, ProgressUpdate] = {}
+        while True:
+            try:
+                key, update = self._queue.get_nowait()
+            except queue.Empty:
+                return latest
+            latest[key] = update
+
+    def _measure(self, state: _KeyState, now: float, downloaded: int, total: int) -> ProgressUpdate:
+        """按时间窗口内的增量计算速度和剩余时间"""
+        samples = state.samples
+        if samples and downloaded < samples[-1][1]:
+            # 重新开始下载
+            samples.clear()
+        samples.append((now, downloaded))
+        while len(samples) > 2 and now - samples[1][0] >= self.SPEED_WINDOW:
+            samples.popleft()
+
+        start_time, start_bytes = samples[0]
+        elapsed = now - start_time
+        speed = (downloaded - start_bytes) / elapsed if elapsed > 0 else 0.0
+        eta = (total - downloaded) / speed if total > 0 and speed > 0 else None
+        return ProgressUpdate(downloaded, total, speed, eta)
@@ -0,0 +1,190 @@
+"""远程 zip 按需读取
+
+通过 HTTP Range 只下载 zip 末尾的中央目录，得到每个成员的名称、大小和 CRC32，
+再只下载需要的成员数据。下载的内容写入与远程文件等大的本地文件的相同位置，
+未下载的部分为空，zipfile 可以直接从中解压已下载的成员（读取时会校验 CRC32）。
+"""
+
+import http.client
+import os
+import re
+import struct
+import threading
+import urllib.error
+import urllib.request
+import zipfile
+from collections.abc import Callable, Iterable
+
+from services.downloader import DownloadCancelledError, Downloader, RateLimiter
+from utils.logger import logger
+
+# Content-Range: bytes 100-199/1000
+_CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+)")
+
+# 中央目录结束记录
+_EOCD_SIGNATURE = b"PK\x05\x06"
+_EOCD_SIZE = 22
+
+# 按需读取时的网络错误，调用方改为下载完整压缩包
+_NETWORK_ERRORS = (urllib.error.URLError, http.client.HTTPException, TimeoutError, ConnectionError)
+
+
+class DeltaUnavailableError(Exception):
+    """无法按需读取（服务器不支持 Range、ZIP64、读取期间文件已变化、网络错误等）"""
+
+
+class RemoteZip:
+    """远程 zip 文件"""
+
+    # 首次读取的末尾字节数：中央目录结束记录加最长的注释
+    TAIL_SIZE = _EOCD_SIZE + 0xFFFF
+    # 两段数据间隔小于此值时合并为一次请求
+    MERGE_GAP = 64 * 1024
+
+    def __init__(
+        self,
+        url: str,
+        path: str,
+        limiter: RateLimiter | None = None,
+        cancel_event: threading.Event | None = None
+    ):
+        self.url = url
+        # 本地文件，与远程文件等大
+        self.path = path
+        self.limiter = limiter
+        self.cancel_event = cancel_event
+        self.size = 0
+        self.infos: list[zipfile.ZipInfo] = []
+        self._directory_offset = 0
+        # 第一次响应的 ETag/Last-Modified，之后的请求都要求是同一版本
+        self._validator = ""
+
+    def read_directory(self) -> list[zipfile.ZipInfo]:
+        """下载并解析中央目录，返回所有成员"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        start, tail = self._get(f"bytes=-{self.TAIL_SIZE}", first=True)
+        with open(self.path, "wb") as f:
+            f.truncate(self.size)
+            f.seek(start)
+            f.write(tail)
+
+        eocd = tail.rfind(_EOCD_SIGNATURE)
+        if eocd < 0 or len(tail) - eocd < _EOCD_SIZE:
+            raise DeltaUnavailableError("未找到中央目录")
+        directory_offset = struct.unpack_from("<I", tail, eocd + 16)[0]
+        if directory_offset == 0xFFFFFFFF:
+            raise DeltaUnavailableError("不支持 ZIP64")
+        if directory_offset < start:
+            # 中央目录比首次读取的部分大
+            self._fetch_range(directory_offset, start - 1)
+
+        try:
+            with zipfile.ZipFile(self.path) as zf:
+                self.infos = zf.infolist()
+        except zipfile.BadZipFile as e:
+            raise DeltaUnavailableError(f"无法解析中央目录: {e}") from e
+        self._directory_offset = directory_offset
+        logger.debug(f"远程压缩包 {self.size} 字节, {len(self.infos)} 个成员")
+        return self.infos
+
+    def member_ranges(self, names: Iterable[str]) -> list[tuple[int, int]]:
+        """成员数据（含本地文件头）所在的字节范围，相邻的范围合并"""
+        wanted = set(names)
+        offsets = sorted({info.header_offset for info in self.infos} | {self._directory_offset})
+        next_offset = dict(zip(offsets, offsets[1:], strict=False))
+
+        ranges: list[tuple[int, int]] = []
+        for info in sorted(self.infos, key=lambda i: i.header_offset):
+            if info.filename not in wanted:
+                continue
+            start, end = info.header_offset, next_offset[info.header_offset] - 1
+            if ranges and start - ranges[-1][1] <= self.MERGE_GAP:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return ranges
+
+    def fetch_members(
+        self,
+        names: Iterable[str],
+        progress_callback: Callable[[int, int], None] | None = None
+    ) -> int:
+        """下载指定成员的数据到本地文件，返回下载的字节数"""
+        ranges = self.member_ranges(names)
+        total = sum(end - start + 1 for start, end in ranges)
+        done = 0
+
+        def on_chunk(size: int) -> None:
+            nonlocal done
+            done += size
+            if progress_callback:
+                progress_callback(done, total)
+
+        for start, end in ranges:
+            self._fetch_range(start, end, on_chunk)
+        return total
+
+    def _fetch_range(self, start: int, end: int, on_chunk: Callable[[int], None] | None = None) -> None:
+        """下载 [start, end] 写入本地文件的相同位置"""
+        try:
+            self._copy_range(start, end, on_chunk)
+        except _NETWORK_ERRORS as e:
+            raise DeltaUnavailableError(f"网络错误: {e}") from e
+
+    def _copy_range(self, start: int, end: int, on_chunk: Callable[[int], None] | None) -> None:
+        with self._open(f"bytes={start}-{end}") as response, open(self.path, "r+b") as f:
+            self._check_range(response, start)
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                if self.cancel_event is not None and self.cancel_event.is_set():
+                    raise DownloadCancelledError("下载已取消")
+                chunk = response.read(min(Downloader.CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise http.client.IncompleteRead(b"", remaining)
+                if self.limiter:
+                    self.limiter.consume(len(chunk))
+                f.write(chunk)
+                remaining -= len(chunk)
+                if on_chunk:
+                    on_chunk(len(chunk))
+
+    def _get(self, range_header: str, first: bool = False) -> tuple[int, bytes]:
+        """请求一个范围，返回 (起始位置, 数据)"""
+        try:
+            with self._open(range_header) as response:
+                start = self._check_range(response, None)
+                if first:
+                    etag = response.headers.get("ETag", "")
+                    self._validator = (etag if not etag.startswith("W/") else "") or response.headers.get(
+                        "Last-Modified", ""
+                    )
+                return start, response.read()
+        except _NETWORK_ERRORS as e:
+            raise DeltaUnavailableError(f"网络错误: {e}") from e
+
+    def _open(self, range_header: str):
+        headers = {"User-Agent": Downloader.USER_AGENT, "Range": range_header}
+        if self._validator:
+            # 文件已变化时服务器返回完整内容（200），不会混合两个版本的数据
+            headers["If-Range"] = self._validator
+        request = urllib.request.Request(self.url, headers=headers)
+        try:
+            return urllib.request.urlopen(request, timeout=Downloader.TIMEOUT)
+        except urllib.error.HTTPError as e:
+            if e.code == 416:
+                raise DeltaUnavailableError("服务器不接受该范围请求") from e
+            raise
+
+    def _check_range(self, response, start: int | None) -> int:
+        """检查 206 响应的 Content-Range，返回起始位置"""
+        match = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+        if response.status != 206 or not match:
+            raise DeltaUnavailableError("服务器不支持 Range 或文件已变化")
+        if start is not None and int(match.group(1)) != start:
+            raise DeltaUnavailableError("服务器返回的范围与请求不符")
+        size = int(match.group(3))
+        if self.size and size != self.size:
+            raise DeltaUnavailableError("远程文件大小已变化")
+        self.size = size
+        return int(match.group(1))
@@ -1,81 +1,544 @@
 """路由管理服务"""
 
-from dataclasses import dataclass
+import asyncio
+import csv
+import functools
+import ipaddress
+import json
+import os
+import socket
+import subprocess
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
 
 from utils.logger import logger
-from utils.system import run_command
+from utils.system import run_command, run_command_async
 
 
-@dataclass
+def ipv4_to_int(address: str) -> int:
+    """IPv4 地址转为 32 位整数（格式错误抛出 ValueError）"""
+    address = address.strip()
+    try:
+        # inet_aton 接受 "10.1" 这类简写，这里只接受完整的点分十进制
+        if address.count(".") != 3:
+            raise OSError
+        return int.from_bytes(socket.inet_aton(address), "big")
+    except OSError:
+        raise ValueError(f"无效的 IPv4 地址: {address}") from None
+
+
+# 网关、接口地址大量重复，解析时使用缓存
+_cached_ipv4_to_int = functools.lru_cache(maxsize=1024)(ipv4_to_int)
+
+
+def int_to_ipv4(value: int) -> str:
+    """32 位整数转为 IPv4 地址"""
+    return socket.inet_ntoa(value.to_bytes(4, "big"))
+
+
+def prefix_to_int(prefix: int) -> int:
+    """前缀长度转为整数形式的子网掩码"""
+    return (0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF
+
+
+@functools.lru_cache(maxsize=64)
+def mask_to_prefix(mask: str) -> int:
+    """子网掩码转为前缀长度（掩码不连续抛出 ValueError）"""
+    value = ipv4_to_int(mask)
+    prefix = bin(value).count("1")
+    if value != prefix_to_int(prefix):
+        raise ValueError(f"无效的子网掩码: {mask}")
+    return prefix
+
+
+# 直连路由的网关显示文本
+ON_LINK = "On-link"
+
+
+@dataclass(slots=True)
 class RouteEntry:
-    """路由条目"""
+    """路由条目
+
+    地址以 32 位整数保存，排序、比较和前缀匹配直接使用整数；
+    字符串形式和 ipaddress 对象按需生成。
+    """
+    destination_ip: int
+    prefix: int
+    gateway_ip: int | None   # None 表示直连（On-link）
+    interface_ip: int
+    metric: int
+
+    @classmethod
+    def parse(cls, destination: str, mask: str, gateway: str, interface: str, metric: str) -> "RouteEntry":
+        """从 route print 的文本字段创建（格式错误抛出 ValueError）"""
+        return cls(
+            ipv4_to_int(destination),
+            mask_to_prefix(mask),
+            _cached_ipv4_to_int(gateway) if gateway[:1].isdigit() else None,
+            _cached_ipv4_to_int(interface),
+            int(metric),
+        )
+
+    @property
+    def destination(self) -> str:
+        return int_to_ipv4(self.destination_ip)
+
+    @property
+    def mask(self) -> str:
+        return int_to_ipv4(prefix_to_int(self.prefix))
+
+    @property
+    def gateway(self) -> str:
+        return ON_LINK if self.gateway_ip is None else int_to_ipv4(self.gateway_ip)
+
+    @property
+    def interface(self) -> str:
+        return int_to_ipv4(self.interface_ip)
+
+    @property
+    def network(self) -> ipaddress.IPv4Network:
+        """目标网络"""
+        return ipaddress.IPv4Network((self.destination_ip, self.prefix))
+
+    def contains(self, address: int) -> bool:
+        """目标网络是否包含该地址（整数形式）"""
+        return (address ^ self.destination_ip) & prefix_to_int(self.prefix) == 0
+
+
+@dataclass
+class RouteChange:
+    """批量操作中的一项路由变更"""
+    action: str                      # "add" 或 "delete"
     destination: str
-    mask: str
-    gateway: str
-    interface: str
-    metric: str
+    mask: str = "255.255.255.255"
+    gateway: str = ""                # 删除时可留空，表示不限网关
+    metric: str | None = None
+    persistent: bool = False
+
+    def __str__(self) -> str:
+        gateway = f" {self.gateway}" if self.gateway else ""
+        return f"{self.action} {self.destination} mask {self.mask}{gateway}"
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RouteChange":
+        """从字典创建（键名同字段名，缺少 action 时视为 add）"""
+        action = str(data.get("action") or "add").strip().lower()
+        if action not in ("add", "delete"):
+            raise ValueError(f"未知的操作: {action}")
+        destination = str(data.get("destination") or "").strip()
+        if not destination:
+            raise ValueError("缺少目标网络")
+        mask = str(data.get("mask") or "").strip() or "255.255.255.255"
+        gateway = str(data.get("gateway") or "").strip()
+        if action == "add" and not gateway:
+            raise ValueError(f"添加路由 {destination} 缺少网关")
+        ipv4_to_int(destination)
+        mask_to_prefix(mask)
+        if gateway:
+            ipv4_to_int(gateway)
+        metric = str(data.get("metric") or "").strip() or None
+        if metric and not metric.isdigit():
+            raise ValueError(f"无效的跃点数: {metric}")
+        persistent = data.get("persistent", False)
+        if isinstance(persistent, str):
+            persistent = persistent.strip().lower() in ("1", "true", "yes", "y", "是")
+        return cls(
+            action=action,
+            destination=destination,
+            mask=mask,
+            gateway=gateway,
+            metric=metric,
+            persistent=bool(persistent),
+        )
+
+
+@dataclass
+class RouteBatchResult:
+    """批量路由操作结果"""
+    applied: list[RouteChange] = field(default_factory=list)
+    skipped: list[RouteChange] = field(default_factory=list)    # 已是目标状态
+    failed: list[tuple[RouteChange, str]] = field(default_factory=list)
+    rolled_back: list[RouteChange] = field(default_factory=list)
+    rollback_failed: list[tuple[RouteChange, str]] = field(default_factory=list)
+
+    @property
+    def success(self) -> bool:
+        return not self.failed
+
+
+# 路由键：(目标网络, 前缀长度, 网关, 接口, 序号)，序号区分完全相同的重复条目
+RouteKey = tuple[int, int, int | None, int, int]
+
+
+@dataclass
+class RouteDiff:
+    """两次路由表快照之间的差异（按路由键对比，跃点数变化视为修改）"""
+    added: dict[RouteKey, RouteEntry] = field(default_factory=dict)
+    removed: dict[RouteKey, RouteEntry] = field(default_factory=dict)
+    changed: dict[RouteKey, RouteEntry] = field(default_factory=dict)  # 新值
+    # 新快照中所有路由键的顺序
+    keys: list[RouteKey] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        """是否没有任何变化"""
+        return not self.added and not self.removed and not self.changed
+
+
+def keyed_routes(routes: Iterable[RouteEntry]) -> dict[RouteKey, RouteEntry]:
+    """按路由键索引路由（保持原有顺序）"""
+    result: dict[RouteKey, RouteEntry] = {}
+    for route in routes:
+        n = 0
+        key = (route.destination_ip, route.prefix, route.gateway_ip, route.interface_ip, n)
+        while key in result:
+            n += 1
+            key = (route.destination_ip, route.prefix, route.gateway_ip, route.interface_ip, n)
+        result[key] = route
+    return result
+
+
+class _TrieNode:
+    """前缀树节点"""
+    __slots__ = ("children", "routes")
+
+    def __init__(self):
+        self.children: list[_TrieNode | None] = [None, None]
+        # 该前缀下的路由，按跃点数升序
+        self.routes: list[RouteEntry] = []
+
+
+class RouteIndex:
+    """路由表的二叉前缀树索引，按 目标网络/掩码 组织
+
+    lookup 按最长前缀匹配解析目标地址实际使用的路由，最多访问 32 层；
+    同一前缀存在多条路由时跃点数最小者优先。
+    """
+
+    def __init__(self, routes: Iterable[RouteEntry] = ()):
+        self._root = _TrieNode()
+        self._size = 0
+        for route in routes:
+            self.insert(route)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, route: RouteEntry) -> None:
+        """插入一条路由"""
+        destination = route.destination_ip
+        node = self._root
+        for depth in range(route.prefix):
+            bit = (destination >> (31 - depth)) & 1
+            child = node.children[bit]
+            if child is None:
+                child = node.children[bit] = _TrieNode()
+            node = child
+
+        node.routes.append(route)
+        node.routes.sort(key=lambda r: r.metric)
+        self._size += 1
+
+    def matches(self, address: str | int) -> list[RouteEntry]:
+        """所有匹配目标地址的路由，从最长前缀到最短前缀"""
+        value = ipv4_to_int(address) if isinstance(address, str) else address
+        result: list[RouteEntry] = []
+        node: _TrieNode | None = self._root
+        depth = 0
+        while node is not None:
+            if node.routes:
+                result[:0] = node.routes
+            if depth == 32:
+                break
+            node = node.children[(value >> (31 - depth)) & 1]
+            depth += 1
+        return result
+
+    def lookup(self, address: str | int) -> RouteEntry | None:
+        """解析目标地址实际使用的路由（最长前缀匹配，跃点数最小者优先）"""
+        value = ipv4_to_int(address) if isinstance(address, str) else address
+        best: RouteEntry | None = None
+        node: _TrieNode | None = self._root
+        depth = 0
+        while node is not None:
+            if node.routes:
+                best = node.routes[0]
+            if depth == 32:
+                break
+            node = node.children[(value >> (31 - depth)) & 1]
+            depth += 1
+        return best
+
+
+class RouteSnapshot:
+    """一次获取的路由表及其预计算数据
+
+    建立时预先计算各列的排序键、网关/接口的按列索引和每行的搜索文本，
+    之后的排序和筛选只在内存中进行，不再执行 route print。
+    """
+
+    # 可排序的列
+    COLUMNS = ("destination", "mask", "gateway", "interface", "metric")
+    # 可按值筛选的列
+    FILTER_COLUMNS = ("gateway", "interface")
+
+    def __init__(self, routes: list[RouteEntry]):
+        self.routes = routes
+        self.keys: list[RouteKey] = list(keyed_routes(routes))
+        self.index = RouteIndex(routes)
+
+        self._sort_keys: dict[str, list] = {
+            "destination": [(r.destination_ip, r.prefix) for r in routes],
+            "mask": [r.prefix for r in routes],
+            "gateway": [-1 if r.gateway_ip is None else r.gateway_ip for r in routes],
+            "interface": [r.interface_ip for r in routes],
+            "metric": [r.metric for r in routes],
+        }
+        # 列 -> 排序后的行号（按需计算后缓存）
+        self._orders: dict[str, list[int]] = {}
+
+        # 列 -> 显示值 -> 行号
+        self._column_index: dict[str, dict[str, list[int]]] = {column: {} for column in self.FILTER_COLUMNS}
+        self._search_text: list[str] = []
+        for i, route in enumerate(routes):
+            values = (route.destination, route.mask, route.gateway, route.interface, str(route.metric))
+            self._column_index["gateway"].setdefault(values[2], []).append(i)
+            self._column_index["interface"].setdefault(values[3], []).append(i)
+            self._search_text.append(" ".join(values).lower())
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+    def values(self, column: str) -> list[str]:
+        """某个筛选列的所有取值（按地址排序）"""
+        index = self._column_index[column]
+        return sorted(index, key=lambda value: self._sort_keys[column][index[value][0]])
+
+    def order(self, column: str, descending: bool = False) -> list[int]:
+        """按列排序后的行号"""
+        order = self._orders.get(column)
+        if order is None:
+            keys = self._sort_keys[column]
+            order = self._orders[column] = sorted(range(len(keys)), key=keys.__getitem__)
+        return order[::-1] if descending else order
+
+    def query(
+        self,
+        sort_column: str | None = None,
+        descending: bool = False,
+        filters: dict[str, str] | None = None,
+        text: str = ""
+    ) -> list[int]:
+        """按条件筛选并排序，返回行号
+
+        filters 为 列 -> 显示值 的精确匹配（使用按列索引）；text 在所有列中做不区分大小写的包含匹配。
+        """
+        selected: set[int] | None = None
+        for column, value in (filters or {}).items():
+            if not value:
+                continue
+            rows = set(self._column_index[column].get(value, ()))
+            selected = rows if selected is None else selected & rows
+
+        text = text.strip().lower()
+        if text:
+            candidates = range(len(self.routes)) if selected is None else selected
+            search_text = self._search_text
+            selected = {i for i in candidates if text in search_text[i]}
+
+        order = self.order(sort_column, descending) if sort_column else range(len(self.routes))
+        if selected is None:
+            return list(order)
+        return [i for i in order if i in selected]
+
+
+# 永久路由的键：(目标, 前缀长度, 网关)
+PersistentKey = tuple[int, int, int | None]
+
+
+class RouteTableParser:
+    """路由表增量解析器，可逐行输入 route print 输出
+
+    活动路由保存在 routes 中；永久路由一节保存在 persistent 中（键 -> 设置的跃点数，"默认" 为 None）。
+    """
+
+    def __init__(self):
+        self.routes: list[RouteEntry] = []
+        self.persistent: dict[PersistentKey, str | None] = {}
+        self._section: str | None = None
+
+    def feed(self, line: str) -> RouteEntry | None:
+        """输入一行，解析出活动路由条目时返回该条目"""
+        line = line.strip()
+        if "Network Destination" in line or "网络目标" in line:
+            self._section = "active"
+            return None
+        if "Network Address" in line or "网络地址" in line:
+            self._section = "persistent"
+            return None
+        if self._section and line:
+            if "==" in line or not line[0].isdigit():
+                self._section = None
+                return None
+            parts = line.split()
+            if self._section == "persistent":
+                self._feed_persistent(parts)
+                return None
+            if len(parts) >= 5:
+                try:
+                    route = RouteEntry.parse(*parts[:5])
+                except ValueError:
+                    return None
+                self.routes.append(route)
+                return route
+        return None
+
+    def _feed_persistent(self, parts: list[str]) -> None:
+        """解析永久路由一行：网络地址 网络掩码 网关地址 跃点数"""
+        if len(parts) < 4:
+            return
+        try:
+            key = (
+                ipv4_to_int(parts[0]),
+                mask_to_prefix(parts[1]),
+                _cached_ipv4_to_int(parts[2]) if parts[2][:1].isdigit() else None,
+            )
+        except ValueError:
+            return
+        self.persistent[key] = parts[3] if parts[3].isdigit() else None
 
 
 class RouteService:
     """路由管理服务"""
 
+    # route 命令超时（秒）
+    COMMAND_TIMEOUT = 30
+
     @classmethod
     def get_routes(cls) -> list[RouteEntry]:
         """获取路由表"""
         logger.debug("获取路由表")
-        result = run_command(["route", "print", "-4"])
-        routes = cls._parse_routes(result.stdout)
+        routes = cls._parse_routes(cls.get_route_output())
         logger.debug(f"解析到 {len(routes)} 条路由")
         return routes
 
     @classmethod
-    def _parse_routes(cls, output: str) -> list[RouteEntry]:
-        """解析路由表输出"""
-        routes = []
-        lines = output.split("\n")
-        in_route_table = False
-
-        for line in lines:
-            line = line.strip()
-            if "Network Destination" in line or "网络目标" in line:
-                in_route_table = True
-                continue
-            if in_route_table and line:
-                if "==" in line or not line[0].isdigit():
-                    in_route_table = False
-                    continue
-                parts = line.split()
-                if len(parts) >= 5:
-                    routes.append(RouteEntry(
-                        destination=parts[0],
-                        mask=parts[1],
-                        gateway=parts[2],
-                        interface=parts[3],
-                        metric=parts[4]
-                    ))
-        return routes
+    def get_route_output(cls) -> str:
+        """获取 route print 原始输出"""
+        result = run_command(["route", "print", "-4"], timeout=cls.COMMAND_TIMEOUT)
+        return str(result.stdout) if result.stdout else ""
 
     @classmethod
-    def add(
+    def snapshot_from_output(cls, output: str) -> RouteSnapshot:
+        """由 route print 原始输出建立路由表快照"""
+        return RouteSnapshot(cls._parse_routes(output))
+
+    @classmethod
+    async def get_routes_async(
         cls,
+        on_route: Callable[[RouteEntry], None] | None = None
+    ) -> list[RouteEntry]:
+        """异步获取路由表，边读取输出边解析，每解析出一条回调 on_route"""
+        logger.debug("获取路由表 (异步)")
+        parser = RouteTableParser()
+
+        def on_line(line: str) -> None:
+            route = parser.feed(line)
+            if route and on_route:
+                on_route(route)
+
+        await run_command_async(["route", "print", "-4"], timeout=cls.COMMAND_TIMEOUT, on_line=on_line)
+        logger.debug(f"解析到 {len(parser.routes)} 条路由")
+        return parser.routes
+
+    @classmethod
+    def get_snapshot(cls) -> RouteSnapshot:
+        """获取路由表快照（含最长前缀匹配索引和排序/筛选用的预计算数据）"""
+        return RouteSnapshot(cls.get_routes())
+
+    @classmethod
+    def build_index(cls, routes: Iterable[RouteEntry]) -> RouteIndex:
+        """为路由表建立最长前缀匹配索引"""
+        return RouteIndex(routes)
+
+    @classmethod
+    def diff(cls, old: Iterable[RouteEntry], new: Iterable[RouteEntry]) -> RouteDiff:
+        """计算两次路由表快照的差异"""
+        old_map = keyed_routes(old)
+        new_map = keyed_routes(new)
+        result = RouteDiff(keys=list(new_map))
+        for key, route in new_map.items():
+            previous = old_map.get(key)
+            if previous is None:
+                result.added[key] = route
+            elif previous.metric != route.metric:
+                result.changed[key] = route
+        for key, route in old_map.items():
+            if key not in new_map:
+                result.removed[key] = route
+        return result
+
+    @classmethod
+    def _parse_routes(cls, output: str) -> list[RouteEntry]:
+        """解析路由表输出"""
+        return cls._parse_table(output).routes
+
+    @staticmethod
+    def _parse_table(output: str) -> RouteTableParser:
+        """解析路由表输出（含永久路由）"""
+        parser = RouteTableParser()
+        for line in output.split("\n"):
+            parser.feed(line)
+        return parser
+
+    @staticmethod
+    def _add_command(
         destination: str,
         mask: str,
         gateway: str,
         metric: str | None = None,
         persistent: bool = False
-    ) -> tuple[bool, str]:
-        """添加路由"""
+    ) -> list[str]:
+        """构造添加路由的命令"""
         cmd = ["route"]
         if persistent:
             cmd.append("-p")
         cmd.extend(["add", destination, "mask", mask, gateway])
         if metric:
             cmd.extend(["metric", metric])
+        return cmd
 
-        logger.info(f"添加路由: {destination} mask {mask} gateway {gateway}, persistent={persistent}")
-        result = run_command(cmd)
+    @staticmethod
+    def _delete_command(destination: str, mask: str | None = None, gateway: str | None = None) -> list[str]:
+        """构造删除路由的命令（可限定掩码和网关）"""
+        cmd = ["route", "delete", destination]
+        if mask:
+            cmd.extend(["mask", mask])
+            if gateway:
+                cmd.append(gateway)
+        return cmd
+
+    @staticmethod
+    def _command_result(result: subprocess.CompletedProcess, success_message: str) -> tuple[bool, str]:
+        """把命令结果转换为 (是否成功, 消息)"""
         success = result.returncode == 0
-        message = "路由添加成功" if success else (result.stderr or result.stdout)
+        return success, success_message if success else (result.stderr or result.stdout).strip()
+
+    @classmethod
+    def add(
+        cls,
+        destination: str,
+        mask: str,
+        gateway: str,
+        metric: str | None = None,
+        persistent: bool = False
+    ) -> tuple[bool, str]:
+        """添加路由"""
+        cmd = cls._add_command(destination, mask, gateway, metric, persistent)
+
+        logger.info(f"添加路由: {destination} mask {mask} gateway {gateway}, persistent={persistent}")
+        result = run_command(cmd, timeout=cls.COMMAND_TIMEOUT)
+        success, message = cls._command_result(result, "路由添加成功")
 
         if success:
             logger.info(f"路由添加成功: {destination}")
@@ -88,9 +551,8 @@ class RouteService:
     def delete(cls, destination: str) -> tuple[bool, str]:
         """删除路由"""
         logger.info(f"删除路由: {destination}")
-        result = run_command(["route", "delete", destination])
-        success = result.returncode == 0
-        message = "路由删除成功" if success else (result.stderr or result.stdout)
+        result = run_command(cls._delete_command(destination), timeout=cls.COMMAND_TIMEOUT)
+        success, message = cls._command_result(result, "路由删除成功")
 
         if success:
             logger.info(f"路由删除成功: {destination}")
@@ -98,3 +560,175 @@ class RouteService:
             logger.error(f"路由删除失败: {destination}, 原因: {message}")
 
         return success, message
+
+    # 批量操作
+
+    @classmethod
+    def load_changes(cls, path: str) -> list[RouteChange]:
+        """从 CSV 或 JSON 文件读取路由变更
+
+        CSV 需有表头，列名同 RouteChange 字段（action, destination, mask, gateway, metric, persistent）；
+        JSON 为对象数组，或包含 "routes" 数组的对象。格式错误抛出 ValueError，并指明所在行/项。
+        """
+        if os.path.splitext(path)[1].lower() == ".json":
+            with open(path, encoding="utf-8-sig") as f:
+                data = json.load(f)
+            items = data.get("routes", []) if isinstance(data, dict) else data
+            rows = [(f"第 {i} 项", item) for i, item in enumerate(items, 1)]
+        else:
+            with open(path, encoding="utf-8-sig", newline="") as f:
+                rows = [
+                    (f"第 {i} 行", row)
+                    for i, row in enumerate(csv.DictReader(f), 2)
+                    if any((value or "").strip() for value in row.values())
+                ]
+
+        changes = []
+        for position, row in rows:
+            try:
+                if not isinstance(row, dict):
+                    raise ValueError("格式错误")
+                changes.append(RouteChange.from_dict(row))
+            except ValueError as e:
+                raise ValueError(f"{position}: {e}") from None
+        return changes
+
+    @classmethod
+    def apply_batch(cls, changes: list[RouteChange], rollback: bool = True) -> RouteBatchResult:
+        """批量应用路由变更
+
+        与当前路由表对比，已是目标状态的变更直接跳过，因此重复应用同一文件不会产生变化；
+        其余变更按文件中的顺序生效：相邻且目标网络互不相同的变更并行执行
+        （并发数受 run_command_async 限制），同一目标网络的变更依次执行。
+        有变更失败时不再执行后续变更，rollback 为 True 时按相反顺序撤销本批次已应用的变更。
+        """
+        table = cls._parse_table(cls.get_route_output())
+        current = table.routes
+        result = RouteBatchResult()
+        pending: list[RouteChange] = []
+        # 删除前记录恢复原路由的变更（含跃点数和是否永久），用于回滚
+        restores: dict[int, list[RouteChange]] = {}
+
+        for change in changes:
+            matched = cls._matching_routes(current, change)
+            if change.action == "add":
+                if matched:
+                    result.skipped.append(change)
+                else:
+                    pending.append(change)
+            elif matched:
+                pending.append(change)
+                restores[id(change)] = [cls._restore_change(route, table.persistent) for route in matched]
+            else:
+                result.skipped.append(change)
+
+        deletes = sum(change.action != "add" for change in pending)
+        logger.info(
+            f"批量路由: 删除 {deletes} 条, 添加 {len(pending) - deletes} 条, 跳过 {len(result.skipped)} 条"
+        )
+        for wave in cls._waves(pending):
+            outcomes = asyncio.run(cls._run_changes(wave))
+            for change, (success, message) in zip(wave, outcomes, strict=True):
+                if success:
+                    result.applied.append(change)
+                else:
+                    logger.error(f"批量路由失败: {change}, 原因: {message}")
+                    result.failed.append((change, message))
+            if result.failed:
+                break
+
+        if result.failed and rollback and result.applied:
+            cls._rollback(result, restores)
+        return result
+
+    @staticmethod
+    def _waves(changes: list[RouteChange]) -> list[list[RouteChange]]:
+        """按顺序把变更分成可并行执行的批次
+
+        批次内的变更目标网络互不相同，执行顺序不影响结果；
+        遇到与当前批次目标网络相同的变更时开始新的批次，保证它在前一条之后执行。
+        """
+        waves: list[list[RouteChange]] = []
+        targets: set[tuple[int, int]] = set()
+        for change in changes:
+            target = (ipv4_to_int(change.destination), mask_to_prefix(change.mask))
+            if not waves or target in targets:
+                waves.append([])
+                targets.clear()
+            waves[-1].append(change)
+            targets.add(target)
+        return waves
+
+    @staticmethod
+    def _restore_change(route: RouteEntry, persistent: dict[PersistentKey, str | None]) -> RouteChange:
+        """恢复一条被删除路由的变更
+
+        永久路由以 -p 和其设置的跃点数恢复；其他路由使用 route print 显示的跃点数。
+        直连路由以接口地址作为网关恢复。
+        """
+        gateway_ip = route.interface_ip if route.gateway_ip is None else route.gateway_ip
+        for key in ((route.destination_ip, route.prefix, route.gateway_ip),
+                    (route.destination_ip, route.prefix, gateway_ip)):
+            if key in persistent:
+                return RouteChange(
+                    "add", route.destination, route.mask, int_to_ipv4(gateway_ip), persistent[key], persistent=True
+                )
+        return RouteChange("add", route.destination, route.mask, int_to_ipv4(gateway_ip), str(route.metric))
+
+    @classmethod
+    def _rollback(cls, result: RouteBatchResult, restores: dict[int, list[RouteChange]]) -> None:
+        """按相反顺序撤销已应用的变更（删除的路由按原跃点数和是否永久恢复）"""
+        inverse: list[RouteChange] = []
+        origins: list[RouteChange] = []
+        for change in reversed(result.applied):
+            if change.action == "add":
+                inverse.append(RouteChange("delete", change.destination, change.mask, change.gateway))
+                origins.append(change)
+            else:
+                for restore in restores.get(id(change), []):
+                    inverse.append(restore)
+                    origins.append(change)
+
+        logger.warning(f"批量路由失败，回滚 {len(result.applied)} 条已应用的变更")
+        origin_of = {id(change): origin for change, origin in zip(inverse, origins, strict=True)}
+        for wave in cls._waves(inverse):
+            outcomes = asyncio.run(cls._run_changes(wave))
+            for change, (success, message) in zip(wave, outcomes, strict=True):
+                origin = origin_of[id(change)]
+                if success:
+                    if origin not in result.rolled_back:
+                        result.rolled_back.append(origin)
+                else:
+                    logger.error(f"回滚失败: {change}, 原因: {message}")
+                    result.rollback_failed.append((change, message))
+
+    @staticmethod
+    def _matching_routes(routes: list[RouteEntry], change: RouteChange) -> list[RouteEntry]:
+        """当前路由表中与变更目标相同的路由（不比较跃点数）"""
+        destination = ipv4_to_int(change.destination)
+        prefix = mask_to_prefix(change.mask)
+        gateway = ipv4_to_int(change.gateway) if change.gateway else None
+        return [
+            route for route in routes
+            if route.destination_ip == destination
+            and route.prefix == prefix
+            and (gateway is None or route.gateway_ip == gateway)
+        ]
+
+    @classmethod
+    async def _run_changes(cls, changes: list[RouteChange]) -> list[tuple[bool, str]]:
+        """并行执行一组变更，返回与输入顺序一致的结果"""
+        async def run(change: RouteChange) -> tuple[bool, str]:
+            if change.action == "add":
+                cmd = cls._add_command(
+                    change.destination, change.mask, change.gateway, change.metric, change.persistent
+                )
+            else:
+                cmd = cls._delete_command(change.destination, change.mask, change.gateway)
+            try:
+                result = await run_command_async(cmd, timeout=cls.COMMAND_TIMEOUT)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                return False, str(e)
+            return cls._command_result(result, "成功")
+
+        return list(await asyncio.gather(*(run(change) for change in changes)))
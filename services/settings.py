@@ -14,6 +14,8 @@ class AppSettings:
     window_height: int = 650
     tools_dir: str = ""  # 空字符串表示使用默认目录
     logs_dir: str = ""   # 空字符串表示使用默认目录
+    max_downloads: int = 2        # 同时进行的下载数
+    download_limit_kb: int = 0    # 下载总带宽上限（KB/s），0 表示不限速
 
     def to_dict(self) -> dict:
         return asdict(self)
@@ -26,7 +28,9 @@ class AppSettings:
             window_width=data.get("window_width", 900),
             window_height=data.get("window_height", 650),
             tools_dir=data.get("tools_dir", ""),
-            logs_dir=data.get("logs_dir", "")
+            logs_dir=data.get("logs_dir", ""),
+            max_downloads=data.get("max_downloads", 2),
+            download_limit_kb=data.get("download_limit_kb", 0)
         )
 
     @staticmethod
@@ -0,0 +1,93 @@
+"""后台任务服务
+
+会启动子进程的服务调用（route、ipconfig 等）统一放到共享线程池中执行，
+结果通过 Tk 的 after() 轮询交回主线程，避免阻塞事件循环。
+"""
+
+import threading
+import tkinter as tk
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from utils.logger import logger
+
+T = TypeVar("T")
+
+
+class TaskService:
+    """后台任务服务"""
+
+    MAX_WORKERS = 4
+    POLL_INTERVAL_MS = 50
+
+    _executor: ThreadPoolExecutor | None = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        """获取共享线程池"""
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=cls.MAX_WORKERS,
+                    thread_name_prefix="wintoolbox-task"
+                )
+            return cls._executor
+
+    @classmethod
+    def submit(cls, func: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        """提交后台任务"""
+        return cls.get_executor().submit(func, *args, **kwargs)
+
+    @classmethod
+    def deliver(
+        cls,
+        widget: tk.Misc,
+        future: "Future[T]",
+        on_success: Callable[[T], None],
+        on_error: Callable[[Exception], object] | None = None
+    ) -> None:
+        """在 Tk 主线程中等待任务完成并回调"""
+        def poll() -> None:
+            if not future.done():
+                try:
+                    widget.after(cls.POLL_INTERVAL_MS, poll)
+                except tk.TclError:
+                    # 控件已销毁，放弃回调
+                    future.cancel()
+                return
+
+            if future.cancelled():
+                return
+
+            error = future.exception()
+            if error is None:
+                on_success(future.result())
+            elif on_error and isinstance(error, Exception):
+                on_error(error)
+            else:
+                logger.error(f"后台任务失败: {error}")
+
+        widget.after(cls.POLL_INTERVAL_MS, poll)
+
+    @classmethod
+    def run(
+        cls,
+        widget: tk.Misc,
+        func: Callable[[], T],
+        on_success: Callable[[T], None],
+        on_error: Callable[[Exception], object] | None = None
+    ) -> "Future[T]":
+        """在后台执行任务，完成后在主线程回调"""
+        future = cls.submit(func)
+        cls.deliver(widget, future, on_success, on_error)
+        return future
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """关闭线程池，取消尚未开始的任务"""
+        with cls._lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
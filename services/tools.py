@@ -2,12 +2,17 @@
 
 import json
 import os
+import shutil
 import subprocess
-import urllib.request
+import threading
 import zipfile
 from collections.abc import Callable
 from dataclasses import asdict, dataclass
 
+from services.archive import UNKNOWN_CRC, ArchiveService, InstallManifest
+from services.cache import DownloadCache
+from services.downloader import DownloadCancelledError, RateLimiter
+from services.remote_zip import DeltaUnavailableError, RemoteZip
 from services.settings import SettingsService
 from utils.logger import logger
 
@@ -17,6 +22,11 @@ def get_tools_dir() -> str:
     return SettingsService.get().get_tools_dir()
 
 
+def get_cache_dir() -> str:
+    """获取下载缓存目录（位于安装目录之外，更新工具时删除安装目录不影响缓存和续传）"""
+    return os.path.join(get_tools_dir(), ".cache")
+
+
 @dataclass
 class ToolInfo:
     """工具信息"""
@@ -26,6 +36,9 @@ class ToolInfo:
     exe_name: str
     folder_name: str
     homepage: str = ""
+    # 压缩包的 SHA-256 和大小（字节），为空/0 表示不校验
+    sha256: str = ""
+    size: int = 0
 
     @property
     def install_dir(self) -> str:
@@ -43,6 +56,8 @@ class ToolInfo:
 
 
 # 默认第三方工具注册表
+# 默认下载地址始终指向最新版本，内容会随上游更新变化，因此默认不固定 SHA-256；
+# 需要固定版本时在 tools.json 中同时配置 download_url、sha256 和 size
 DEFAULT_TOOLS = {
     "geek_uninstaller": ToolInfo(
         name="Geek Uninstaller",
@@ -66,7 +81,11 @@ DEFAULT_TOOLS = {
 class ToolsService:
     """第三方工具管理服务"""
 
+    # 变化的成员压缩后超过压缩包大小的这一比例时，不再增量更新而是下载完整压缩包
+    DELTA_MAX_RATIO = 0.5
+
     _tools: dict[str, ToolInfo] | None = None
+    _cache: DownloadCache | None = None
     _config_dir = os.path.join(os.path.expanduser("~"), ".wintoolbox")
     _config_file = os.path.join(_config_dir, "tools.json")
 
@@ -87,6 +106,10 @@ class ToolsService:
                             tools[tool_id].download_url = config["download_url"]
                         if "homepage" in config:
                             tools[tool_id].homepage = config["homepage"]
+                        if "sha256" in config:
+                            tools[tool_id].sha256 = str(config["sha256"]).lower()
+                        if "size" in config:
+                            tools[tool_id].size = int(config["size"])
         except Exception as e:
             logger.error(f"加载工具配置失败: {e}")
 
@@ -106,11 +129,15 @@ class ToolsService:
             for tool_id, tool in cls._tools.items():
                 if tool_id in DEFAULT_TOOLS:
                     default = DEFAULT_TOOLS[tool_id]
-                    diff = {}
+                    diff: dict[str, str | int] = {}
                     if tool.download_url != default.download_url:
                         diff["download_url"] = tool.download_url
                     if tool.homepage != default.homepage:
                         diff["homepage"] = tool.homepage
+                    if tool.sha256 != default.sha256:
+                        diff["sha256"] = tool.sha256
+                    if tool.size != default.size:
+                        diff["size"] = tool.size
                     if diff:
                         custom[tool_id] = diff
 
@@ -163,6 +190,21 @@ class ToolsService:
         logger.info(f"工具 {tool_id} 主页已更新: {homepage}")
         return True
 
+    @classmethod
+    def update_tool_checksum(cls, tool_id: str, sha256: str, size: int = 0) -> bool:
+        """更新工具压缩包的 SHA-256 和大小（为空/0 表示不校验）"""
+        if cls._tools is None:
+            cls._tools = cls._load_tools()
+
+        if tool_id not in cls._tools:
+            return False
+
+        cls._tools[tool_id].sha256 = sha256.strip().lower()
+        cls._tools[tool_id].size = size
+        cls._save_tools()
+        logger.info(f"工具 {tool_id} 校验值已更新: {sha256 or '不校验'}")
+        return True
+
     @classmethod
     def reset_tool_config(cls, tool_id: str) -> bool:
         """重置工具配置为默认值"""
@@ -175,10 +217,20 @@ class ToolsService:
         default = DEFAULT_TOOLS[tool_id]
         cls._tools[tool_id].download_url = default.download_url
         cls._tools[tool_id].homepage = default.homepage
+        cls._tools[tool_id].sha256 = default.sha256
+        cls._tools[tool_id].size = default.size
         cls._save_tools()
         logger.info(f"工具 {tool_id} 配置已重置")
         return True
 
+    @classmethod
+    def get_cache(cls) -> DownloadCache:
+        """获取下载缓存（工具目录变化后使用新目录下的缓存）"""
+        cache_dir = get_cache_dir()
+        if cls._cache is None or cls._cache.root != cache_dir:
+            cls._cache = DownloadCache(cache_dir)
+        return cls._cache
+
     @classmethod
     def launch(cls, tool_id: str) -> tuple[bool, str]:
         """启动工具"""
@@ -203,8 +255,19 @@ class ToolsService:
             return False, f"启动失败: {e}"
 
     @classmethod
-    def download(cls, tool_id: str, progress_callback: Callable[[int, int], None] | None = None) -> tuple[bool, str]:
-        """下载并安装工具"""
+    def download(
+        cls,
+        tool_id: str,
+        progress_callback: Callable[[int, int], None] | None = None,
+        cancel_event: threading.Event | None = None,
+        limiter: RateLimiter | None = None,
+        clean: bool = False
+    ) -> tuple[bool, str]:
+        """下载并安装工具
+
+        cancel_event 被设置时取消下载；limiter 为共享的限速器；
+        clean 时解压到新目录后替换旧的安装目录（下载失败或取消时旧版本保留，替换前旧版本一直可用）。
+        """
         tool = cls.get_tool(tool_id)
         if not tool:
             return False, "工具不存在"
@@ -212,29 +275,35 @@ class ToolsService:
         logger.info(f"开始下载工具: {tool.name}, URL: {tool.download_url}")
 
         try:
-            # 创建目录
-            os.makedirs(tool.install_dir, exist_ok=True)
-            logger.debug(f"创建安装目录: {tool.install_dir}")
-
-            # 下载文件
-            zip_path = os.path.join(tool.install_dir, "download.zip")
-
-            def report_hook(block_num, block_size, total_size):
-                if progress_callback and total_size > 0:
-                    downloaded = block_num * block_size
-                    progress_callback(downloaded, total_size)
-
-            logger.debug(f"下载文件到: {zip_path}")
-            urllib.request.urlretrieve(tool.download_url, zip_path, report_hook)
-
-            # 解压
-            logger.debug(f"解压文件: {zip_path}")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(tool.install_dir)
-
-            # 删除压缩包
-            os.remove(zip_path)
-            logger.debug("删除临时压缩包")
+            # 下载文件（已缓存且服务器上未变化时直接使用缓存，中断后再次下载会续传）
+            cache = cls.get_cache()
+            zip_path = cache.fetch(
+                tool.download_url, progress_callback, cancel_event, sha256=tool.sha256, limiter=limiter
+            )
+            logger.debug(f"压缩包: {zip_path}")
+
+            # 校验压缩包（SHA-256 在下载时已计算）
+            entry = cache.entry(tool.download_url)
+            if entry is None:
+                return False, "下载缓存记录已丢失，请重试"
+            error = cls._check_archive(tool, entry.size, entry.sha256)
+            if error:
+                cache.discard(tool.download_url)
+                logger.error(f"工具压缩包校验失败: {tool.name}, {error}")
+                return False, f"校验失败：{error}"
+
+            # 解压（并行，跳过内容相同的已有文件），并记录安装清单
+            target_dir = tool.install_dir
+            if clean and os.path.isdir(tool.install_dir):
+                target_dir = cls._staging_dir(tool)
+                shutil.rmtree(target_dir, ignore_errors=True)
+            os.makedirs(target_dir, exist_ok=True)
+            logger.debug(f"解压文件: {zip_path} -> {target_dir}")
+            result = ArchiveService.extract_zip(zip_path, target_dir)
+            InstallManifest(archive_sha256=entry.sha256, files=result.files).save(target_dir)
+            if target_dir != tool.install_dir:
+                ArchiveService.swap_dirs(target_dir, tool.install_dir)
+                logger.debug(f"已替换安装目录: {tool.install_dir}")
 
             if tool.is_installed():
                 logger.info(f"工具安装成功: {tool.name}")
@@ -243,10 +312,230 @@ class ToolsService:
                 logger.error(f"工具安装失败: {tool.name}, 未找到可执行文件")
                 return False, "安装失败：未找到可执行文件"
 
+        except DownloadCancelledError:
+            logger.info(f"下载已取消: {tool.name}")
+            return False, "下载已取消"
         except Exception as e:
             logger.error(f"下载工具失败: {tool.name}, 错误: {e}")
             return False, f"下载失败: {e}"
 
+    @classmethod
+    def update(
+        cls,
+        tool_id: str,
+        progress_callback: Callable[[int, int], None] | None = None,
+        cancel_event: threading.Event | None = None,
+        limiter: RateLimiter | None = None
+    ) -> tuple[bool, str]:
+        """更新已安装的工具
+
+        有安装清单时先通过 Range 读取远程压缩包的中央目录，只下载大小或 CRC32 变化的成员，
+        在新目录中组装完整的安装后替换旧目录；无法增量更新时下载完整压缩包。
+        """
+        tool = cls.get_tool(tool_id)
+        if not tool:
+            return False, "工具不存在"
+
+        manifest = InstallManifest.load(tool.install_dir) if tool.is_installed() else None
+        # 固定了 SHA-256 的工具需要完整的压缩包才能校验
+        if manifest is None or tool.sha256:
+            return cls.download(tool_id, progress_callback, cancel_event, limiter, clean=True)
+
+        logger.info(f"开始增量更新工具: {tool.name}")
+        remote = RemoteZip(tool.download_url, cls._delta_path(tool_id), limiter, cancel_event)
+        try:
+            return cls._delta_update(tool, manifest, remote, progress_callback)
+        except DeltaUnavailableError as e:
+            logger.info(f"无法增量更新（{e}），下载完整压缩包: {tool.name}")
+            return cls.download(tool_id, progress_callback, cancel_event, limiter, clean=True)
+        except DownloadCancelledError:
+            logger.info(f"更新已取消: {tool.name}")
+            return False, "下载已取消"
+        except Exception as e:
+            logger.error(f"更新工具失败: {tool.name}, 错误: {e}")
+            return False, f"更新失败: {e}"
+        finally:
+            shutil.rmtree(cls._staging_dir(tool), ignore_errors=True)
+            try:
+                os.remove(remote.path)
+            except FileNotFoundError:
+                pass
+
+    @classmethod
+    def _delta_update(
+        cls,
+        tool: ToolInfo,
+        manifest: InstallManifest,
+        remote: RemoteZip,
+        progress_callback: Callable[[int, int], None] | None
+    ) -> tuple[bool, str]:
+        """按远程中央目录与安装清单的差异更新"""
+        members = {info.filename: info for info in remote.read_directory() if not info.is_dir()}
+        unchanged: list[str] = []
+        changed: list[str] = []
+        for name, info in members.items():
+            record = manifest.files.get(name)
+            if (
+                record is not None
+                and record[2] != UNKNOWN_CRC
+                and (info.file_size, info.CRC) == (record[0], record[2])
+                and cls._has_file(tool, name, info.file_size)
+            ):
+                unchanged.append(name)
+            else:
+                changed.append(name)
+        removed = set(manifest.files) - set(members)
+
+        if not changed and not removed:
+            logger.info(f"工具已是最新版本: {tool.name}")
+            return True, "已是最新版本"
+
+        changed_size = sum(members[name].compress_size for name in changed)
+        if changed_size > remote.size * cls.DELTA_MAX_RATIO:
+            raise DeltaUnavailableError("变化的内容过多")
+
+        fetched = remote.fetch_members(changed, progress_callback)
+        logger.debug(f"下载 {len(changed)} 个变化的成员, 共 {fetched} 字节（压缩包 {remote.size} 字节）")
+
+        # 在新目录中组装：未变化的文件硬链接（或复制）过来，变化的文件从已下载的数据解压
+        staging = cls._staging_dir(tool)
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        ArchiveService.link_members(tool.install_dir, staging, unchanged)
+        result = ArchiveService.extract_zip(remote.path, staging, skip_identical=False, members=changed)
+
+        files = {name: manifest.files[name] for name in unchanged}
+        files.update(result.files)
+        # 没有完整的压缩包，archive_sha256 留空
+        InstallManifest(archive_sha256="", files=files).save(staging)
+        ArchiveService.swap_dirs(staging, tool.install_dir)
+
+        if not tool.is_installed():
+            return False, "更新失败：未找到可执行文件"
+        logger.info(f"工具增量更新成功: {tool.name}, 更新 {len(changed)} 个, 删除 {len(removed)} 个文件")
+        return True, f"已更新 {len(changed)} 个文件，删除 {len(removed)} 个文件"
+
+    @staticmethod
+    def _has_file(tool: ToolInfo, name: str, size: int) -> bool:
+        try:
+            return os.path.getsize(os.path.join(tool.install_dir, *name.split("/"))) == size
+        except OSError:
+            return False
+
+    @staticmethod
+    def _staging_dir(tool: ToolInfo) -> str:
+        """更新时组装新版本的临时目录"""
+        return tool.install_dir + ".new"
+
+    @classmethod
+    def _delta_path(cls, tool_id: str) -> str:
+        """增量更新时保存远程压缩包片段的本地文件"""
+        return os.path.join(cls.get_cache().staging_dir, f"{tool_id}.delta.zip")
+
+    @staticmethod
+    def _check_archive(tool: ToolInfo, size: int, sha256: str) -> str:
+        """与工具配置的大小和 SHA-256 比较，不符时返回错误信息"""
+        if tool.size and size != tool.size:
+            return f"文件大小不符（期望 {tool.size}，实际 {size}）"
+        if tool.sha256 and sha256 != tool.sha256:
+            return f"SHA-256 不符（期望 {tool.sha256}，实际 {sha256}）"
+        return ""
+
+    @classmethod
+    def verify(cls, tool_id: str) -> tuple[bool, str]:
+        """按安装清单并行校验已安装的文件"""
+        tool = cls.get_tool(tool_id)
+        if not tool:
+            return False, "工具不存在"
+
+        manifest = InstallManifest.load(tool.install_dir)
+        if manifest is None:
+            return False, "没有安装清单，请重新安装"
+
+        bad = manifest.verify(tool.install_dir)
+        if bad:
+            logger.warning(f"工具校验失败: {tool.name}, {len(bad)} 个文件缺失或损坏")
+            return False, f"{len(bad)} 个文件缺失或损坏"
+        logger.info(f"工具校验通过: {tool.name}")
+        return True, f"校验通过，共 {len(manifest.files)} 个文件"
+
+    @classmethod
+    def repair(cls, tool_id: str, progress_callback: Callable[[int, int], None] | None = None) -> tuple[bool, str]:
+        """按安装清单校验，只重新解压缺失或损坏的文件"""
+        tool = cls.get_tool(tool_id)
+        if not tool:
+            return False, "工具不存在"
+
+        manifest = InstallManifest.load(tool.install_dir)
+        if manifest is None:
+            return False, "没有安装清单，请重新安装"
+
+        bad = manifest.verify(tool.install_dir)
+        if not bad:
+            return True, "所有文件完好，无需修复"
+
+        logger.info(f"开始修复工具: {tool.name}, {len(bad)} 个文件")
+        remote = RemoteZip(tool.download_url, cls._delta_path(tool_id))
+        try:
+            # 缓存中有安装时的压缩包时直接使用（按内容查找，不改变下载地址对应的缓存记录）
+            zip_path = cls.get_cache().lookup_content(manifest.archive_sha256) if manifest.archive_sha256 else None
+            if zip_path is None:
+                # 只下载损坏的成员，要求远程成员与清单记录的一致
+                zip_path = cls._fetch_remote_members(remote, manifest, bad, progress_callback)
+                if zip_path is None:
+                    return False, "上游压缩包已更新，请重新安装"
+
+            ArchiveService.extract_zip(zip_path, tool.install_dir, skip_identical=False, members=bad)
+            repaired = InstallManifest(manifest.archive_sha256, {name: manifest.files[name] for name in bad})
+            remaining = repaired.verify(tool.install_dir)
+        except Exception as e:
+            logger.error(f"修复工具失败: {tool.name}, 错误: {e}")
+            return False, f"修复失败: {e}"
+
+        finally:
+            try:
+                os.remove(remote.path)
+            except FileNotFoundError:
+                pass
+
+        if remaining:
+            return False, f"修复后仍有 {len(remaining)} 个文件不符"
+        logger.info(f"工具修复成功: {tool.name}")
+        return True, f"已修复 {len(bad)} 个文件"
+
+    @classmethod
+    def _fetch_remote_members(
+        cls,
+        remote: RemoteZip,
+        manifest: InstallManifest,
+        names: list[str],
+        progress_callback: Callable[[int, int], None] | None
+    ) -> str | None:
+        """下载包含指定成员的压缩包数据，返回本地压缩包路径
+
+        优先通过 Range 只下载这些成员，不支持时下载完整压缩包；远程成员的大小或 CRC32 与清单不一致时返回 None。
+        """
+        def matches(infos: list[zipfile.ZipInfo]) -> bool:
+            members = {info.filename: info for info in infos}
+            for name in names:
+                size, _, crc = manifest.files[name]
+                info = members.get(name)
+                if info is None or (info.file_size, info.CRC) != (size, crc):
+                    return False
+            return True
+
+        try:
+            if not matches(remote.read_directory()):
+                return None
+            remote.fetch_members(names, progress_callback)
+            return remote.path
+        except DeltaUnavailableError as e:
+            logger.debug(f"无法按需下载（{e}），下载完整压缩包")
+
+        zip_path = cls.get_cache().fetch(remote.url, progress_callback)
+        with zipfile.ZipFile(zip_path) as zf:
+            return zip_path if matches(zf.infolist()) else None
+
     @classmethod
     def uninstall(cls, tool_id: str) -> tuple[bool, str]:
         """卸载工具"""
@@ -260,7 +549,6 @@ class ToolsService:
         logger.info(f"开始卸载工具: {tool.name}")
 
         try:
-            import shutil
             shutil.rmtree(tool.install_dir)
             logger.info(f"工具卸载成功: {tool.name}")
             return True, "卸载成功"
@@ -0,0 +1,212 @@
+"""网络状态监视服务
+
+后台轮询命令的原始输出，先对输出做哈希比较，只有内容变化时才解析并通知订阅者。
+轮询间隔自适应：连续无变化或失败时逐步放大到上限，检测到变化、从失败中恢复或手动触发后恢复最小间隔。
+数据源可替换（如在测试中用固定的输出驱动）。
+"""
+
+import hashlib
+import threading
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+from services.network import IPConfigSnapshot, NetworkService
+from services.route import RouteService, RouteSnapshot
+from utils.logger import logger
+
+T = TypeVar("T")
+
+
+class NetworkWatcher(Generic[T]):
+    """轮询式网络状态监视器
+
+    source 返回原始输出，parse 把输出解析为快照；订阅者在监视线程中收到新快照。
+    获取或解析失败时通知订阅者的错误回调（连续失败只通知第一次，恢复后再失败会重新通知）。
+    有订阅者时才运行后台线程，最后一个订阅者退订后线程停止。
+    """
+
+    # 轮询间隔（秒）
+    MIN_INTERVAL = 2.0
+    MAX_INTERVAL = 30.0
+    # 无变化或失败时间隔的放大倍数
+    BACKOFF = 1.5
+
+    def __init__(
+        self,
+        name: str,
+        source: Callable[[], str],
+        parse: Callable[[str], T],
+        min_interval: float | None = None,
+        max_interval: float | None = None
+    ):
+        self.name = name
+        self.parse = parse
+        self.min_interval = min_interval or self.MIN_INTERVAL
+        self.max_interval = max_interval or self.MAX_INTERVAL
+        self.interval = self.min_interval
+        # 最近一次解析的快照
+        self.value: T | None = None
+        # 最近一次轮询的错误（成功后清空）
+        self.error: Exception | None = None
+
+        self._source = source
+        self._digest: bytes | None = None
+        self._subscribers: list[Callable[[T], None]] = []
+        # 订阅者 -> 错误回调
+        self._error_handlers: dict[Callable[[T], None], Callable[[Exception], None]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def set_source(self, source: Callable[[], str]) -> None:
+        """替换数据源，并立即重新轮询"""
+        with self._lock:
+            self._source = source
+            self._digest = None
+        self.trigger()
+
+    def subscribe(
+        self,
+        callback: Callable[[T], None],
+        on_error: Callable[[Exception], None] | None = None
+    ) -> Callable[[], None]:
+        """订阅变化，已有快照时立即回调一次（正处于失败状态时还会回调 on_error）；返回退订函数"""
+        with self._lock:
+            self._subscribers.append(callback)
+            if on_error:
+                self._error_handlers[callback] = on_error
+            value, error = self.value, self.error
+        self.start()
+        if value is not None:
+            callback(value)
+        if error is not None and on_error:
+            on_error(error)
+        return lambda: self.unsubscribe(callback)
+
+    def unsubscribe(self, callback: Callable[[T], None]) -> None:
+        """退订，没有订阅者时停止轮询"""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+            self._error_handlers.pop(callback, None)
+            idle = not self._subscribers
+        if idle:
+            self.stop()
+
+    def trigger(self) -> None:
+        """立即轮询一次，并恢复最小轮询间隔（如刚修改了网络配置）"""
+        self.interval = self.min_interval
+        self._wake.set()
+
+    def poll(self) -> bool:
+        """轮询一次，内容变化时解析并通知订阅者，返回是否变化"""
+        try:
+            output = self._source()
+        except Exception as e:
+            logger.error(f"网络状态轮询失败 [{self.name}]: {e}")
+            self._fail(e)
+            return False
+
+        digest = hashlib.blake2b(output.encode("utf-8", "replace"), digest_size=16).digest()
+        with self._lock:
+            if digest == self._digest:
+                self.error = None
+                return False
+
+        try:
+            value = self.parse(output)
+        except Exception as e:
+            logger.error(f"解析网络状态失败 [{self.name}]: {e}")
+            self._fail(e)
+            return False
+
+        with self._lock:
+            self._digest = digest
+            self.value = value
+            self.error = None
+            subscribers = list(self._subscribers)
+
+        logger.debug(f"网络状态已变化 [{self.name}]，通知 {len(subscribers)} 个订阅者")
+        for callback in subscribers:
+            try:
+                callback(value)
+            except Exception as e:
+                logger.error(f"网络状态订阅者回调失败 [{self.name}]: {e}")
+        return True
+
+    def _fail(self, error: Exception) -> None:
+        """记录轮询错误，从成功状态转为失败时通知订阅者"""
+        with self._lock:
+            first = self.error is None
+            self.error = error
+            handlers = list(self._error_handlers.values()) if first else []
+        for handler in handlers:
+            try:
+                handler(error)
+            except Exception as e:
+                logger.error(f"网络状态错误回调失败 [{self.name}]: {e}")
+
+    def start(self) -> None:
+        """启动后台轮询线程"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            # 每个线程使用独立的停止标志，避免刚停止的旧线程被重新唤醒
+            self._stop = threading.Event()
+            self._wake.clear()
+            self.interval = self.min_interval
+            self._thread = threading.Thread(
+                target=self._run, args=(self._stop,), name=f"wintoolbox-watch-{self.name}", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台轮询线程"""
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            self._thread = None
+
+    def _run(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            failing = self.error is not None
+            if self.poll() or (failing and self.error is None):
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.interval * self.BACKOFF, self.max_interval)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+        logger.debug(f"网络状态监视已停止 [{self.name}]")
+
+
+class WatcherService:
+    """网络状态监视器注册表"""
+
+    _watchers: dict[str, NetworkWatcher] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_ipconfig_watcher(cls) -> NetworkWatcher[IPConfigSnapshot]:
+        """ipconfig /all 监视器（快照同时写入 NetworkService 的缓存）"""
+        return cls._get("ipconfig", NetworkService.fetch_output, NetworkService.snapshot_from_output)
+
+    @classmethod
+    def get_route_watcher(cls) -> NetworkWatcher[RouteSnapshot]:
+        """路由表监视器"""
+        return cls._get("route", RouteService.get_route_output, RouteService.snapshot_from_output)
+
+    @classmethod
+    def _get(cls, name: str, source: Callable[[], str], parse: Callable[[str], T]) -> NetworkWatcher[T]:
+        with cls._lock:
+            watcher = cls._watchers.get(name)
+            if watcher is None:
+                watcher = cls._watchers[name] = NetworkWatcher(name, source, parse)
+            return watcher
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """停止所有监视器"""
+        with cls._lock:
+            for watcher in cls._watchers.values():
+                watcher.stop()
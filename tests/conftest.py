@@ -0,0 +1,74 @@
+"""测试公共配置
+
+设置、日志、工具目录都位于用户目录下的 .wintoolbox 中，
+在导入任何项目模块之前把用户目录指向临时目录，测试不会改动真实配置。
+"""
+
+import io
+import os
+import sys
+import tempfile
+import textwrap
+import zipfile
+
+import pytest
+
+_HOME = tempfile.mkdtemp(prefix="wintoolbox-test-home-")
+os.environ["HOME"] = _HOME
+os.environ["USERPROFILE"] = _HOME
+
+from benchmarks.local_server import LocalServer  # noqa: E402
+from utils.system import COMMAND_DIR_ENV  # noqa: E402
+
+
+@pytest.fixture
+def fake_command(tmp_path, monkeypatch):
+    """在替身命令目录中创建假可执行文件：fake_command(名称, Python 脚本)"""
+    if sys.platform == "win32":
+        pytest.skip("替身命令使用 shebang 脚本，仅在类 Unix 系统上运行")
+    command_dir = tmp_path / "bin"
+    command_dir.mkdir()
+    monkeypatch.setenv(COMMAND_DIR_ENV, str(command_dir))
+
+    def create(name: str, script: str) -> str:
+        path = command_dir / name
+        path.write_text(f"#!{sys.executable}\n{textwrap.dedent(script)}", encoding="utf-8")
+        path.chmod(0o755)
+        return str(path)
+
+    return create
+
+
+@pytest.fixture
+def http_server(monkeypatch):
+    """启动本地 HTTP 替身服务器，请求不经过代理"""
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    monkeypatch.setenv("no_proxy", "127.0.0.1")
+    server = LocalServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+def make_zip(files: dict[str, bytes]) -> bytes:
+    """生成包含 files（成员名 -> 内容）的 ZIP 压缩包"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in files.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def local_tool(http_server, tmp_path, monkeypatch):
+    """从本地服务器 /demo.zip 下载的工具 "demo"，安装目录和下载缓存位于临时目录"""
+    from services.tools import ToolInfo, ToolsService
+
+    monkeypatch.setattr("services.tools.get_tools_dir", lambda: str(tmp_path / "tools"))
+    monkeypatch.setattr(ToolsService, "_cache", None)
+    tool = ToolInfo(
+        name="Demo", description="测试工具", download_url=http_server.url("/demo.zip"),
+        exe_name="demo.exe", folder_name="demo"
+    )
+    monkeypatch.setattr(ToolsService, "_tools", {"demo": tool})
+    return tool
@@ -0,0 +1,114 @@
+"""下载缓存（使用本地 HTTP 替身服务器，统计请求次数）"""
+
+import hashlib
+import os
+
+import pytest
+
+from services.cache import DownloadCache
+from services.downloader import Downloader
+
+DATA = os.urandom(64 * 1024)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DownloadCache(str(tmp_path / "cache"), downloader_factory=lambda **kwargs: Downloader(segments=1, **kwargs))
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_unchanged_resource_is_not_downloaded_again(http_server, cache):
+    http_server.files["/tool.zip"] = DATA
+    url = http_server.url("/tool.zip")
+
+    first = cache.fetch(url)
+    downloads = http_server.count("/tool.zip")
+    second = cache.fetch(url)
+
+    assert first == second and _read(second) == DATA
+    # 第二次只发送了一次条件请求，服务器返回 304
+    assert http_server.count("/tool.zip") == downloads + 1
+    _, headers = http_server.requests[-1]
+    assert headers["If-None-Match"] == http_server.etag("/tool.zip")
+    assert headers["If-Modified-Since"] == http_server.LAST_MODIFIED
+
+
+def test_known_sha256_skips_network(http_server, cache):
+    http_server.files["/a.zip"] = DATA
+    cache.fetch(http_server.url("/a.zip"))
+    requests = len(http_server.requests)
+
+    path = cache.fetch(http_server.url("/mirror/a.zip"), sha256=hashlib.sha256(DATA).hexdigest().upper())
+
+    assert _read(path) == DATA
+    assert len(http_server.requests) == requests
+
+
+def test_changed_resource_replaces_old_blob(http_server, cache):
+    http_server.files["/tool.zip"] = DATA
+    url = http_server.url("/tool.zip")
+    old = cache.fetch(url)
+
+    http_server.files["/tool.zip"] = DATA[::-1]
+    new = cache.fetch(url)
+
+    assert _read(new) == DATA[::-1]
+    assert not os.path.exists(old)
+    assert cache.entry(url).etag == http_server.etag("/tool.zip")
+
+
+def test_same_content_is_stored_once(http_server, cache):
+    http_server.files["/a.zip"] = DATA
+    http_server.files["/b.zip"] = DATA
+
+    assert cache.fetch(http_server.url("/a.zip")) == cache.fetch(http_server.url("/b.zip"))
+    assert os.listdir(cache.blobs_dir) == [hashlib.sha256(DATA).hexdigest()]
+    assert cache.total_size() == len(DATA)
+
+
+def test_uses_cache_when_server_is_unreachable(http_server, cache):
+    http_server.files["/tool.zip"] = DATA
+    url = http_server.url("/tool.zip")
+    path = cache.fetch(url)
+    http_server.stop()
+
+    assert cache.fetch(url) == path
+
+
+def test_evicts_least_recently_used(http_server, tmp_path):
+    for name in ("a", "b", "c"):
+        http_server.files[f"/{name}.zip"] = os.urandom(40 * 1024)
+    cache = DownloadCache(
+        str(tmp_path / "cache"), max_size=100 * 1024,
+        downloader_factory=lambda **kwargs: Downloader(segments=1, **kwargs)
+    )
+
+    a = cache.fetch(http_server.url("/a.zip"))
+    cache.fetch(http_server.url("/b.zip"))
+    # 再次使用 a，之后超出上限时淘汰 b
+    cache.fetch(http_server.url("/a.zip"))
+    cache.fetch(http_server.url("/c.zip"))
+
+    assert os.path.exists(a)
+    assert cache.lookup(http_server.url("/b.zip")) is None
+    assert cache.total_size() <= 100 * 1024
+
+    # 索引写入磁盘，新实例看到相同的内容
+    reopened = DownloadCache(cache.root)
+    assert reopened.lookup(http_server.url("/a.zip")) == a
+
+
+def test_lookup_content_keeps_url_entry(http_server, cache):
+    http_server.files["/old.zip"] = DATA
+    http_server.files["/tool.zip"] = DATA[::-1]
+    old = cache.fetch(http_server.url("/old.zip"))
+    cache.fetch(http_server.url("/tool.zip"))
+
+    assert cache.lookup_content(hashlib.sha256(DATA).hexdigest()) == old
+    assert cache.lookup_content("0" * 64) is None
+    # 修复时按内容取旧压缩包，下载地址仍指向新内容
+    assert cache.entry(http_server.url("/tool.zip")).sha256 == hashlib.sha256(DATA[::-1]).hexdigest()
@@ -0,0 +1,191 @@
+"""流式下载器（使用本地 HTTP 替身服务器）"""
+
+import hashlib
+import os
+import threading
+
+import pytest
+
+from services.downloader import DownloadCancelledError, Downloader, DownloadError
+
+DATA = os.urandom(300 * 1024)
+
+
+def _downloader(**kwargs) -> Downloader:
+    # 不等待重试，默认单连接
+    kwargs.setdefault("segments", 1)
+    return Downloader(chunk_size=16 * 1024, backoff_base=0, **kwargs)
+
+
+def test_resumes_after_connection_drop(http_server, tmp_path):
+    http_server.files["/tool.zip"] = DATA
+    http_server.truncate = [100 * 1024, 50 * 1024]
+    dest = str(tmp_path / "tool.zip")
+    downloader = _downloader()
+
+    downloader.download(http_server.url("/tool.zip"), dest)
+
+    with open(dest, "rb") as f:
+        assert f.read() == DATA
+    assert downloader.sha256 == hashlib.sha256(DATA).hexdigest()
+    assert downloader.validators["etag"] == http_server.etag("/tool.zip")
+    ranges = [headers.get("Range") for _, headers in http_server.requests]
+    assert ranges == [None, f"bytes={100 * 1024}-", f"bytes={150 * 1024}-"]
+    assert not os.path.exists(Downloader.part_path(dest))
+    assert not os.path.exists(Downloader.meta_path(dest))
+
+
+def test_gives_up_after_max_retries(http_server, tmp_path):
+    http_server.files["/tool.zip"] = DATA
+    # 每次都在开头断开，没有任何进展
+    http_server.truncate = [0] * 10
+
+    with pytest.raises(DownloadError, match="已重试 2 次"):
+        _downloader(max_retries=2).download(http_server.url("/tool.zip"), str(tmp_path / "tool.zip"))
+
+    assert http_server.count("/tool.zip") == 3
+
+
+def _cancel_after(server, url: str, dest: str, size: int) -> None:
+    """限速下载，收到 size 字节后取消"""
+    server.rate = 512 * 1024
+    cancel = threading.Event()
+
+    def on_progress(done: int, total: int) -> None:
+        if done >= size:
+            cancel.set()
+
+    with pytest.raises(DownloadCancelledError):
+        _downloader().download(url, dest, on_progress, cancel)
+    server.rate = 0
+
+
+def test_cancel_keeps_part_and_resumes_in_new_downloader(http_server, tmp_path):
+    http_server.files["/tool.zip"] = DATA
+    dest = str(tmp_path / "tool.zip")
+
+    _cancel_after(http_server, http_server.url("/tool.zip"), dest, 64 * 1024)
+
+    kept = os.path.getsize(Downloader.part_path(dest))
+    assert 64 * 1024 <= kept < len(DATA)
+    assert not os.path.exists(dest)
+
+    # 模拟重启：新的下载器从磁盘上的 .part 和校验信息续传
+    downloader = _downloader()
+    downloader.download(http_server.url("/tool.zip"), dest)
+
+    with open(dest, "rb") as f:
+        assert f.read() == DATA
+    assert downloader.sha256 == hashlib.sha256(DATA).hexdigest()
+    _, headers = http_server.requests[-1]
+    assert headers["Range"] == f"bytes={kept}-"
+    assert headers["If-Range"] == http_server.etag("/tool.zip")
+
+
+def test_restarts_when_resource_changed(http_server, tmp_path):
+    http_server.files["/tool.zip"] = DATA
+    dest = str(tmp_path / "tool.zip")
+    _cancel_after(http_server, http_server.url("/tool.zip"), dest, 64 * 1024)
+
+    # 服务器上的文件已更新，If-Range 不匹配时返回完整的新内容
+    changed = DATA[::-1]
+    http_server.files["/tool.zip"] = changed
+    downloader = _downloader()
+    downloader.download(http_server.url("/tool.zip"), dest)
+
+    with open(dest, "rb") as f:
+        assert f.read() == changed
+    assert downloader.sha256 == hashlib.sha256(changed).hexdigest()
+    assert http_server.requests[-1][1]["Range"].startswith("bytes=")
+
+
+@pytest.fixture
+def segmented(monkeypatch):
+    """300 KB 的文件分成 4 段"""
+    monkeypatch.setattr(Downloader, "MIN_SEGMENT_SIZE", 64 * 1024)
+    return lambda: _downloader(segments=4)
+
+
+def test_segmented_download_retries_failed_segment(http_server, tmp_path, segmented):
+    http_server.files["/tool.zip"] = DATA
+    # 第一个是 Range 探测请求，截断随后的一个分段请求
+    http_server.truncate = [1, 10 * 1024]
+    dest = str(tmp_path / "tool.zip")
+    downloader = segmented()
+
+    downloader.download(http_server.url("/tool.zip"), dest)
+
+    with open(dest, "rb") as f:
+        assert f.read() == DATA
+    assert downloader.sha256 == hashlib.sha256(DATA).hexdigest()
+    ranges = sorted(headers["Range"] for _, headers in http_server.requests)
+    size = len(DATA) // 4
+    starts = [0, size, 2 * size, 3 * size]
+    assert "bytes=0-0" in ranges and len(ranges) == 6
+    assert {f"bytes={start}-{start + size - 1}" for start in starts} <= set(ranges)
+    # 被截断的分段从断开处续传
+    assert any(f"bytes={start + 10 * 1024}-" in r for r in ranges for start in starts)
+
+
+@pytest.fixture
+def part_reads(monkeypatch):
+    """记录下载器以读取方式打开 .part 文件的次数（补算 SHA-256 时才会读取）"""
+    reads: list[str] = []
+
+    def spy(file, mode="r", *args, **kwargs):
+        if str(file).endswith(".part") and "r" in mode and "+" not in mode:
+            reads.append(str(file))
+        return open(file, mode, *args, **kwargs)
+
+    monkeypatch.setattr("services.downloader.open", spy, raising=False)
+    return reads
+
+
+@pytest.mark.parametrize("buffer_size, rereads", [(Downloader.HASH_BUFFER_SIZE, 0), (32 * 1024, 1)])
+def test_segmented_hash_without_second_pass(http_server, tmp_path, segmented, part_reads, monkeypatch,
+                                            buffer_size, rereads):
+    monkeypatch.setattr(Downloader, "HASH_BUFFER_SIZE", buffer_size)
+    http_server.files["/tool.zip"] = DATA
+    # 限速使各分段同时进行，后面分段的数据先于第一段完成到达
+    http_server.rate = 512 * 1024
+    dest = str(tmp_path / "tool.zip")
+    downloader = segmented()
+
+    downloader.download(http_server.url("/tool.zip"), dest)
+
+    assert downloader.sha256 == hashlib.sha256(DATA).hexdigest()
+    # 乱序数据块暂存在内存中，不再读回文件；超出暂存上限时才从文件补算
+    assert len(part_reads) == rereads
+    assert not downloader._pending and downloader._buffered == 0
+
+
+def test_segmented_cancel_resumes_remaining_ranges(http_server, tmp_path, segmented):
+    http_server.files["/tool.zip"] = DATA
+    http_server.rate = 256 * 1024
+    dest = str(tmp_path / "tool.zip")
+    cancel = threading.Event()
+
+    def on_progress(done: int, total: int) -> None:
+        if done >= 64 * 1024:
+            cancel.set()
+
+    with pytest.raises(DownloadCancelledError):
+        segmented().download(http_server.url("/tool.zip"), dest, on_progress, cancel)
+
+    assert os.path.getsize(Downloader.part_path(dest)) == len(DATA)
+    cancelled_at = len(http_server.requests)
+    http_server.rate = 0
+    downloader = segmented()
+    downloader.download(http_server.url("/tool.zip"), dest)
+
+    with open(dest, "rb") as f:
+        assert f.read() == DATA
+    assert downloader.sha256 == hashlib.sha256(DATA).hexdigest()
+    # 续传不再探测，各分段从已下载的位置继续
+    resumed = [headers["Range"] for _, headers in http_server.requests[cancelled_at:]]
+    assert resumed and "bytes=0-0" not in resumed
+    requested = 0
+    for r in resumed:
+        start, end = r.removeprefix("bytes=").split("-")
+        requested += int(end) - int(start) + 1
+    assert requested <= len(DATA) - 64 * 1024
@@ -0,0 +1,58 @@
+"""下载管理（无界面，使用本地 HTTP 替身服务器）"""
+
+import os
+from collections import deque
+
+import pytest
+from conftest import make_zip
+
+from services.downloads import DownloadJob, DownloadManager
+from services.progress import ProgressChannel
+
+FILES = {"demo.exe": os.urandom(256 * 1024), "readme.txt": b"demo"}
+
+
+@pytest.fixture
+def manager(monkeypatch, local_tool, http_server):
+    http_server.files["/demo.zip"] = make_zip(FILES)
+    monkeypatch.setattr(DownloadManager, "_jobs", {})
+    monkeypatch.setattr(DownloadManager, "_pending", deque())
+    monkeypatch.setattr(DownloadManager, "progress", ProgressChannel())
+    yield DownloadManager
+    DownloadManager.shutdown()
+
+
+def test_download_installs_tool_and_reports_progress(manager, local_tool):
+    job = manager.submit("demo")
+
+    assert job.future.result(timeout=30) == (True, "安装成功")
+    assert job.state == DownloadJob.DONE
+    assert local_tool.is_installed()
+    with open(local_tool.exe_path, "rb") as f:
+        assert f.read() == FILES["demo.exe"]
+    update = manager.progress.drain()["demo"]
+    assert update.done and update.total == job.total > 0
+
+
+def test_duplicate_submit_joins_running_job(manager, http_server):
+    http_server.rate = 256 * 1024
+
+    job = manager.submit("demo")
+    assert manager.submit("demo") is job
+    assert job.future.result(timeout=30)[0]
+
+    assert [request for request, _ in http_server.requests].count("/demo.zip") <= 2
+    assert manager.get_jobs() == [job]
+
+
+def test_cancel_running_job(manager, http_server, local_tool):
+    http_server.rate = 64 * 1024
+    job = manager.submit("demo")
+
+    manager.cancel("demo")
+
+    assert job.future.result(timeout=30) == (False, "下载已取消")
+    assert job.state == DownloadJob.CANCELLED
+    assert not local_tool.is_installed()
+    manager.clear_finished()
+    assert manager.get_jobs() == []
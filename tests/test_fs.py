@@ -0,0 +1,69 @@
+"""目录文件名快照"""
+
+import os
+import time
+
+import pytest
+
+from utils.fs import DirectorySnapshot
+
+
+@pytest.fixture
+def tools_dir(tmp_path):
+    for name in ("procmon.exe", "PsExec.exe"):
+        (tmp_path / name).write_bytes(b"")
+    _age(tmp_path)
+    return tmp_path
+
+
+def _age(path, seconds: float = 60) -> None:
+    """把目录修改时间调到过去，避免落在重新扫描的时间窗口内"""
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_lookups_reuse_one_scan(tools_dir, monkeypatch):
+    scans = []
+    real_scandir = os.scandir
+
+    def scandir(path):
+        scans.append(path)
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    snapshot = DirectorySnapshot()
+
+    assert snapshot.contains(str(tools_dir), "PROCMON.EXE")
+    assert snapshot.contains(str(tools_dir), "psexec.exe")
+    assert not snapshot.contains(str(tools_dir), "tcpview.exe")
+    assert len(scans) == 1
+
+    snapshot.invalidate()
+    snapshot.names(str(tools_dir))
+    assert len(scans) == 2
+
+
+def test_directory_change_invalidates(tools_dir):
+    snapshot = DirectorySnapshot()
+    assert not snapshot.contains(str(tools_dir), "tcpview.exe")
+
+    (tools_dir / "tcpview.exe").write_bytes(b"")
+    _age(tools_dir, 30)
+
+    assert snapshot.contains(str(tools_dir), "tcpview.exe")
+
+
+def test_recent_mtime_is_rescanned(tools_dir):
+    snapshot = DirectorySnapshot()
+    (tools_dir / "tcpview.exe").write_bytes(b"")
+    snapshot.names(str(tools_dir))
+    # 修改时间不变，但扫描时目录刚被修改过，再次查询时重新扫描
+    stat = os.stat(tools_dir)
+    (tools_dir / "handle.exe").write_bytes(b"")
+    os.utime(tools_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert snapshot.contains(str(tools_dir), "handle.exe")
+
+
+def test_missing_directory_is_empty(tmp_path):
+    assert DirectorySnapshot().names(str(tmp_path / "missing")) == frozenset()
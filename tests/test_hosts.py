@@ -0,0 +1,254 @@
+"""HOSTS 模型与服务"""
+
+import json
+import os
+import time
+
+import pytest
+
+from benchmarks.bench_hosts import make_blocklist
+from services.hosts import HostsDocument, HostsPatch, HostsService, parse_blocklist_line
+
+# 解析 200k 行的时间预算（秒），CI 可按机器性能通过环境变量调整
+PARSE_BUDGET_S = float(os.environ.get("WINTOOLBOX_HOSTS_PARSE_BUDGET_S", "3"))
+
+SAMPLE = (
+    "# Copyright (c) 1993-2009 Microsoft Corp.\r\n"
+    "\r\n"
+    "127.0.0.1       localhost\r\n"
+    "10.0.0.5\tintranet.corp Intranet.Corp.  # 内网\r\n"
+    "   0.0.0.0 ads.example.com\r\n"
+    "10.0.0.6 intranet.corp\r\n"
+    "0.0.0.0 ads.example.com\r\n"
+    "::1 intranet.corp\r\n"
+    "#0.0.0.0 disabled.example.com\r\n"
+    "0.0.0.0 no-newline.example.com"
+)
+
+
+def test_round_trip_is_byte_exact():
+    document = HostsDocument.parse(SAMPLE)
+
+    assert document.serialize() == SAMPLE
+    assert document.newline == "\r\n"
+    assert len(document) == 10
+
+
+def test_index_lookup_is_case_insensitive():
+    document = HostsDocument.parse(SAMPLE)
+
+    assert "INTRANET.corp" in document
+    assert "disabled.example.com" not in document
+    assert [(e.ip, e.domain) for e in document.lookup("intranet.corp")] == [
+        ("10.0.0.5", "intranet.corp"),
+        ("10.0.0.6", "intranet.corp"),
+        ("::1", "intranet.corp"),
+    ]
+    assert document.lines[3].comment == " 内网"
+
+
+def test_duplicates_and_conflicts():
+    document = HostsDocument.parse(SAMPLE)
+
+    assert list(document.duplicates()) == ["ads.example.com"]
+    # ::1 属于另一地址族，不算冲突
+    assert {e.ip for e in document.conflicts()["intranet.corp"]} == {"10.0.0.5", "10.0.0.6", "::1"}
+    assert "ads.example.com" not in document.conflicts()
+
+
+def test_add_and_remove_keep_index_and_other_lines():
+    document = HostsDocument.parse(SAMPLE)
+
+    document.add("0.0.0.0", "new.example.com")
+    assert document.remove("intranet.corp", "10.0.0.5") == 1
+    assert document.remove("ads.example.com") == 2
+
+    assert document.serialize() == (
+        "# Copyright (c) 1993-2009 Microsoft Corp.\r\n"
+        "\r\n"
+        "127.0.0.1       localhost\r\n"
+        "10.0.0.5\tIntranet.Corp.\t# 内网\r\n"
+        "10.0.0.6 intranet.corp\r\n"
+        "::1 intranet.corp\r\n"
+        "#0.0.0.0 disabled.example.com\r\n"
+        "0.0.0.0 no-newline.example.com\r\n"
+        "0.0.0.0\tnew.example.com\r\n"
+    )
+    assert [e.ip for e in document.lookup("new.example.com")] == ["0.0.0.0"]
+    assert "ads.example.com" not in document
+
+
+def test_parse_200k_lines_within_budget():
+    content = make_blocklist(200_000)
+
+    start = time.perf_counter()
+    document = HostsDocument.parse(content)
+    elapsed = time.perf_counter() - start
+
+    assert len(document) == 200_000
+    assert document.serialize() == content
+    assert elapsed < PARSE_BUDGET_S, f"解析 200k 行耗时 {elapsed:.2f} s，超过预算 {PARSE_BUDGET_S} s"
+
+
+@pytest.fixture
+def hosts_file(tmp_path, monkeypatch):
+    """指向临时目录的 HOSTS 文件、备份目录和变更日志"""
+    path = tmp_path / "etc" / "hosts"
+    path.parent.mkdir()
+    path.write_bytes(SAMPLE.encode("utf-8"))
+    config_dir = tmp_path / "config"
+    monkeypatch.setattr(HostsService, "_config_dir", str(config_dir))
+    monkeypatch.setattr(HostsService, "_backup_dir", str(config_dir / "hosts_backups"))
+    monkeypatch.setattr(HostsService, "_journal_file", str(config_dir / "hosts_journal.jsonl"))
+    HostsService.set_path(str(path))
+    yield path
+    HostsService.set_path(None)
+
+
+def test_patch_round_trips_through_dict():
+    patch = HostsPatch(added=[("0.0.0.0", "a.example.com")], removed=[("10.0.0.5", "b.example.com")])
+
+    assert HostsPatch.from_dict(json.loads(json.dumps(patch.to_dict()))) == patch
+    assert patch.inverse().inverse() == patch
+
+
+def test_apply_patch_touches_only_changed_lines_and_undoes(hosts_file):
+    applied = HostsService.apply_patch(HostsPatch(
+        added=[("0.0.0.0", "new.example.com")],
+        removed=[("127.0.0.1", "localhost")],
+    ))
+
+    content = hosts_file.read_bytes().decode("utf-8")
+    assert applied.added == [("0.0.0.0", "new.example.com")]
+    assert "localhost" not in content
+    assert content.startswith("# Copyright (c) 1993-2009 Microsoft Corp.\r\n\r\n10.0.0.5\tintranet.corp")
+    assert content.endswith("0.0.0.0 no-newline.example.com\r\n0.0.0.0\tnew.example.com\r\n")
+
+    undone = HostsService.undo()
+
+    assert undone == HostsPatch(added=[("127.0.0.1", "localhost")], removed=[("0.0.0.0", "new.example.com")])
+    assert HostsService.load().has_entry("127.0.0.1", "localhost")
+    assert "new.example.com" not in HostsService.load()
+    # 撤销记录本身不会再被撤销
+    assert HostsService.undo() is None
+
+
+def test_full_save_and_raw_write_are_journaled(hosts_file):
+    document = HostsService.load()
+    document.remove_line(document.lines[0])
+    document.remove("ads.example.com")
+    HostsService.save(document)
+    HostsService.write("127.0.0.1 localhost\n0.0.0.0 raw.example.com\n")
+
+    records = HostsService.read_journal()
+    assert [r["id"] for r in records] == [1, 2]
+    assert records[0]["removed"] == [["0.0.0.0", "ads.example.com"]]
+    assert ["0.0.0.0", "raw.example.com"] in records[1]["added"]
+
+    HostsService.undo()
+    assert HostsService.load().has_entry("10.0.0.5", "intranet.corp")
+    assert "raw.example.com" not in HostsService.load()
+    HostsService.undo()
+    assert HostsService.load().has_entry("0.0.0.0", "ads.example.com")
+
+
+def test_import_is_journaled_and_undo_is_linear(hosts_file, tmp_path):
+    blocklist = tmp_path / "list.txt"
+    blocklist.write_text("".join(f"ads{i}.example.org\n" for i in range(50_000)), encoding="utf-8")
+    HostsService.import_blocklists([str(blocklist)])
+    assert len(HostsService.load()) == 10 + 1 + 50_000
+
+    start = time.perf_counter()
+    undone = HostsService.undo()
+    elapsed = time.perf_counter() - start
+
+    assert undone is not None and len(undone.removed) == 50_000
+    # 导入前的内容之后只多了导入说明行和补上的换行符
+    assert HostsService.load().serialize() == SAMPLE + "\r\n# 导入自 list.txt\r\n"
+    assert elapsed < 10
+
+
+def test_import_journal_is_streamed_as_one_record(hosts_file, tmp_path):
+    HostsService.apply_patch(HostsPatch(added=[("0.0.0.0", "before.example.com")]))
+    blocklist = tmp_path / "list.txt"
+    blocklist.write_text("".join(f"ads{i}.example.org\n" for i in range(20_000)), encoding="utf-8")
+
+    HostsService.import_blocklists([str(blocklist)], ip="::")
+    HostsService.apply_patch(HostsPatch(added=[("0.0.0.0", "after.example.com")]))
+
+    before, imported, after = HostsService.read_journal()
+    assert [r["id"] for r in (before, imported, after)] == [1, 2, 3]
+    assert imported["removed"] == []
+    assert imported["added"] == [["::", f"ads{i}.example.org"] for i in range(20_000)]
+    assert HostsService.undo() == HostsPatch(removed=[("0.0.0.0", "after.example.com")])
+    undone = HostsService.undo()
+    assert undone is not None and len(undone.removed) == 20_000
+    assert "ads0.example.org" not in HostsService.load()
+
+
+def test_failed_replace_keeps_original(hosts_file, monkeypatch):
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+
+    with pytest.raises(OSError):
+        HostsService.write("0.0.0.0 broken.example.com\n")
+
+    assert hosts_file.read_bytes().decode("utf-8") == SAMPLE
+    assert os.listdir(hosts_file.parent) == ["hosts"]
+    assert HostsService.read_journal() == []
+
+
+def test_backup_ring(hosts_file, monkeypatch):
+    monkeypatch.setattr(HostsService, "BACKUP_COUNT", 2)
+    for i in range(4):
+        HostsService.apply_patch(HostsPatch(added=[("0.0.0.0", f"ring{i}.example.com")]))
+
+    backups = HostsService.list_backups()
+    assert len(backups) == 2
+    with open(backups[-1], encoding="utf-8", newline="") as f:
+        assert "ring2.example.com" in f.read()
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("0.0.0.0 ads.example.com tracker.example.com # 注释", ["ads.example.com", "tracker.example.com"]),
+    ("127.0.0.1 localhost", []),
+    ("Ads.Example.COM.", ["ads.example.com"]),
+    ("||ads.example.com^", ["ads.example.com"]),
+    ("||ads.example.com^$important", ["ads.example.com"]),
+    ("! adblock 注释", []),
+    ("# hosts 注释", []),
+    ("", []),
+    ("@@||ads.example.com^", None),
+    ("||ads.example.com/path^", None),
+    ("example.com/path", None),
+    # 纯 IP 地址不是域名
+    ("1.2.3.4", None),
+    ("0.0.0.0 1.2.3.4", None),
+    ("||1.2.3.4^", None),
+    ("::1", None),
+])
+def test_parse_blocklist_line(line, expected):
+    assert parse_blocklist_line(line) == expected
+
+
+def test_import_counts(hosts_file, tmp_path):
+    first = tmp_path / "a.txt"
+    first.write_text(
+        "0.0.0.0 ads.example.com\n"       # 已存在相同映射
+        "intranet.corp\n"                 # 已映射到其他 IP
+        "1.2.3.4\n"                       # 无法识别
+        "new.example.com\n",
+        encoding="utf-8"
+    )
+    second = tmp_path / "b.txt"
+    second.write_text("||new.example.com^\n||other.example.com^\n", encoding="utf-8")
+
+    result = HostsService.import_blocklists([str(first), str(second)])
+
+    assert (result.added, result.skipped, result.conflicts, result.invalid) == (2, 2, 1, 1)
+    document = HostsService.load()
+    assert document.has_entry("0.0.0.0", "new.example.com")
+    assert document.has_entry("0.0.0.0", "other.example.com")
+    assert "1.2.3.4" not in document
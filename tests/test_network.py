@@ -0,0 +1,85 @@
+"""ipconfig /all 解析"""
+
+from pathlib import Path
+
+from services.network import NetworkService
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _parse(name: str):
+    return NetworkService._parse_ipconfig((FIXTURES / name).read_text(encoding="utf-8"))
+
+
+def test_parse_chinese_output():
+    adapters = _parse("ipconfig_zh.txt")
+
+    # Teredo 只有 IPv6 地址，WLAN 未连接，均不显示
+    assert [a.name for a in adapters] == ["以太网适配器 以太网", "未知适配器 OpenVPN Wintun"]
+
+    ethernet, vpn = adapters
+    assert ethernet.ipv4 == "192.168.1.100"
+    assert ethernet.mask == "255.255.255.0"
+    assert ethernet.gateways == ["fe80::1%12", "192.168.1.1"]
+    assert ethernet.gateway == "192.168.1.1"
+    assert ethernet.dns_servers == ["192.168.1.1", "114.114.114.114", "240e:3b0::1"]
+    assert ethernet.dns == "192.168.1.1"
+    assert ethernet.ipv6_addresses == ["240e:3b0:1234::5", "fe80::1c2d:3e4f:5a6b:7c8d%12"]
+    assert ethernet.mac == "00-1A-2B-3C-4D-5E"
+    assert ethernet.dhcp_enabled and ethernet.autoconfig_enabled
+    assert ethernet.dhcp_server == "192.168.1.1"
+    assert ethernet.lease_obtained == "2026年10月18日 8:00:00"
+    assert ethernet.dhcpv6_iaid == "100670000"
+    assert ethernet.netbios == "已启用"
+
+    # 描述中的 "Adapter" 不会被当作新的适配器
+    assert vpn.description == "TAP-Windows Adapter V9"
+    assert vpn.ipv4_addresses == ["10.8.0.6", "10.9.0.6"]
+    assert vpn.masks == ["255.255.255.0", "255.255.0.0"]
+    assert vpn.gateways == []
+    assert vpn.gateway == ""
+    assert not vpn.dhcp_enabled
+    assert vpn.wins_servers == ["10.8.0.2"]
+    assert str(vpn.interface) == "10.8.0.6/24"
+
+
+def test_parse_english_output():
+    (adapter,) = _parse("ipconfig_en.txt")
+
+    assert adapter.name == "Ethernet adapter Ethernet"
+    assert adapter.dns_suffix == "corp.example.com"
+    assert adapter.ipv4 == "172.16.5.20"
+    assert adapter.ipv4_int == (172 << 24) | (16 << 16) | (5 << 8) | 20
+    assert adapter.gateway == "172.16.4.1"
+    assert adapter.dns_servers == ["172.16.4.10", "172.16.4.11"]
+    assert adapter.lease_expires == "Monday, October 19, 2026 8:00:00 AM"
+    # 未识别的多值字段合并到 extra
+    assert adapter.extra["Search Domains"] == "corp.example.com, example.com"
+
+
+def test_snapshot_reused_within_ttl(fake_command, tmp_path, monkeypatch):
+    calls = tmp_path / "calls.txt"
+    fake_command("ipconfig", f"""
+        with open({str(calls)!r}, "a") as f:
+            f.write("x")
+        print(open({str(FIXTURES / "ipconfig_en.txt")!r}, encoding="utf-8").read())
+    """)
+    monkeypatch.setattr(NetworkService, "_snapshot", None)
+
+    def runs() -> int:
+        return len(calls.read_text()) if calls.exists() else 0
+
+    first = NetworkService.get_snapshot()
+    assert [a.name for a in NetworkService.get_adapters()] == ["Ethernet adapter Ethernet"]
+    assert NetworkService.get_ipconfig_output() == first.output
+    assert runs() == 1
+
+    # 快照超过有效期后重新执行
+    first.timestamp -= NetworkService.SNAPSHOT_TTL + 1
+    second = NetworkService.get_snapshot()
+    assert second is not first
+    assert runs() == 2
+
+    # max_age=0 强制刷新
+    assert NetworkService.get_snapshot(max_age=0) is not second
+    assert runs() == 3
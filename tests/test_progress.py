@@ -0,0 +1,61 @@
+"""下载进度通道"""
+
+from services.progress import ProgressChannel
+
+
+class Clock:
+    def __init__(self):
+        self.now: float = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_throttled_update_is_flushed_on_next_drain():
+    clock = Clock()
+    channel = ProgressChannel(max_rate=10, clock=clock)
+
+    channel.report("a", 10, 100)
+    clock.now += 0.01
+    channel.report("a", 20, 100)
+    channel.report("a", 30, 100)
+
+    assert channel.drain()["a"].downloaded == 10
+    # 未满最小间隔时不补发
+    assert channel.drain() == {}
+
+    clock.now += 0.1
+    update = channel.drain()["a"]
+    assert update.downloaded == 30
+    assert update.speed > 0
+    assert channel.drain() == {}
+
+
+def test_emitted_update_clears_pending():
+    clock = Clock()
+    channel = ProgressChannel(max_rate=10, clock=clock)
+
+    channel.report("a", 10, 100)
+    channel.report("a", 20, 100)
+    clock.now += 0.2
+    channel.report("a", 40, 100)
+    clock.now += 0.2
+
+    assert channel.drain()["a"].downloaded == 40
+    assert channel.drain() == {}
+
+
+def test_completion_and_finish_are_never_dropped():
+    clock = Clock()
+    channel = ProgressChannel(max_rate=10, clock=clock)
+
+    channel.report("a", 10, 100)
+    channel.report("a", 100, 100)
+    assert channel.drain()["a"].downloaded == 100
+
+    channel.report("b", 10, 0)
+    channel.report("b", 50, 0)
+    channel.finish("b", 60, 0)
+    clock.now += 1
+    update = channel.drain()["b"]
+    assert update.done and update.downloaded == 60
@@ -0,0 +1,208 @@
+"""路由表模型与服务"""
+
+import os
+import random
+import time
+
+from benchmarks.bench_route_diff import make_routes, mutate
+from services.route import RouteChange, RouteEntry, RouteIndex, RouteService, RouteSnapshot
+
+# 10k 行排序或筛选一次的时间预算（秒），CI 可按机器性能通过环境变量调整
+QUERY_BUDGET_S = float(os.environ.get("WINTOOLBOX_ROUTE_QUERY_BUDGET_S", "0.05"))
+
+
+def test_diff_reports_only_changed_routes():
+    old = make_routes(1000)
+    new = mutate(old, random.Random(0), 0)
+
+    diff = RouteService.diff(old, new)
+
+    assert (len(diff.added), len(diff.removed), len(diff.changed)) == (5, 5, 5)
+    assert len(diff.keys) == len(new)
+    assert all(route.metric == 25 for route in diff.added.values())
+    assert RouteService.diff(new, new).is_empty
+
+
+def test_diff_keeps_duplicate_routes_apart():
+    route = RouteEntry.parse("10.0.0.0", "255.0.0.0", "On-link", "10.0.0.1", "25")
+    twin = RouteEntry.parse("10.0.0.0", "255.0.0.0", "On-link", "10.0.0.1", "35")
+
+    diff = RouteService.diff([route], [route, twin])
+
+    assert list(diff.added.values()) == [twin]
+    assert not diff.removed and not diff.changed
+
+
+ROUTE_PRINT = """\
+===========================================================================
+IPv4 Route Table
+===========================================================================
+Active Routes:
+Network Destination        Netmask          Gateway       Interface  Metric
+          0.0.0.0          0.0.0.0      192.168.1.1    192.168.1.100     25
+         10.1.0.0      255.255.0.0      192.168.1.1    192.168.1.100     30
+         10.3.0.0      255.255.0.0         On-link     192.168.1.100    281
+      192.168.1.0    255.255.255.0         On-link     192.168.1.100    281
+===========================================================================
+Persistent Routes:
+  Network Address          Netmask  Gateway Address  Metric
+         10.1.0.0      255.255.0.0      192.168.1.1       5
+          0.0.0.0          0.0.0.0      192.168.1.1  Default
+===========================================================================
+"""
+
+
+def test_parser_reads_persistent_routes():
+    table = RouteService._parse_table(ROUTE_PRINT)
+
+    assert [route.destination for route in table.routes] == ["0.0.0.0", "10.1.0.0", "10.3.0.0", "192.168.1.0"]
+    assert table.persistent == {
+        (10 << 24 | 1 << 16, 16, 192 << 24 | 168 << 16 | 1 << 8 | 1): "5",
+        (0, 0, 192 << 24 | 168 << 16 | 1 << 8 | 1): None,
+    }
+
+
+def test_rollback_restores_metric_and_persistence(fake_command, tmp_path):
+    log = tmp_path / "route.log"
+    fake_command("route", f"""
+        import sys
+        args = sys.argv[1:]
+        if args[:1] == ["print"]:
+            print({ROUTE_PRINT!r})
+            sys.exit(0)
+        with open({str(log)!r}, "a") as f:
+            f.write(" ".join(args) + "\\n")
+        if "10.2.0.0" in args:
+            print("The route addition failed")
+            sys.exit(1)
+    """)
+    changes = [
+        RouteChange("delete", "10.1.0.0", "255.255.0.0"),
+        RouteChange("delete", "10.3.0.0", "255.255.0.0"),
+        RouteChange("add", "10.2.0.0", "255.255.0.0", "192.168.1.1"),
+    ]
+
+    result = RouteService.apply_batch(changes)
+
+    assert result.failed == [(changes[2], "The route addition failed")]
+    assert result.rolled_back == [changes[1], changes[0]]
+    assert not result.rollback_failed
+    # 回滚命令并行执行，不比较顺序
+    assert set(log.read_text().splitlines()[-2:]) == {
+        "add 10.3.0.0 mask 255.255.0.0 192.168.1.100 metric 281",
+        "-p add 10.1.0.0 mask 255.255.0.0 192.168.1.1 metric 5",
+    }
+
+
+def test_batch_applies_changes_in_file_order(fake_command, tmp_path):
+    log = tmp_path / "route.log"
+    fake_command("route", f"""
+        import sys
+        args = sys.argv[1:]
+        if args[:1] == ["print"]:
+            print({ROUTE_PRINT!r})
+            sys.exit(0)
+        with open({str(log)!r}, "a") as f:
+            f.write(" ".join(args) + "\\n")
+        if "192.168.1.9" in args:
+            print("The route addition failed")
+            sys.exit(1)
+    """)
+    # 先添加替代的默认路由再删除原来的，中间不会没有默认路由
+    changes = [
+        RouteChange("add", "0.0.0.0", "0.0.0.0", "192.168.1.254", "30"),
+        RouteChange("delete", "0.0.0.0", "0.0.0.0", "192.168.1.1"),
+        RouteChange("add", "0.0.0.0", "0.0.0.0", "192.168.1.253", "40"),
+        RouteChange("add", "0.0.0.0", "0.0.0.0", "192.168.1.9", "50"),
+    ]
+
+    result = RouteService.apply_batch(changes)
+
+    assert result.applied == changes[:3]
+    assert result.rolled_back == [changes[2], changes[1], changes[0]]
+    # 同一目标网络的变更和回滚都按顺序执行
+    assert log.read_text().splitlines() == [
+        "add 0.0.0.0 mask 0.0.0.0 192.168.1.254 metric 30",
+        "delete 0.0.0.0 mask 0.0.0.0 192.168.1.1",
+        "add 0.0.0.0 mask 0.0.0.0 192.168.1.253 metric 40",
+        "add 0.0.0.0 mask 0.0.0.0 192.168.1.9 metric 50",
+        "delete 0.0.0.0 mask 0.0.0.0 192.168.1.253",
+        # 持久路由的跃点数为 Default，恢复时不指定
+        "-p add 0.0.0.0 mask 0.0.0.0 192.168.1.1",
+        "delete 0.0.0.0 mask 0.0.0.0 192.168.1.254",
+    ]
+
+
+def test_route_entry_keeps_addresses_as_integers():
+    route = RouteEntry.parse("10.1.0.0", "255.255.0.0", "On-link", "192.168.1.100", "30")
+
+    assert (route.destination_ip, route.prefix, route.gateway_ip, route.metric) == (10 << 24 | 1 << 16, 16, None, 30)
+    assert (route.destination, route.mask, route.gateway, route.interface) == (
+        "10.1.0.0", "255.255.0.0", "On-link", "192.168.1.100"
+    )
+    assert route.contains(10 << 24 | 1 << 16 | 5) and not route.contains(10 << 24 | 2 << 16)
+    assert not hasattr(route, "__dict__")
+
+
+def test_snapshot_sort_and_filter_10k_within_budget():
+    snapshot = RouteSnapshot(make_routes(10_000))
+    gateway = snapshot.values("gateway")[0]
+
+    start = time.perf_counter()
+    by_metric = snapshot.query("metric", descending=True)
+    filtered = snapshot.query("destination", filters={"gateway": gateway}, text="172.")
+    elapsed = time.perf_counter() - start
+
+    metrics = [snapshot.routes[i].metric for i in by_metric]
+    assert metrics == sorted(metrics, reverse=True)
+    assert filtered and all(snapshot.routes[i].gateway == gateway for i in filtered)
+    assert elapsed < QUERY_BUDGET_S * 2, f"排序和筛选 10k 行耗时 {elapsed * 1000:.0f} ms"
+
+
+def _route(destination: str, mask: str, metric: int, gateway: str = "10.0.0.254") -> RouteEntry:
+    return RouteEntry.parse(destination, mask, gateway, "10.0.0.1", str(metric))
+
+
+def test_index_lookup_prefers_longest_prefix():
+    default = _route("0.0.0.0", "0.0.0.0", 25, gateway="192.168.1.1")
+    net8 = _route("10.0.0.0", "255.0.0.0", 281)
+    net16 = _route("10.1.0.0", "255.255.0.0", 281)
+    host = _route("10.1.2.3", "255.255.255.255", 281)
+    index = RouteIndex([default, net8, net16, host])
+
+    assert len(index) == 4
+    # 默认路由跃点数更小，但更长的前缀优先
+    assert index.lookup("10.1.2.3") is host
+    assert index.lookup("10.1.2.4") is net16
+    assert index.lookup("10.2.0.1") is net8
+    assert index.lookup("8.8.8.8") is default
+    assert index.lookup(0x0A010203) is host
+
+
+def test_index_lookup_prefers_lowest_metric_for_equal_prefix():
+    slow = _route("10.0.0.0", "255.0.0.0", 50, gateway="10.0.0.253")
+    fast = _route("10.0.0.0", "255.0.0.0", 10, gateway="10.0.0.254")
+    index = RouteIndex([slow, fast])
+
+    assert index.lookup("10.9.9.9") is fast
+
+
+def test_index_lookup_without_matching_route():
+    index = RouteIndex([_route("10.0.0.0", "255.0.0.0", 25), _route("192.168.1.0", "255.255.255.0", 25)])
+
+    assert index.lookup("172.16.0.1") is None
+    assert index.matches("172.16.0.1") == []
+    assert RouteIndex().lookup("10.0.0.1") is None
+
+
+def test_index_matches_longest_prefix_first_then_metric():
+    default = _route("0.0.0.0", "0.0.0.0", 25, gateway="192.168.1.1")
+    net8_slow = _route("10.0.0.0", "255.0.0.0", 50)
+    net8_fast = _route("10.0.0.0", "255.0.0.0", 10)
+    net16 = _route("10.1.0.0", "255.255.0.0", 281)
+    host = _route("10.1.2.3", "255.255.255.255", 281)
+    other = _route("10.2.0.0", "255.255.0.0", 1)
+    index = RouteIndex([net8_slow, host, default, other, net16, net8_fast])
+
+    assert index.matches("10.1.2.3") == [host, net16, net8_fast, net8_slow, default]
+    assert index.matches("10.1.9.9") == [net16, net8_fast, net8_slow, default]
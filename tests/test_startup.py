@@ -0,0 +1,76 @@
+"""启动追踪与冷启动基准"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from utils.profiler import DEFAULT_TRACE_FILE, StartupProfiler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 冷启动预算（毫秒），CI 可按机器性能通过环境变量调整
+STARTUP_BUDGET_MS = float(os.environ.get("WINTOOLBOX_STARTUP_BUDGET_MS", "3000"))
+
+
+def test_budget_only_does_not_write_trace(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    profiler = StartupProfiler()
+    profiler.enable()
+    with profiler.phase("settings"):
+        pass
+
+    assert profiler.save() is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_default_trace_goes_to_log_dir(tmp_path, monkeypatch):
+    from utils.logger import LOG_DIR
+
+    monkeypatch.chdir(tmp_path)
+    profiler = StartupProfiler()
+    profiler.enable("")
+    with profiler.phase("tk.Tk"):
+        pass
+
+    path = profiler.save()
+    try:
+        assert path == os.path.join(os.path.abspath(LOG_DIR), DEFAULT_TRACE_FILE)
+        with open(path, encoding="utf-8") as f:
+            trace = json.load(f)
+        assert "tk.Tk" in trace["otherData"]["phases_ms"]
+        assert os.listdir(tmp_path) == []
+    finally:
+        os.remove(path)
+
+
+def test_explicit_trace_path(tmp_path):
+    output = tmp_path / "traces" / "startup.json"
+    profiler = StartupProfiler()
+    profiler.enable(str(output))
+    profiler.mark("first_idle")
+
+    assert profiler.save() == str(output)
+    assert json.loads(output.read_text(encoding="utf-8"))["traceEvents"][0]["name"] == "first_idle"
+
+
+@pytest.mark.skipif(
+    sys.platform != "win32" and not os.environ.get("DISPLAY"),
+    reason="需要图形界面（Linux 下用 xvfb-run 运行）"
+)
+def test_cold_start_within_budget(tmp_path):
+    env = dict(os.environ, HOME=str(tmp_path), USERPROFILE=str(tmp_path))
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "app.py"), "--startup-budget", str(STARTUP_BUDGET_MS)],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+
+    assert result.returncode == 0, result.stderr
+    # 只给预算时不写追踪文件
+    assert not (tmp_path / DEFAULT_TRACE_FILE).exists()
@@ -0,0 +1,133 @@
+"""系统命令执行（使用替身命令）"""
+
+import asyncio
+import os
+import subprocess
+import time
+
+import pytest
+
+from utils.system import run_command, run_command_async
+
+
+def test_run_command_uses_stand_in(fake_command):
+    fake_command("route", """
+        import sys
+        print("route", *sys.argv[1:])
+    """)
+
+    result = run_command(["route", "print"], encoding="utf-8")
+
+    assert result.returncode == 0
+    assert result.stdout == "route print\n"
+
+
+def test_streams_lines_before_exit(fake_command):
+    fake_command("route", """
+        import sys, time
+        for i in range(3):
+            print(f"line {i}", flush=True)
+            time.sleep(0.3)
+    """)
+    arrivals: list[tuple[str, float]] = []
+
+    def on_line(line: str) -> None:
+        arrivals.append((line, time.monotonic()))
+
+    start = time.monotonic()
+    result = asyncio.run(run_command_async(["route", "print"], encoding="utf-8", on_line=on_line))
+    finished = time.monotonic()
+
+    assert [line for line, _ in arrivals] == ["line 0", "line 1", "line 2"]
+    assert result.stdout == "line 0\nline 1\nline 2\n"
+    # 第一行在进程结束前就已回调
+    assert arrivals[0][1] - start < finished - start - 0.4
+
+
+def test_decodes_gbk_and_normalizes_newlines(fake_command):
+    fake_command("ipconfig", """
+        import sys
+        sys.stdout.buffer.write("以太网适配器 以太网:\\r\\n   IPv4 地址 . . : 192.168.1.2\\r\\n".encode("gbk"))
+        sys.stderr.buffer.write("错误\\r\\n".encode("gbk"))
+        sys.exit(3)
+    """)
+    lines: list[str] = []
+
+    result = asyncio.run(run_command_async(["ipconfig", "/all"], on_line=lines.append))
+
+    assert lines == ["以太网适配器 以太网:", "   IPv4 地址 . . : 192.168.1.2"]
+    assert result.stdout == "以太网适配器 以太网:\n   IPv4 地址 . . : 192.168.1.2\n"
+    assert result.stderr == "错误\n"
+    assert result.returncode == 3
+
+
+def _wait_for_pid_file(path: str) -> int:
+    deadline = time.monotonic() + 5
+    while not os.path.exists(path) or not open(path).read():
+        if time.monotonic() > deadline:
+            raise AssertionError("替身命令未启动")
+        time.sleep(0.01)
+    return int(open(path).read())
+
+
+def _process_exists(pid: int) -> bool:
+    # run_command_async 终止后会回收子进程，因此进程号已不存在
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+@pytest.fixture
+def hanging_command(fake_command, tmp_path):
+    pid_file = str(tmp_path / "pid")
+    fake_command("route", f"""
+        import os, time
+        with open({pid_file!r}, "w") as f:
+            f.write(str(os.getpid()))
+        print("started", flush=True)
+        time.sleep(60)
+    """)
+    return pid_file
+
+
+def test_timeout_kills_process(hanging_command):
+    lines: list[str] = []
+    start = time.monotonic()
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(run_command_async(["route", "print"], timeout=0.5, on_line=lines.append))
+
+    assert time.monotonic() - start < 5
+    assert lines == ["started"]
+    assert not _process_exists(_wait_for_pid_file(hanging_command))
+
+
+def test_cancel_kills_process(hanging_command):
+    async def cancel_after_start() -> None:
+        task = asyncio.create_task(run_command_async(["route", "print"]))
+        await asyncio.to_thread(_wait_for_pid_file, hanging_command)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_after_start())
+
+    assert not _process_exists(_wait_for_pid_file(hanging_command))
+
+
+def test_concurrency_limit(fake_command, monkeypatch):
+    monkeypatch.setattr("utils.system.MAX_CONCURRENT_COMMANDS", 2)
+    fake_command("route", """
+        import time
+        time.sleep(0.3)
+    """)
+
+    async def run_four() -> float:
+        start = time.monotonic()
+        await asyncio.gather(*(run_command_async(["route"]) for _ in range(4)))
+        return time.monotonic() - start
+
+    # 两个一批，至少两轮
+    assert asyncio.run(run_four()) >= 0.6
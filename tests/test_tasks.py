@@ -0,0 +1,112 @@
+"""后台任务服务（使用替身命令和替身控件）"""
+
+import threading
+import time
+from collections.abc import Callable
+
+import pytest
+
+from services.tasks import TaskService
+from utils.system import run_command
+
+
+class FakeWidget:
+    """记录 after() 回调的替身控件，由测试手动驱动 Tk 事件循环"""
+
+    def __init__(self) -> None:
+        self.scheduled: list[Callable[[], None]] = []
+
+    def after(self, ms: int, func: Callable[[], None]) -> None:
+        self.scheduled.append(func)
+
+    def pump(self, timeout: float = 5.0) -> None:
+        """执行已排队的回调，直到没有新的回调"""
+        deadline = time.monotonic() + timeout
+        while self.scheduled:
+            assert time.monotonic() < deadline, "后台任务未在超时内完成"
+            callbacks, self.scheduled = self.scheduled, []
+            for callback in callbacks:
+                callback()
+            time.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def fresh_executor(monkeypatch):
+    """每个测试使用独立的线程池"""
+    monkeypatch.setattr(TaskService, "_executor", None)
+    yield
+    TaskService.shutdown()
+
+
+def test_delivers_result_on_main_thread(fake_command):
+    fake_command("route", """
+        import sys
+        print("route", *sys.argv[1:])
+    """)
+    widget = FakeWidget()
+    results: list[tuple[str, threading.Thread]] = []
+
+    def on_success(output: str) -> None:
+        results.append((output, threading.current_thread()))
+
+    TaskService.run(
+        widget,
+        lambda: str(run_command(["route", "print"], encoding="utf-8").stdout),
+        on_success
+    )
+    widget.pump()
+
+    assert results == [("route print\n", threading.main_thread())]
+
+
+def test_on_error_receives_raised_exception(fake_command):
+    fake_command("ipconfig", """
+        import sys
+        sys.exit(1)
+    """)
+    widget = FakeWidget()
+    errors: list[Exception] = []
+
+    def fetch() -> str:
+        result = run_command(["ipconfig", "/all"], encoding="utf-8")
+        if result.returncode != 0:
+            raise RuntimeError(f"ipconfig 退出码 {result.returncode}")
+        return str(result.stdout)
+
+    def on_success(output: str) -> None:
+        pytest.fail("任务失败时不应调用 on_success")
+
+    # 有返回值的回调（如 messagebox.showerror）同样可以作为 on_error
+    def on_error(error: Exception) -> bool:
+        errors.append(error)
+        return True
+
+    TaskService.run(widget, fetch, on_success, on_error)
+    widget.pump()
+
+    (error,) = errors
+    assert isinstance(error, RuntimeError)
+    assert str(error) == "ipconfig 退出码 1"
+
+
+def test_shutdown_cancels_queued_work(monkeypatch):
+    monkeypatch.setattr(TaskService, "MAX_WORKERS", 1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking() -> str:
+        started.set()
+        release.wait(5)
+        return "done"
+
+    running = TaskService.submit(blocking)
+    assert started.wait(5)
+    queued = TaskService.submit(lambda: "never")
+
+    TaskService.shutdown()
+    release.set()
+
+    assert queued.cancelled()
+    assert running.result(timeout=5) == "done"
+    # 关闭后重新提交会创建新的线程池
+    assert TaskService.submit(lambda: "again").result(timeout=5) == "again"
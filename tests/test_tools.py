@@ -0,0 +1,57 @@
+"""工具安装与增量更新（使用本地 HTTP 替身服务器提供压缩包）"""
+
+import os
+
+import pytest
+from conftest import make_zip
+
+from services.tools import ToolsService
+
+DATA = os.urandom(256 * 1024)
+OLD = {"demo.exe": b"v1" * 512, "data.bin": DATA, "readme.txt": b"demo"}
+NEW = {"demo.exe": b"v2" * 512, "data.bin": DATA, "readme.txt": b"demo"}
+
+
+@pytest.fixture
+def installed(http_server, local_tool):
+    """已安装旧版本，服务器上已是新版本"""
+    http_server.files["/demo.zip"] = make_zip(OLD)
+    assert ToolsService.download("demo") == (True, "安装成功")
+    http_server.files["/demo.zip"] = make_zip(NEW)
+    http_server.requests.clear()
+    return local_tool
+
+
+def _read(tool, name: str) -> bytes:
+    with open(os.path.join(tool.install_dir, name), "rb") as f:
+        return f.read()
+
+
+def test_delta_update_fetches_only_changed_members(http_server, installed):
+    assert ToolsService.update("demo") == (True, "已更新 1 个文件，删除 0 个文件")
+
+    assert _read(installed, "demo.exe") == NEW["demo.exe"]
+    assert _read(installed, "data.bin") == DATA
+    ranges = [headers.get("Range") for _, headers in http_server.requests]
+    # 只读取了末尾的中央目录和变化的成员，没有下载完整压缩包
+    assert len(ranges) == 2 and all(r and r != "bytes=0-0" for r in ranges)
+    assert ranges[0].startswith("bytes=-")
+
+
+def test_network_error_during_delta_falls_back_to_full_download(http_server, installed):
+    # 中央目录正常返回，下载变化的成员时连接断开
+    http_server.truncate = [len(http_server.files["/demo.zip"]), 10]
+
+    assert ToolsService.update("demo") == (True, "安装成功")
+
+    assert _read(installed, "demo.exe") == NEW["demo.exe"]
+    assert _read(installed, "data.bin") == DATA
+    assert any("Range" not in headers for _, headers in http_server.requests)
+
+
+def test_server_without_range_falls_back_to_full_download(http_server, installed):
+    http_server.range_support = False
+
+    assert ToolsService.update("demo") == (True, "安装成功")
+
+    assert _read(installed, "demo.exe") == NEW["demo.exe"]
@@ -0,0 +1,111 @@
+"""网络状态监视器"""
+
+import threading
+
+import pytest
+
+from services.watcher import NetworkWatcher
+
+
+@pytest.fixture
+def outputs(monkeypatch):
+    """按顺序返回的数据源输出（异常实例表示本次获取失败），手动调用 poll"""
+    items: list[str | Exception] = []
+
+    def source() -> str:
+        item = items.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    watcher: NetworkWatcher[str] = NetworkWatcher("test", source, str.upper)
+    monkeypatch.setattr(watcher, "start", lambda: None)
+    return items, watcher
+
+
+class FakeClock:
+    """替代监视器的唤醒事件：wait() 不阻塞，只把时间推进 timeout 秒；轮询 polls 次后停止"""
+
+    def __init__(self, stop: threading.Event, polls: int):
+        self.now = 0.0
+        self.waits: list[float] = []
+        self._stop = stop
+        self._polls = polls
+
+    def wait(self, timeout: float) -> bool:
+        self.now += timeout
+        self.waits.append(round(timeout, 3))
+        if len(self.waits) >= self._polls:
+            self._stop.set()
+        return False
+
+    def set(self) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+def run_polls(watcher: NetworkWatcher, polls: int) -> FakeClock:
+    """在当前线程运行监视循环 polls 次，返回记录了各次等待间隔的时钟"""
+    stop = threading.Event()
+    clock = FakeClock(stop, polls)
+    watcher._wake = clock  # type: ignore[assignment]
+    watcher._run(stop)
+    return clock
+
+
+def test_errors_reach_subscribers_once_per_failure(outputs):
+    items, watcher = outputs
+    values: list[str] = []
+    errors: list[Exception] = []
+    watcher.subscribe(values.append, errors.append)
+    items.extend([OSError("route 不可用"), OSError("仍不可用"), "a", "a", RuntimeError("再次失败")])
+
+    for _ in range(5):
+        watcher.poll()
+
+    assert values == ["A"]
+    assert [str(e) for e in errors] == ["route 不可用", "再次失败"]
+    assert isinstance(watcher.error, RuntimeError)
+
+
+def test_parse_error_is_reported_and_late_subscriber_sees_it(outputs):
+    items, watcher = outputs
+    watcher.parse = int
+    items.append("not a number")
+    watcher.poll()
+
+    late: list[Exception] = []
+    watcher.subscribe(lambda value: None, late.append)
+
+    assert len(late) == 1 and isinstance(late[0], ValueError)
+
+
+def test_unchanged_output_backs_off_without_callbacks(outputs):
+    items, watcher = outputs
+    values: list[str] = []
+    watcher.subscribe(values.append)
+    items.extend(["a"] * 9 + ["b", "b"])
+
+    clock = run_polls(watcher, len(items))
+
+    assert values == ["A", "B"]
+    # 每次无变化放大 1.5 倍，直到 MAX_INTERVAL；变化后恢复 MIN_INTERVAL
+    assert clock.waits == [2.0, 3.0, 4.5, 6.75, 10.125, 15.188, 22.781, 30.0, 30.0, 2.0, 3.0]
+    assert clock.now == pytest.approx(sum(clock.waits), abs=0.01)
+
+
+def test_failures_back_off_and_recovery_resets_interval(outputs):
+    items, watcher = outputs
+    values: list[str] = []
+    errors: list[Exception] = []
+    watcher.subscribe(values.append, errors.append)
+    items.extend(["a", OSError("断开"), OSError("断开"), OSError("断开"), "a", "a", OSError("再次断开")])
+
+    clock = run_polls(watcher, len(items))
+
+    assert clock.waits == [2.0, 3.0, 4.5, 6.75, 2.0, 3.0, 4.5]
+    # 恢复后输出与失败前相同，不重复通知
+    assert values == ["A"]
+    assert [str(e) for e in errors] == ["断开", "再次断开"]
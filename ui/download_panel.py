@@ -0,0 +1,154 @@
+"""下载管理面板
+
+所有下载共用的非模态窗口。进度更新由下载线程放入 DownloadManager.progress 通道（已限频），
+这里用 after() 定时取出并刷新显示，工作线程不直接操作控件。
+"""
+
+import tkinter as tk
+from collections.abc import Hashable
+from tkinter import ttk
+
+from services.downloads import DownloadJob, DownloadManager
+from services.progress import ProgressChannel, ProgressUpdate
+
+STATE_TEXT = {
+    DownloadJob.QUEUED: "等待中",
+    DownloadJob.RUNNING: "下载中",
+    DownloadJob.DONE: "已完成",
+    DownloadJob.FAILED: "失败",
+    DownloadJob.CANCELLED: "已取消",
+}
+
+
+def format_size(size: float) -> str:
+    """格式化字节数"""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def format_duration(seconds: float) -> str:
+    """格式化剩余时间"""
+    seconds = int(seconds + 0.5)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+class DownloadPanel:
+    """下载管理面板"""
+
+    REFRESH_MS = ProgressChannel.POLL_MS
+
+    _instance: "DownloadPanel | None" = None
+
+    @classmethod
+    def show(cls, widget: tk.Misc) -> "DownloadPanel":
+        """显示面板（已打开时提到最前）"""
+        if cls._instance is None or not cls._instance.window.winfo_exists():
+            cls._instance = cls(widget.winfo_toplevel())
+        else:
+            cls._instance.window.deiconify()
+            cls._instance.window.lift()
+            cls._instance._update_view()
+        return cls._instance
+
+    def __init__(self, master: tk.Tk | tk.Toplevel):
+        self.window = tk.Toplevel(master)
+        self.window.title("下载管理")
+        self.window.geometry("660x260")
+        self.window.transient(master)
+        # 任务 ID -> 最近一次进度更新
+        self._updates: dict[Hashable, ProgressUpdate] = {}
+
+        columns = ("name", "status", "progress", "size", "speed", "eta")
+        self.tree = ttk.Treeview(self.window, columns=columns, show="headings", height=6)
+        self.tree.heading("name", text="名称")
+        self.tree.heading("status", text="状态")
+        self.tree.heading("progress", text="进度")
+        self.tree.heading("size", text="大小")
+        self.tree.heading("speed", text="速度")
+        self.tree.heading("eta", text="剩余时间")
+        self.tree.column("name", width=130)
+        self.tree.column("status", width=150)
+        self.tree.column("progress", width=50)
+        self.tree.column("size", width=150)
+        self.tree.column("speed", width=80)
+        self.tree.column("eta", width=70)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 5))
+
+        # 全部进行中任务的总进度
+        self.progress_bar = ttk.Progressbar(self.window, mode="determinate")
+        self.progress_bar.pack(fill=tk.X, padx=10, pady=5)
+
+        btn_frame = ttk.Frame(self.window)
+        btn_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        ttk.Button(btn_frame, text="取消所选", command=self._cancel_selected).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="清除已结束", command=self._clear_finished).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="关闭", command=self.window.withdraw).pack(side=tk.RIGHT, padx=2)
+        # 关闭窗口只是隐藏，下载在后台继续
+        self.window.protocol("WM_DELETE_WINDOW", self.window.withdraw)
+
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """取出进度更新并刷新列表（窗口隐藏时只取出不刷新）"""
+        if not self.window.winfo_exists():
+            return
+        self._updates.update(DownloadManager.progress.drain())
+        if self.window.winfo_viewable():
+            self._update_view()
+        self.window.after(self.REFRESH_MS, self._refresh)
+
+    def _update_view(self) -> None:
+        jobs = DownloadManager.get_jobs()
+        ids = [job.job_id for job in jobs]
+        # 丢弃已清除任务的进度
+        for job_id in set(self._updates) - set(ids):
+            del self._updates[job_id]
+
+        for item in self.tree.get_children():
+            if item not in ids:
+                self.tree.delete(item)
+
+        for job in jobs:
+            values = self._job_values(job, self._updates.get(job.job_id))
+            if self.tree.exists(job.job_id):
+                if self.tree.item(job.job_id, "values") != values:
+                    self.tree.item(job.job_id, values=values)
+            else:
+                self.tree.insert("", tk.END, iid=job.job_id, values=values)
+        self.tree.set_children("", *ids)
+
+        active = [self._updates[job.job_id] for job in jobs if job.active and job.job_id in self._updates]
+        total = sum(update.total for update in active)
+        self.progress_bar["value"] = sum(update.downloaded for update in active) * 100 / total if total else 0
+
+    @staticmethod
+    def _job_values(job: DownloadJob, update: ProgressUpdate | None) -> tuple[str, ...]:
+        if job.state in (DownloadJob.FAILED, DownloadJob.CANCELLED) and job.message:
+            status = job.message
+        else:
+            status = STATE_TEXT[job.state]
+        if update is None or job.state == DownloadJob.QUEUED:
+            return job.name, status, "", "", "", ""
+
+        percent = f"{update.percent}%" if update.percent is not None else ""
+        if update.total:
+            size = f"{format_size(update.downloaded)} / {format_size(update.total)}"
+        else:
+            size = format_size(update.downloaded) if update.downloaded else ""
+        # 结束后不再显示速度和剩余时间
+        running = job.state == DownloadJob.RUNNING and not update.done
+        speed = f"{format_size(update.speed)}/s" if running and update.speed else ""
+        eta = format_duration(update.eta) if running and update.eta is not None else ""
+        return job.name, status, percent, size, speed, eta
+
+    def _cancel_selected(self) -> None:
+        for job_id in self.tree.selection():
+            DownloadManager.cancel(job_id)
+
+    def _clear_finished(self) -> None:
+        DownloadManager.clear_finished()
@@ -7,7 +7,7 @@ from tkinter import font, ttk
 from services.settings import SettingsService
 from utils.admin import is_admin, run_as_admin
 
-from .tabs import AboutTab, HostsTab, IPTab, QRCodeTab, RouteTab, SettingsTab, ShortcutTab, SysinternalsTab
+from .tabs import LazyTab, load_tab_class
 
 
 class WinToolboxApp:
@@ -82,22 +82,22 @@ class WinToolboxApp:
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-        # 选项卡配置：(类, 标题, 是否懒加载)
-        # 首页不懒加载，其他页面懒加载
+        # 选项卡配置：(类名, 标题, 是否懒加载)
+        # 首页不懒加载，其他页面懒加载（模块及其依赖在首次打开时才导入）
         tab_configs = [
-            (ShortcutTab, "快捷入口", False),  # 首页立即加载
-            (HostsTab, "HOSTS 管理", True),
-            (RouteTab, "路由管理", True),
-            (IPTab, "IP 地址", True),
-            (QRCodeTab, "二维码识别", True),
-            (SysinternalsTab, "Sysinternals", True),
-            (SettingsTab, "设置", True),
-            (AboutTab, "关于", True),
+            ("ShortcutTab", "快捷入口", False),  # 首页立即加载
+            ("HostsTab", "HOSTS 管理", True),
+            ("RouteTab", "路由管理", True),
+            ("IPTab", "IP 地址", True),
+            ("QRCodeTab", "二维码识别", True),
+            ("SysinternalsTab", "Sysinternals", True),
+            ("SettingsTab", "设置", True),
+            ("AboutTab", "关于", True),
         ]
 
-        self._tabs = []
-        for tab_class, title, lazy_load in tab_configs:
-            tab = tab_class(self.notebook, self._is_admin, lazy_load=lazy_load)
+        self._tabs: list[LazyTab] = []
+        for tab_name, title, lazy_load in tab_configs:
+            tab = LazyTab(self.notebook, self._is_admin, tab_name, load_tab_class, lazy_load=lazy_load)
             self.notebook.add(tab.frame, text=title)
             self._tabs.append(tab)
 
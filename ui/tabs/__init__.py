@@ -1,12 +1,40 @@
-"""选项卡模块"""
-
-from .about import AboutTab
-from .hosts import HostsTab
-from .ip import IPTab
-from .qrcode import QRCodeTab
-from .route import RouteTab
-from .settings import SettingsTab
-from .shortcut import ShortcutTab
-from .sysinternals import SysinternalsTab
-
-__all__ = ["ShortcutTab", "HostsTab", "RouteTab", "IPTab", "QRCodeTab", "SysinternalsTab", "SettingsTab", "AboutTab"]
+"""选项卡模块
+
+选项卡类按需导入，首次访问时才加载对应模块。
+"""
+
+import importlib
+from typing import Any
+
+from .base import BaseTab, LazyTab
+
+# 选项卡类名 -> 模块名
+TAB_MODULES = {
+    "ShortcutTab": "shortcut",
+    "HostsTab": "hosts",
+    "RouteTab": "route",
+    "IPTab": "ip",
+    "QRCodeTab": "qrcode",
+    "SysinternalsTab": "sysinternals",
+    "SettingsTab": "settings",
+    "AboutTab": "about",
+}
+
+
+def load_tab_class(name: str) -> type[BaseTab]:
+    """导入并返回选项卡类"""
+    module = importlib.import_module(f".{TAB_MODULES[name]}", __name__)
+    tab_class: type[BaseTab] = getattr(module, name)
+    return tab_class
+
+
+def __getattr__(name: str) -> Any:
+    if name in TAB_MODULES:
+        return load_tab_class(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "BaseTab", "LazyTab", "load_tab_class",
+    "ShortcutTab", "HostsTab", "RouteTab", "IPTab", "QRCodeTab", "SysinternalsTab", "SettingsTab", "AboutTab"
+]
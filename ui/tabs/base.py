@@ -1,17 +1,34 @@
 """选项卡基类"""
 
+import queue
+import tkinter as tk
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from concurrent.futures import Future
 from tkinter import ttk
+from typing import TYPE_CHECKING, Any
+
+from utils.profiler import startup_profiler
+
+if TYPE_CHECKING:
+    from services.downloads import DownloadJob
+    from services.watcher import NetworkWatcher
 
 
 class BaseTab(ABC):
     """选项卡基类"""
 
-    def __init__(self, parent: ttk.Notebook, is_admin: bool, lazy_load: bool = True):
+    # 主线程检查监视器推送的间隔（毫秒）
+    WATCH_POLL_MS = 250
+
+    def __init__(self, parent: tk.Misc, is_admin: bool, lazy_load: bool = True):
         self.frame = ttk.Frame(parent)
         self.is_admin = is_admin
         self._loaded = False
         self._lazy_load = lazy_load
+        self.busy = False
+        # 已注册完成回调的下载任务
+        self._download_jobs: set[DownloadJob] = set()
 
         if not lazy_load:
             self._do_load()
@@ -19,13 +36,19 @@ class BaseTab(ABC):
     def _do_load(self) -> None:
         """执行加载"""
         if not self._loaded:
-            self.setup_ui()
+            with startup_profiler.phase(f"{self.trace_name}.setup_ui"):
+                self.setup_ui()
             self._loaded = True
 
     def ensure_loaded(self) -> None:
         """确保已加载（用于懒加载触发）"""
         self._do_load()
 
+    @property
+    def trace_name(self) -> str:
+        """性能追踪中显示的名称"""
+        return type(self).__name__
+
     @property
     def is_loaded(self) -> bool:
         """是否已加载"""
@@ -36,6 +59,107 @@ class BaseTab(ABC):
         """设置 UI 界面"""
         pass
 
+    def run_background(
+        self,
+        func: Callable[[], Any],
+        on_success: Callable[[Any], None],
+        on_error: Callable[[Exception], object] | None = None,
+        busy_text: str = "正在处理..."
+    ) -> Future:
+        """在后台线程执行任务，期间显示忙碌状态，完成后在主线程回调"""
+        from services.tasks import TaskService
+
+        self.set_busy(busy_text)
+
+        def done(result: Any) -> None:
+            self.set_busy("")
+            on_success(result)
+
+        def failed(error: Exception) -> None:
+            self.set_busy("")
+            if on_error:
+                on_error(error)
+
+        return TaskService.run(self.frame, func, done, failed)
+
+    def start_download(
+        self,
+        tool_id: str,
+        on_done: Callable[[tuple[bool, str]], None],
+        update: bool = False
+    ) -> None:
+        """把工具下载提交到下载管理器并显示下载面板，完成后在主线程回调
+
+        同一任务重复提交时只回调一次。
+        """
+        from services.downloads import DownloadManager
+        from services.tasks import TaskService
+
+        from ..download_panel import DownloadPanel
+
+        job = DownloadManager.submit(tool_id, update=update)
+        DownloadPanel.show(self.frame)
+        if job in self._download_jobs:
+            return
+        self._download_jobs.add(job)
+
+        def done(result: tuple[bool, str]) -> None:
+            self._download_jobs.discard(job)
+            on_done(result)
+
+        TaskService.deliver(self.frame, job.future, done)
+
+    def watch(
+        self,
+        watcher: "NetworkWatcher",
+        on_change: Callable[[Any], None],
+        on_error: Callable[[Exception], object] | None = None
+    ) -> None:
+        """订阅网络状态监视器，变化时在主线程回调（只取最新快照），选项卡销毁后自动退订
+
+        获取或解析失败时在主线程回调 on_error。
+        """
+        pending: queue.SimpleQueue = queue.SimpleQueue()
+        errors: queue.SimpleQueue = queue.SimpleQueue()
+        unsubscribe = watcher.subscribe(pending.put, errors.put if on_error else None)
+        stopped = False
+
+        def latest(source: queue.SimpleQueue) -> Any:
+            item = None
+            while True:
+                try:
+                    item = source.get_nowait()
+                except queue.Empty:
+                    return item
+
+        def poll() -> None:
+            if stopped:
+                return
+            value = latest(pending)
+            if value is not None:
+                on_change(value)
+            error = latest(errors)
+            if error is not None and on_error:
+                on_error(error)
+            self.frame.after(self.WATCH_POLL_MS, poll)
+
+        def on_destroy(event: tk.Event) -> None:
+            nonlocal stopped
+            if event.widget is self.frame and not stopped:
+                stopped = True
+                unsubscribe()
+
+        self.frame.bind("<Destroy>", on_destroy, add="+")
+        self.frame.after(self.WATCH_POLL_MS, poll)
+
+    def set_busy(self, text: str) -> None:
+        """设置忙碌状态（text 为空表示空闲）"""
+        self.busy = bool(text)
+        self.frame.configure(cursor="watch" if text else "")
+        label = getattr(self, "busy_label", None)
+        if label is not None:
+            label.config(text=text)
+
     def require_admin(self, action: str) -> bool:
         """检查管理员权限"""
         if not self.is_admin:
@@ -43,3 +167,32 @@ class BaseTab(ABC):
             messagebox.showwarning("警告", f"需要管理员权限才能{action}")
             return False
         return True
+
+
+class LazyTab(BaseTab):
+    """懒加载选项卡代理：首次 ensure_loaded() 时才导入模块并创建真实选项卡"""
+
+    def __init__(
+        self,
+        parent: tk.Misc,
+        is_admin: bool,
+        tab_name: str,
+        loader: Callable[[str], type[BaseTab]],
+        lazy_load: bool = True
+    ):
+        self.tab_name = tab_name
+        self._loader = loader
+        self.tab: BaseTab | None = None
+        super().__init__(parent, is_admin, lazy_load=lazy_load)
+
+    @property
+    def trace_name(self) -> str:
+        """性能追踪中显示的名称"""
+        return f"LazyTab[{self.tab_name}]"
+
+    def setup_ui(self) -> None:
+        """导入选项卡模块并在占位框架中创建真实选项卡"""
+        with startup_profiler.phase(f"import {self.tab_name}"):
+            tab_class = self._loader(self.tab_name)
+        self.tab = tab_class(self.frame, self.is_admin, lazy_load=False)
+        self.tab.frame.pack(fill=tk.BOTH, expand=True)
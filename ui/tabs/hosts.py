@@ -2,18 +2,41 @@
 
 import os
 import tkinter as tk
-from tkinter import messagebox, scrolledtext, ttk
+from collections.abc import Callable
+from functools import partial
+from tkinter import filedialog, messagebox, scrolledtext, ttk
 
-from services.hosts import HostsService
+from services.hosts import HostsDocument, HostsImportResult, HostsLine, HostsPatch, HostsService
 
 from .base import BaseTab
 
 
 class HostsTab(BaseTab):
-    """HOSTS 管理选项卡"""
+    """HOSTS 管理选项卡
+
+    默认以虚拟列表显示结构化条目，只渲染可见范围内的行，适合超大屏蔽列表；
+    "原始编辑" 模式下才使用完整的文本框。
+    """
+
+    # 搜索输入防抖（毫秒）
+    SEARCH_DELAY_MS = 150
+    # 每次滚轮滚动的行数
+    WHEEL_ROWS = 3
 
     def setup_ui(self) -> None:
         """设置 UI 界面"""
+        self.document = HostsDocument()
+        # 加载时的映射，用于保存时计算增量变更
+        self._base_pairs: list[tuple[str, str]] = []
+        # 有无法用增量变更表达的修改（注释、空行、重复条目、原始编辑），保存时需整体写入
+        self._needs_full_save = False
+        self._rows: list[HostsLine] = []
+        self._offset = 0
+        self._selected: HostsLine | None = None
+        self._search_job: str | None = None
+        self._raw_mode = False
+        self._dirty = False
+
         self._create_buttons()
         self._create_add_entry()
         self._create_content_area()
@@ -26,7 +49,18 @@ class HostsTab(BaseTab):
 
         ttk.Button(btn_frame, text="刷新", command=self.load_hosts).pack(side=tk.LEFT, padx=2)
         ttk.Button(btn_frame, text="保存", command=self.save_hosts).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="撤销上次修改", command=self._undo).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="导入屏蔽列表", command=self._import_blocklists).pack(side=tk.LEFT, padx=2)
         ttk.Button(btn_frame, text="打开文件位置", command=self._open_location).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="删除选中", command=self._delete_selected).pack(side=tk.LEFT, padx=2)
+
+        self.raw_mode_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            btn_frame, text="原始编辑", variable=self.raw_mode_var, command=self._toggle_raw_mode
+        ).pack(side=tk.LEFT, padx=10)
+
+        self.busy_label = ttk.Label(btn_frame, text="", foreground="gray")
+        self.busy_label.pack(side=tk.RIGHT, padx=5)
 
     def _create_add_entry(self) -> None:
         """创建添加条目区域"""
@@ -45,34 +79,170 @@ class HostsTab(BaseTab):
 
     def _create_content_area(self) -> None:
         """创建内容显示区域"""
-        content_frame = ttk.LabelFrame(self.frame, text="HOSTS 文件内容")
-        content_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.content_frame = ttk.LabelFrame(self.frame, text="HOSTS 文件内容")
+        self.content_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-        self.text = scrolledtext.ScrolledText(
-            content_frame, wrap=tk.NONE, font=("Consolas", 10)
+        # 搜索栏
+        search_frame = ttk.Frame(self.content_frame)
+        search_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+
+        ttk.Label(search_frame, text="搜索域名:").pack(side=tk.LEFT, padx=2)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *args: self._schedule_search())
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=30)
+        self.search_entry.pack(side=tk.LEFT, padx=2)
+
+        self.count_label = ttk.Label(search_frame, text="", foreground="gray")
+        self.count_label.pack(side=tk.LEFT, padx=10)
+
+        # 虚拟列表
+        self.list_frame = ttk.Frame(self.content_frame)
+        self.list_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        columns = ("ip", "domains", "comment")
+        self.tree = ttk.Treeview(self.list_frame, columns=columns, show="headings", selectmode="browse")
+        for col, text, width in [("ip", "IP", 140), ("domains", "域名", 320), ("comment", "注释", 260)]:
+            self.tree.heading(col, text=text)
+            self.tree.column(col, width=width)
+
+        self.scrollbar = ttk.Scrollbar(self.list_frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind("<Configure>", lambda e: self._render())
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_rows(-self.WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_rows(self.WHEEL_ROWS))
+        self.tree.bind("<Prior>", lambda e: self._scroll_rows(-self._visible_count()))
+        self.tree.bind("<Next>", lambda e: self._scroll_rows(self._visible_count()))
+
+        # 原始编辑文本框（仅原始编辑模式下创建）
+        self.text: scrolledtext.ScrolledText | None = None
+
+    # 加载与保存
+
+    def load_hosts(self, confirm: bool = True) -> None:
+        """加载 HOSTS 文件（后台执行）"""
+        if self.busy:
+            return
+        if confirm and self._dirty and not messagebox.askyesno("确认", "有未保存的修改，确定要重新加载吗？"):
+            return
+
+        self.run_background(
+            HostsService.load,
+            self._on_loaded,
+            lambda e: messagebox.showerror("错误", f"读取 HOSTS 文件失败: {e}"),
+            busy_text="正在读取 HOSTS 文件..."
         )
-        self.text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-    def load_hosts(self) -> None:
-        """加载 HOSTS 文件"""
-        try:
-            content = HostsService.read()
-            self.text.delete(1.0, tk.END)
-            self.text.insert(tk.END, content)
-        except Exception as e:
-            messagebox.showerror("错误", f"读取 HOSTS 文件失败: {e}")
+    def _on_loaded(self, document: HostsDocument) -> None:
+        """HOSTS 文件加载完成"""
+        self.document = document
+        self._base_pairs = document.entry_pairs()
+        self._needs_full_save = False
+        self._selected = None
+        self._offset = 0
+        self._set_dirty(False)
+        if self._raw_mode and self.text is not None:
+            self._fill_raw_text()
+        self._apply_search()
 
     def save_hosts(self) -> None:
-        """保存 HOSTS 文件"""
+        """保存 HOSTS 文件（后台执行）"""
+        if not self.require_admin("修改 HOSTS 文件"):
+            return
+        if self.busy:
+            return
+
+        if self._raw_mode:
+            self._sync_from_raw_text()
+        task: Callable[[], object]
+        if self._raw_mode or self._needs_full_save:
+            # 修改了注释、格式或重复条目，整体保存
+            task = partial(HostsService.save, self.document)
+        else:
+            # 列表模式只写入新增/删除的条目
+            patch = HostsPatch.between(self._base_pairs, self.document.entry_pairs())
+            task = partial(HostsService.apply_patch, patch)
+
+        self.run_background(
+            task,
+            lambda result: self._on_saved(),
+            lambda e: messagebox.showerror("错误", f"保存 HOSTS 文件失败: {e}"),
+            busy_text="正在保存 HOSTS 文件..."
+        )
+
+    def _on_saved(self) -> None:
+        """保存完成，重新加载磁盘内容"""
+        self._set_dirty(False)
+        messagebox.showinfo("成功", "HOSTS 文件已保存")
+        self.load_hosts(confirm=False)
+
+    def _undo(self) -> None:
+        """撤销最近一次保存的条目变更"""
+        if not self.require_admin("修改 HOSTS 文件"):
+            return
+        if self.busy:
+            return
+        if not messagebox.askyesno("确认", "确定要撤销最近一次保存或导入的条目变更吗？\n未保存的修改将丢失。"):
+            return
+
+        def on_done(patch: HostsPatch | None) -> None:
+            if patch is None:
+                messagebox.showinfo("提示", "没有可撤销的变更")
+                return
+            self._set_dirty(False)
+            messagebox.showinfo("成功", f"已撤销: 恢复 {len(patch.added)} 条, 移除 {len(patch.removed)} 条")
+            self.load_hosts(confirm=False)
+
+        self.run_background(
+            HostsService.undo,
+            on_done,
+            lambda e: messagebox.showerror("错误", f"撤销失败: {e}"),
+            busy_text="正在撤销..."
+        )
+
+    def _import_blocklists(self) -> None:
+        """把本地屏蔽列表文件合并到 HOSTS"""
         if not self.require_admin("修改 HOSTS 文件"):
             return
+        if self.busy:
+            return
+        if self._dirty and not messagebox.askyesno("确认", "导入会直接写入 HOSTS 文件，未保存的修改将丢失。\n是否继续？"):
+            return
+
+        paths = filedialog.askopenfilenames(
+            title="选择屏蔽列表",
+            filetypes=[("屏蔽列表", "*.txt *.hosts hosts"), ("所有文件", "*.*")]
+        )
+        if not paths:
+            return
 
-        try:
-            content = self.text.get(1.0, tk.END)
-            HostsService.write(content)
-            messagebox.showinfo("成功", "HOSTS 文件已保存")
-        except Exception as e:
-            messagebox.showerror("错误", f"保存 HOSTS 文件失败: {e}")
+        ip = self.ip_entry.get().strip() or "0.0.0.0"
+
+        def on_done(result: HostsImportResult) -> None:
+            self._set_dirty(False)
+            messagebox.showinfo(
+                "导入完成",
+                f"新增: {result.added}\n跳过（已存在）: {result.skipped}\n"
+                f"冲突（已映射到其他 IP）: {result.conflicts}\n无法识别: {result.invalid}"
+            )
+            self.load_hosts(confirm=False)
+
+        self.run_background(
+            partial(HostsService.import_blocklists, paths, ip),
+            on_done,
+            lambda e: messagebox.showerror("错误", f"导入屏蔽列表失败: {e}"),
+            busy_text="正在导入屏蔽列表..."
+        )
+
+    def _set_dirty(self, dirty: bool) -> None:
+        """设置未保存标记"""
+        self._dirty = dirty
+        self.content_frame.config(text="HOSTS 文件内容 (未保存)" if dirty else "HOSTS 文件内容")
+
+    # 条目编辑
 
     def _add_entry(self) -> None:
         """添加 HOSTS 条目"""
@@ -83,11 +253,192 @@ class HostsTab(BaseTab):
             messagebox.showwarning("警告", "请输入 IP 和域名")
             return
 
-        entry = HostsService.format_entry(ip, domain)
-        self.text.insert(tk.END, entry)
+        if self._raw_mode and self.text is not None:
+            self.text.insert(tk.END, HostsService.format_entry(ip, domain))
+        else:
+            line = self.document.add(ip, domain)
+            self._selected = line
+            self._apply_search()
+            if line in self._rows:
+                self._scroll_to(self._rows.index(line))
+
+        self._set_dirty(True)
         self.ip_entry.delete(0, tk.END)
         self.domain_entry.delete(0, tk.END)
 
+    def _delete_selected(self) -> None:
+        """删除选中的行"""
+        if self._raw_mode:
+            messagebox.showinfo("提示", "原始编辑模式下请直接编辑文本")
+            return
+
+        line = self._selected
+        if line is None:
+            messagebox.showwarning("警告", "请先选择要删除的条目")
+            return
+
+        self.document.remove_line(line)
+        # 删除注释/空行，或删除的映射在别处仍存在时，增量变更无法表达，需整体保存
+        if not line.is_entry or any(self.document.has_entry(line.ip, d) for d in line.domains):
+            self._needs_full_save = True
+        self._selected = None
+        self._set_dirty(True)
+        self._apply_search()
+
+    # 搜索
+
+    def _schedule_search(self) -> None:
+        """输入防抖后执行搜索"""
+        if self._search_job is not None:
+            self.frame.after_cancel(self._search_job)
+        self._search_job = self.frame.after(self.SEARCH_DELAY_MS, self._apply_search)
+
+    def _apply_search(self) -> None:
+        """按搜索关键字刷新可见行"""
+        self._search_job = None
+        keyword = self.search_var.get()
+        self._rows = self.document.search(keyword)
+        if keyword.strip():
+            self.count_label.config(text=f"匹配 {len(self._rows)} 行 / 共 {len(self.document)} 行")
+        else:
+            self.count_label.config(text=f"共 {len(self.document)} 行")
+        self._render()
+
+    # 虚拟列表
+
+    def _visible_count(self) -> int:
+        """可见行数"""
+        style = ttk.Style()
+        row_height = int(style.lookup("Treeview", "rowheight") or 20)
+        # 扣除表头
+        return max(1, self.tree.winfo_height() // row_height - 1)
+
+    def _render(self) -> None:
+        """只渲染可见范围内的行，复用已有的 Treeview 项"""
+        total = len(self._rows)
+        visible = self._visible_count()
+        self._offset = max(0, min(self._offset, total - visible))
+        window = self._rows[self._offset:self._offset + visible]
+
+        selected_iid = ""
+        for i, line in enumerate(window):
+            iid = f"row{i}"
+            comment = f"#{line.comment}" if line.comment else ""
+            values = (line.ip, " ".join(line.domains), comment)
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=values)
+            else:
+                self.tree.insert("", tk.END, iid=iid, values=values)
+            if line is self._selected:
+                selected_iid = iid
+
+        for i in range(len(window), len(self.tree.get_children())):
+            self.tree.delete(f"row{i}")
+
+        # 选中的行滚出可见范围时不显示选中状态
+        if selected_iid:
+            self.tree.selection_set(selected_iid)
+        else:
+            self.tree.selection_set(())
+
+        if total:
+            self.scrollbar.set(self._offset / total, (self._offset + len(window)) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_select(self, event) -> None:
+        """记录选中的行"""
+        selected = self.tree.selection()
+        if selected:
+            index = self._offset + self.tree.index(selected[0])
+            if index < len(self._rows):
+                self._selected = self._rows[index]
+
+    def _scroll_rows(self, rows: int) -> str:
+        """按行滚动"""
+        self._offset += rows
+        self._render()
+        return "break"
+
+    def _scroll_to(self, index: int) -> None:
+        """滚动使指定行可见"""
+        visible = self._visible_count()
+        if not self._offset <= index < self._offset + visible:
+            self._offset = index - visible // 2
+        self._render()
+
+    def _on_mousewheel(self, event) -> str:
+        """鼠标滚轮滚动"""
+        return self._scroll_rows(-self.WHEEL_ROWS if event.delta > 0 else self.WHEEL_ROWS)
+
+    def _on_scrollbar(self, action: str, *args) -> None:
+        """滚动条拖动/点击"""
+        visible = self._visible_count()
+        if action == "moveto":
+            self._offset = int(float(args[0]) * len(self._rows))
+        elif action == "scroll":
+            amount = int(args[0])
+            self._offset += amount * visible if args[1] == "pages" else amount
+        self._render()
+
+    # 原始编辑模式
+
+    def _toggle_raw_mode(self) -> None:
+        """切换原始编辑模式"""
+        if self.raw_mode_var.get():
+            self._enter_raw_mode()
+        else:
+            self._leave_raw_mode()
+
+    def _enter_raw_mode(self) -> None:
+        """进入原始编辑：用完整文本框显示文件内容"""
+        self.text = scrolledtext.ScrolledText(
+            self.content_frame, wrap=tk.NONE, font=("Consolas", 10), undo=True
+        )
+        self._fill_raw_text()
+        self.text.bind("<<Modified>>", self._on_raw_modified)
+        self.list_frame.pack_forget()
+        self.text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.search_entry.config(state=tk.DISABLED)
+        self._raw_mode = True
+
+    def _leave_raw_mode(self) -> None:
+        """退出原始编辑：解析文本并回到虚拟列表"""
+        if self.text is None:
+            return
+        self._sync_from_raw_text()
+        self.text.destroy()
+        self.text = None
+        self._raw_mode = False
+        self.search_entry.config(state=tk.NORMAL)
+        self.list_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self._apply_search()
+
+    def _fill_raw_text(self) -> None:
+        """把文档内容填入文本框"""
+        if self.text is None:
+            return
+        self.text.delete(1.0, tk.END)
+        self.text.insert(tk.END, self.document.serialize().replace("\r\n", "\n"))
+        self.text.edit_modified(False)
+
+    def _on_raw_modified(self, event) -> None:
+        """文本框内容被修改"""
+        if self.text is not None and self.text.edit_modified():
+            self._set_dirty(True)
+
+    def _sync_from_raw_text(self) -> None:
+        """把文本框内容解析回文档（保留原有换行符风格）"""
+        if self.text is None or not self.text.edit_modified():
+            return
+        content = self.text.get(1.0, "end-1c")
+        if self.document.newline != "\n":
+            content = content.replace("\n", self.document.newline)
+        self.document = HostsDocument.parse(content)
+        self._needs_full_save = True
+        self._selected = None
+        self.text.edit_modified(False)
+
     def _open_location(self) -> None:
         """打开 HOSTS 文件所在目录"""
         os.startfile(HostsService.get_directory())
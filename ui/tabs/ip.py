@@ -3,7 +3,8 @@
 import tkinter as tk
 from tkinter import messagebox, scrolledtext, ttk
 
-from services.network import NetworkService
+from services.network import AdapterInfo, IPConfigSnapshot, NetworkService
+from services.watcher import WatcherService
 
 from .base import BaseTab
 
@@ -16,7 +17,13 @@ class IPTab(BaseTab):
         self._create_buttons()
         self._create_adapter_table()
         self._create_detail_area()
-        self.load_ip_info()
+
+        # 首次加载和之后的变化都由监视器推送
+        self.watch(
+            WatcherService.get_ipconfig_watcher(),
+            self._show_ip_info,
+            lambda e: messagebox.showerror("错误", f"获取 IP 信息失败: {e}")
+        )
 
     def _create_buttons(self) -> None:
         """创建按钮区域"""
@@ -26,6 +33,9 @@ class IPTab(BaseTab):
         ttk.Button(btn_frame, text="刷新", command=self.load_ip_info).pack(side=tk.LEFT, padx=2)
         ttk.Button(btn_frame, text="复制选中IP", command=self._copy_ip).pack(side=tk.LEFT, padx=2)
 
+        self.busy_label = ttk.Label(btn_frame, text="", foreground="gray")
+        self.busy_label.pack(side=tk.RIGHT, padx=5)
+
     def _create_adapter_table(self) -> None:
         """创建适配器信息表"""
         table_frame = ttk.LabelFrame(self.frame, text="网络适配器信息")
@@ -68,25 +78,46 @@ class IPTab(BaseTab):
         self.detail_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
     def load_ip_info(self) -> None:
-        """加载 IP 信息"""
+        """加载 IP 信息（后台执行）"""
+        if self.busy:
+            return
+
+        # 手动刷新总是重新获取，一次 ipconfig 同时得到详细输出和适配器列表
+        self.run_background(
+            lambda: NetworkService.get_snapshot(max_age=0),
+            self._show_ip_info,
+            lambda e: messagebox.showerror("错误", f"获取 IP 信息失败: {e}"),
+            busy_text="正在获取 IP 信息..."
+        )
+
+    def _show_ip_info(self, snapshot: IPConfigSnapshot) -> None:
+        """显示 IP 信息：按适配器名称就地更新表格，保留选中项和滚动位置"""
+        adapters = {adapter.name: adapter for adapter in snapshot.adapters}
         for item in self.tree.get_children():
-            self.tree.delete(item)
-        self.detail_text.delete(1.0, tk.END)
-
-        try:
-            # 获取详细输出
-            output = NetworkService.get_ipconfig_output()
-            self.detail_text.insert(tk.END, output)
-
-            # 获取适配器列表
-            adapters = NetworkService.get_adapters()
-            for adapter in adapters:
-                self.tree.insert("", tk.END, values=(
-                    adapter.name, adapter.ipv4, adapter.mask,
-                    adapter.gateway, adapter.dns, adapter.mac
-                ))
-        except Exception as e:
-            messagebox.showerror("错误", f"获取 IP 信息失败: {e}")
+            if item not in adapters:
+                self.tree.delete(item)
+        for position, (name, adapter) in enumerate(adapters.items()):
+            values = self._adapter_values(adapter)
+            if self.tree.exists(name):
+                if tuple(self.tree.item(name, "values")) != values:
+                    self.tree.item(name, values=values)
+                self.tree.move(name, "", position)
+            else:
+                self.tree.insert("", position, iid=name, values=values)
+
+        if self.detail_text.get(1.0, "end-1c") != snapshot.output:
+            top = self.detail_text.yview()[0]
+            self.detail_text.delete(1.0, tk.END)
+            self.detail_text.insert(tk.END, snapshot.output)
+            self.detail_text.yview_moveto(top)
+
+    @staticmethod
+    def _adapter_values(adapter: AdapterInfo) -> tuple[str, ...]:
+        """适配器在表格中显示的值"""
+        return (
+            adapter.name, adapter.ipv4, adapter.mask,
+            adapter.gateway, ", ".join(adapter.dns_servers), adapter.mac
+        )
 
     def _copy_ip(self) -> None:
         """复制选中的 IP 地址"""
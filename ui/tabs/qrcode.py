@@ -1,31 +1,37 @@
 """二维码识别选项卡"""
 
+from __future__ import annotations
+
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from typing import Optional
+from typing import TYPE_CHECKING
 
+from utils.lazy import LazyDeps, lazy_import
 from utils.logger import logger
 
 from .base import BaseTab
 
-try:
-    import cv2
-    import numpy as np
-    from PIL import Image, ImageFile, ImageTk
-    from pyzbar import pyzbar
-    
-    # 启用截断图片加载
+if TYPE_CHECKING:
+    # 仅用于类型注解，运行时仍通过下面的延迟代理访问
+    from PIL.Image import Image as PILImage
+    from PIL.ImageTk import PhotoImage
+
+# 重量级依赖延迟到首次打开选项卡时导入
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+ImageFile = lazy_import("PIL.ImageFile")
+ImageTk = lazy_import("PIL.ImageTk")
+pyzbar = lazy_import("pyzbar.pyzbar")
+
+
+def _enable_truncated_images() -> None:
+    """启用截断图片加载"""
     ImageFile.LOAD_TRUNCATED_IMAGES = True
-    
-    DEPS_AVAILABLE = True
-    DEPS_ERROR = None
-except ImportError as e:
-    DEPS_AVAILABLE = False
-    DEPS_ERROR = f"缺少依赖库: {e}"
-except Exception as e:
-    DEPS_AVAILABLE = False
-    DEPS_ERROR = f"依赖库加载失败: {e}"
+
+
+DEPS = LazyDeps(cv2, np, Image, ImageFile, ImageTk, pyzbar, on_load=_enable_truncated_images)
 
 
 class QRCodeTab(BaseTab):
@@ -33,7 +39,7 @@ class QRCodeTab(BaseTab):
 
     def setup_ui(self) -> None:
         """设置 UI 界面"""
-        if not DEPS_AVAILABLE:
+        if not DEPS.available:
             self._show_dependency_error()
             return
 
@@ -130,8 +136,8 @@ class QRCodeTab(BaseTab):
         ).pack(fill=tk.X, pady=(5, 0))
 
         # 初始化变量
-        self.current_image: Optional[Image.Image] = None
-        self.photo_image: Optional[ImageTk.PhotoImage] = None
+        self.current_image: PILImage | None = None
+        self.photo_image: PhotoImage | None = None
         self.qr_contents: list[str] = []  # 存储识别出的二维码内容
 
         # 显示使用说明
@@ -148,10 +154,10 @@ class QRCodeTab(BaseTab):
         error_label.pack(pady=50)
 
         # 显示具体错误信息
-        if DEPS_ERROR:
+        if DEPS.error:
             error_detail = ttk.Label(
                 self.frame,
-                text=f"错误详情：{DEPS_ERROR}",
+                text=f"错误详情：{DEPS.error}",
                 font=("Microsoft YaHei UI", 10),
                 foreground="red"
             )
@@ -355,7 +361,7 @@ class QRCodeTab(BaseTab):
             logger.error(f"加载图片文件失败: {file_path}, 错误: {e}")
             messagebox.showerror("错误", f"加载图片失败: {e}")
 
-    def _load_image(self, image: Image.Image) -> None:
+    def _load_image(self, image: PILImage) -> None:
         """加载并显示图片"""
         self.current_image = image.copy()
         
@@ -365,7 +371,7 @@ class QRCodeTab(BaseTab):
         # 识别二维码
         self._recognize_qrcodes(image)
 
-    def _display_image(self, image: Image.Image) -> None:
+    def _display_image(self, image: PILImage) -> None:
         """在画布上显示图片"""
         # 获取画布尺寸
         canvas_width = self.canvas.winfo_width()
@@ -395,7 +401,7 @@ class QRCodeTab(BaseTab):
         y = (canvas_height - new_height) // 2
         self.canvas.create_image(x, y, anchor=tk.NW, image=self.photo_image)
 
-    def _recognize_qrcodes(self, image: Image.Image) -> None:
+    def _recognize_qrcodes(self, image: PILImage) -> None:
         """识别图片中的二维码"""
         try:
             # 转换为 OpenCV 格式
@@ -1,9 +1,11 @@
 """路由管理选项卡"""
 
+import functools
 import tkinter as tk
-from tkinter import messagebox, ttk
+from tkinter import filedialog, messagebox, ttk
 
-from services.route import RouteService
+from services.route import RouteBatchResult, RouteEntry, RouteKey, RouteService, RouteSnapshot
+from services.watcher import WatcherService
 
 from .base import BaseTab
 
@@ -11,12 +13,31 @@ from .base import BaseTab
 class RouteTab(BaseTab):
     """路由管理选项卡"""
 
+    # 筛选输入防抖（毫秒）
+    FILTER_DELAY_MS = 150
+    # 筛选下拉框中表示不限的选项
+    ALL = "全部"
+
     def setup_ui(self) -> None:
         """设置 UI 界面"""
+        self._snapshot = RouteSnapshot([])
+        # 路由 -> Treeview 项
+        self._route_items: dict[int, str] = {}
+        # 当前显示（未被筛选掉）的 Treeview 项
+        self._visible_items: set[str] = set()
+        self._sort_column: str | None = None
+        self._sort_descending = False
+        self._filter_job: str | None = None
+
         self._create_buttons()
         self._create_add_route()
+        self._create_lookup()
+        self._create_filter_bar()
         self._create_route_table()
-        self.load_routes()
+
+        # 首次加载和之后的变化都由监视器推送
+        self._watcher = WatcherService.get_route_watcher()
+        self.watch(self._watcher, self._show_routes, self._show_load_error)
 
     def _create_buttons(self) -> None:
         """创建按钮区域"""
@@ -25,6 +46,10 @@ class RouteTab(BaseTab):
 
         ttk.Button(btn_frame, text="刷新路由表", command=self.load_routes).pack(side=tk.LEFT, padx=2)
         ttk.Button(btn_frame, text="删除选中路由", command=self._delete_route).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="批量导入路由", command=self._import_routes).pack(side=tk.LEFT, padx=2)
+
+        self.busy_label = ttk.Label(btn_frame, text="", foreground="gray")
+        self.busy_label.pack(side=tk.RIGHT, padx=5)
 
     def _create_add_route(self) -> None:
         """创建添加路由区域"""
@@ -61,23 +86,62 @@ class RouteTab(BaseTab):
 
         ttk.Button(row2, text="添加路由", command=self._add_route).pack(side=tk.LEFT, padx=10)
 
+    def _create_lookup(self) -> None:
+        """创建路由查询区域"""
+        lookup_frame = ttk.LabelFrame(self.frame, text="路由查询")
+        lookup_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        ttk.Label(lookup_frame, text="目标地址:").pack(side=tk.LEFT, padx=2)
+        self.lookup_entry = ttk.Entry(lookup_frame, width=15)
+        self.lookup_entry.pack(side=tk.LEFT, padx=2)
+        self.lookup_entry.bind("<Return>", lambda e: self._lookup_route())
+
+        ttk.Button(lookup_frame, text="查询", command=self._lookup_route).pack(side=tk.LEFT, padx=5)
+
+        self.lookup_label = ttk.Label(lookup_frame, text="")
+        self.lookup_label.pack(side=tk.LEFT, padx=10)
+
+    def _create_filter_bar(self) -> None:
+        """创建筛选栏"""
+        filter_frame = ttk.Frame(self.frame)
+        filter_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+
+        ttk.Label(filter_frame, text="网关:").pack(side=tk.LEFT, padx=2)
+        self.gateway_filter = ttk.Combobox(filter_frame, width=15, state="readonly", values=[self.ALL])
+        self.gateway_filter.set(self.ALL)
+        self.gateway_filter.pack(side=tk.LEFT, padx=2)
+        self.gateway_filter.bind("<<ComboboxSelected>>", lambda e: self._apply_view())
+
+        ttk.Label(filter_frame, text="接口:").pack(side=tk.LEFT, padx=2)
+        self.interface_filter = ttk.Combobox(filter_frame, width=15, state="readonly", values=[self.ALL])
+        self.interface_filter.set(self.ALL)
+        self.interface_filter.pack(side=tk.LEFT, padx=2)
+        self.interface_filter.bind("<<ComboboxSelected>>", lambda e: self._apply_view())
+
+        ttk.Label(filter_frame, text="搜索:").pack(side=tk.LEFT, padx=2)
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add("write", lambda *args: self._schedule_filter())
+        ttk.Entry(filter_frame, textvariable=self.filter_var, width=20).pack(side=tk.LEFT, padx=2)
+
+        self.count_label = ttk.Label(filter_frame, text="正在获取路由表...", foreground="gray")
+        self.count_label.pack(side=tk.LEFT, padx=10)
+
     def _create_route_table(self) -> None:
         """创建路由表显示区域"""
         table_frame = ttk.LabelFrame(self.frame, text="路由表")
         table_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-        columns = ("dest", "mask", "gateway", "interface", "metric")
-        self.tree = ttk.Treeview(table_frame, columns=columns, show="headings")
-
-        headings = [
-            ("dest", "目标网络", 120),
-            ("mask", "子网掩码", 120),
-            ("gateway", "网关", 120),
-            ("interface", "接口", 120),
-            ("metric", "跃点数", 80),
-        ]
-        for col, text, width in headings:
-            self.tree.heading(col, text=text)
+        self.tree = ttk.Treeview(table_frame, columns=RouteSnapshot.COLUMNS, show="headings")
+
+        self._headings = {
+            "destination": "目标网络",
+            "mask": "子网掩码",
+            "gateway": "网关",
+            "interface": "接口",
+            "metric": "跃点数",
+        }
+        for col, width in zip(RouteSnapshot.COLUMNS, (120, 120, 120, 120, 80), strict=True):
+            self.tree.heading(col, text=self._headings[col], command=functools.partial(self._sort_by, col))
             self.tree.column(col, width=width)
 
         scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
@@ -87,24 +151,154 @@ class RouteTab(BaseTab):
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
     def load_routes(self) -> None:
-        """加载路由表"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """加载路由表（后台执行）"""
+        if self.busy:
+            return
+
+        self.run_background(
+            RouteService.get_snapshot,
+            self._show_routes,
+            self._show_load_error,
+            busy_text="正在获取路由表..."
+        )
+
+    def _show_load_error(self, error: Exception) -> None:
+        """获取路由表失败：更新计数标签并提示"""
+        self.count_label.config(text="获取路由表失败")
+        messagebox.showerror("错误", f"获取路由表失败: {error}")
+
+    def _show_routes(self, snapshot: RouteSnapshot) -> None:
+        """显示路由表：只把新增/删除/修改的路由应用到 Treeview，保留选中项和滚动位置"""
+        diff = RouteService.diff(self._snapshot.routes, snapshot.routes)
+        self._snapshot = snapshot
+
+        for key in diff.removed:
+            iid = self._item_id(key)
+            if self.tree.exists(iid):
+                self.tree.delete(iid)
+
+        for key, route in diff.changed.items():
+            self.tree.item(self._item_id(key), values=self._route_values(route))
+
+        if diff.added:
+            for position, key in enumerate(diff.keys):
+                added = diff.added.get(key)
+                if added is not None:
+                    self.tree.insert("", position, iid=self._item_id(key), values=self._route_values(added))
+
+        self._route_items = {
+            id(route): self._item_id(key)
+            for key, route in zip(snapshot.keys, snapshot.routes, strict=True)
+        }
+
+        for combobox, column in ((self.gateway_filter, "gateway"), (self.interface_filter, "interface")):
+            values = snapshot.values(column)
+            combobox.config(values=[self.ALL, *values])
+            if combobox.get() not in values:
+                combobox.set(self.ALL)
+
+        self._apply_view()
+
+        if self.lookup_entry.get().strip():
+            self._lookup_route(reveal=False)
+
+    # 排序与筛选（只使用内存中的快照）
+
+    def _sort_by(self, column: str) -> None:
+        """点击列标题排序，再次点击切换升序/降序"""
+        if self._sort_column == column:
+            self._sort_descending = not self._sort_descending
+        else:
+            self._sort_column = column
+            self._sort_descending = False
+
+        for col, text in self._headings.items():
+            if col == column:
+                text += " ▼" if self._sort_descending else " ▲"
+            self.tree.heading(col, text=text)
+        self._apply_view()
+
+    def _schedule_filter(self) -> None:
+        """输入防抖后筛选"""
+        if self._filter_job is not None:
+            self.frame.after_cancel(self._filter_job)
+        self._filter_job = self.frame.after(self.FILTER_DELAY_MS, self._apply_view)
+
+    def _apply_view(self) -> None:
+        """按当前排序和筛选条件重排 Treeview（筛选掉的项被分离而非删除）"""
+        self._filter_job = None
+        snapshot = self._snapshot
+        filters = {
+            "gateway": self.gateway_filter.get(),
+            "interface": self.interface_filter.get(),
+        }
+        rows = snapshot.query(
+            self._sort_column,
+            self._sort_descending,
+            {column: value for column, value in filters.items() if value != self.ALL},
+            self.filter_var.get()
+        )
+
+        items = [self._item_id(snapshot.keys[i]) for i in rows]
+        self.tree.set_children("", *items)
+        self._visible_items = set(items)
+
+        if len(items) < len(snapshot):
+            self.count_label.config(text=f"显示 {len(items)} 条 / 共 {len(snapshot)} 条")
+        else:
+            self.count_label.config(text=f"共 {len(snapshot)} 条")
+
+    @staticmethod
+    def _item_id(key: RouteKey) -> str:
+        """路由键对应的 Treeview 项 ID"""
+        return "|".join(map(str, key))
+
+    @staticmethod
+    def _route_values(route: RouteEntry) -> tuple[str, ...]:
+        """路由在表格中显示的值"""
+        return (route.destination, route.mask, route.gateway, route.interface, str(route.metric))
+
+    def _lookup_route(self, reveal: bool = True) -> None:
+        """查询目标地址实际使用的路由，reveal 时在路由表中选中并滚动到该路由"""
+        address = self.lookup_entry.get().strip()
+        if not address:
+            self.lookup_label.config(text="")
+            return
 
         try:
-            routes = RouteService.get_routes()
-            for route in routes:
-                self.tree.insert("", tk.END, values=(
-                    route.destination, route.mask, route.gateway,
-                    route.interface, route.metric
-                ))
-        except Exception as e:
-            messagebox.showerror("错误", f"获取路由表失败: {e}")
+            route = self._snapshot.index.lookup(address)
+        except ValueError as e:
+            self.lookup_label.config(text=str(e), foreground="red")
+            return
+
+        if route is None:
+            self.lookup_label.config(text="没有匹配的路由", foreground="red")
+            return
+
+        self.lookup_label.config(
+            text=f"{route.destination}/{route.prefix} → 网关 {route.gateway}, 接口 {route.interface}, 跃点数 {route.metric}",
+            foreground=""
+        )
+        item = self._route_items.get(id(route))
+        if reveal and item in self._visible_items:
+            self.tree.selection_set(item)
+            self.tree.see(item)
+
+    def _on_route_changed(self, result: tuple[bool, str], error_prefix: str) -> None:
+        """路由添加/删除完成"""
+        success, message = result
+        if success:
+            messagebox.showinfo("成功", message)
+            self._watcher.trigger()
+        else:
+            messagebox.showerror("错误", f"{error_prefix}: {message}")
 
     def _add_route(self) -> None:
         """添加路由"""
         if not self.require_admin("添加路由"):
             return
+        if self.busy:
+            return
 
         dest = self.dest_entry.get().strip()
         mask = self.mask_entry.get().strip()
@@ -116,20 +310,19 @@ class RouteTab(BaseTab):
             messagebox.showwarning("警告", "请填写目标网络、子网掩码和网关")
             return
 
-        try:
-            success, message = RouteService.add(dest, mask, gateway, metric, persistent)
-            if success:
-                messagebox.showinfo("成功", message)
-                self.load_routes()
-            else:
-                messagebox.showerror("错误", f"添加路由失败: {message}")
-        except Exception as e:
-            messagebox.showerror("错误", f"添加路由失败: {e}")
+        self.run_background(
+            lambda: RouteService.add(dest, mask, gateway, metric, persistent),
+            lambda result: self._on_route_changed(result, "添加路由失败"),
+            lambda e: messagebox.showerror("错误", f"添加路由失败: {e}"),
+            busy_text="正在添加路由..."
+        )
 
     def _delete_route(self) -> None:
         """删除选中的路由"""
         if not self.require_admin("删除路由"):
             return
+        if self.busy:
+            return
 
         selected = self.tree.selection()
         if not selected:
@@ -142,12 +335,54 @@ class RouteTab(BaseTab):
         if not messagebox.askyesno("确认", f"确定要删除目标为 {dest} 的路由吗?"):
             return
 
+        self.run_background(
+            lambda: RouteService.delete(dest),
+            lambda result: self._on_route_changed(result, "删除路由失败"),
+            lambda e: messagebox.showerror("错误", f"删除路由失败: {e}"),
+            busy_text="正在删除路由..."
+        )
+
+    def _import_routes(self) -> None:
+        """从 CSV/JSON 文件批量添加/删除路由"""
+        if not self.require_admin("批量修改路由"):
+            return
+        if self.busy:
+            return
+
+        path = filedialog.askopenfilename(
+            title="选择路由文件",
+            filetypes=[("路由文件", "*.csv *.json"), ("所有文件", "*.*")]
+        )
+        if not path:
+            return
+
         try:
-            success, message = RouteService.delete(dest)
-            if success:
-                messagebox.showinfo("成功", message)
-                self.load_routes()
-            else:
-                messagebox.showerror("错误", f"删除路由失败: {message}")
-        except Exception as e:
-            messagebox.showerror("错误", f"删除路由失败: {e}")
+            changes = RouteService.load_changes(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("错误", f"读取路由文件失败: {e}")
+            return
+        if not changes:
+            messagebox.showinfo("提示", "文件中没有路由")
+            return
+        if not messagebox.askyesno("确认", f"确定要应用 {len(changes)} 条路由变更吗？\n失败时将回滚已应用的变更。"):
+            return
+
+        self.run_background(
+            lambda: RouteService.apply_batch(changes),
+            self._on_batch_done,
+            lambda e: messagebox.showerror("错误", f"批量导入路由失败: {e}"),
+            busy_text="正在批量应用路由..."
+        )
+
+    def _on_batch_done(self, result: RouteBatchResult) -> None:
+        """批量路由操作完成"""
+        summary = f"已应用: {len(result.applied)}\n已是目标状态（跳过）: {len(result.skipped)}"
+        if result.success:
+            messagebox.showinfo("成功", summary)
+        else:
+            failures = "\n".join(f"{change}: {message}" for change, message in result.failed[:10])
+            summary += f"\n失败: {len(result.failed)}\n已回滚: {len(result.rolled_back)}"
+            if result.rollback_failed:
+                summary += f"\n回滚失败: {len(result.rollback_failed)}"
+            messagebox.showerror("批量导入路由失败", f"{summary}\n\n{failures}")
+        self._watcher.trigger()
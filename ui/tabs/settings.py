@@ -1,10 +1,11 @@
 """设置选项卡"""
 
 import os
-import threading
+import re
 import tkinter as tk
 from tkinter import messagebox, ttk
 
+from services.downloads import DownloadManager
 from services.settings import AppSettings, SettingsService
 from services.tools import ToolsService
 from utils.logger import disable_console_log, enable_console_log, logger
@@ -65,6 +66,7 @@ class SettingsTab(BaseTab):
         self._create_display_settings()
         self._create_log_settings()
         self._create_tools_dir_settings()
+        self._create_download_settings()
         self._create_tools_management()
         self._create_buttons()
 
@@ -212,6 +214,24 @@ class SettingsTab(BaseTab):
                 os.makedirs(dir_path, exist_ok=True)
                 subprocess.Popen(["explorer", dir_path])
 
+    def _create_download_settings(self) -> None:
+        """创建下载设置"""
+        frame = ttk.LabelFrame(self.container, text="下载设置")
+        frame.pack(fill=tk.X, padx=10, pady=10)
+
+        row = ttk.Frame(frame)
+        row.pack(fill=tk.X, padx=10, pady=5)
+
+        ttk.Label(row, text="同时下载数:").pack(side=tk.LEFT, padx=5)
+        self.max_downloads_var = tk.IntVar(value=self.settings.max_downloads)
+        ttk.Spinbox(row, from_=1, to=8, textvariable=self.max_downloads_var, width=5).pack(side=tk.LEFT, padx=5)
+
+        ttk.Label(row, text="带宽上限 (KB/s):").pack(side=tk.LEFT, padx=15)
+        self.download_limit_var = tk.StringVar(value=str(self.settings.download_limit_kb))
+        ttk.Entry(row, textvariable=self.download_limit_var, width=8).pack(side=tk.LEFT, padx=5)
+
+        ttk.Label(row, text="(0 表示不限速，保存后立即生效)", foreground="gray").pack(side=tk.LEFT, padx=5)
+
     def _toggle_console_log(self) -> None:
         """切换终端日志"""
         if self.console_log_var.get():
@@ -249,6 +269,7 @@ class SettingsTab(BaseTab):
         ttk.Button(btn_frame, text="刷新", command=self._refresh_tools).pack(side=tk.LEFT, padx=2)
         ttk.Button(btn_frame, text="下载/更新", command=self._download_selected_tool).pack(side=tk.LEFT, padx=2)
         ttk.Button(btn_frame, text="卸载", command=self._uninstall_selected_tool).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="校验", command=self._verify_selected_tool).pack(side=tk.LEFT, padx=2)
         ttk.Button(btn_frame, text="编辑", command=self._edit_selected_tool).pack(side=tk.LEFT, padx=2)
         ttk.Button(btn_frame, text="访问主页", command=self._open_tool_homepage).pack(side=tk.LEFT, padx=2)
 
@@ -290,7 +311,7 @@ class SettingsTab(BaseTab):
         # 创建编辑窗口
         edit_win = tk.Toplevel(self.frame)
         edit_win.title(f"编辑 {tool.name}")
-        edit_win.geometry("500x200")
+        edit_win.geometry("500x240")
         edit_win.resizable(False, False)
         edit_win.transient(self.frame.winfo_toplevel())
         edit_win.grab_set()
@@ -317,6 +338,14 @@ class SettingsTab(BaseTab):
         homepage_entry = ttk.Entry(row3, textvariable=homepage_var, width=50)
         homepage_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
 
+        # 压缩包 SHA-256（可选）
+        row4 = ttk.Frame(edit_win)
+        row4.pack(fill=tk.X, padx=15, pady=5)
+        ttk.Label(row4, text="SHA-256:", width=12).pack(side=tk.LEFT)
+        sha256_var = tk.StringVar(value=tool.sha256)
+        sha256_entry = ttk.Entry(row4, textvariable=sha256_var, width=50)
+        sha256_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+
         # 按钮
         btn_frame = ttk.Frame(edit_win)
         btn_frame.pack(fill=tk.X, padx=15, pady=20)
@@ -324,11 +353,19 @@ class SettingsTab(BaseTab):
         def save_changes():
             new_url = url_var.get().strip()
             new_homepage = homepage_var.get().strip()
+            new_sha256 = sha256_var.get().strip().lower()
+
+            if new_sha256 and not re.fullmatch(r"[0-9a-f]{64}", new_sha256):
+                messagebox.showwarning("警告", "SHA-256 应为 64 位十六进制字符", parent=edit_win)
+                return
 
             if new_url:
                 ToolsService.update_tool_url(tool_id, new_url)
             if new_homepage != tool.homepage:
                 ToolsService.update_tool_homepage(tool_id, new_homepage)
+            if new_sha256 != tool.sha256:
+                # 大小只能在 tools.json 中配置，修改 SHA-256 时保留
+                ToolsService.update_tool_checksum(tool_id, new_sha256, tool.size)
 
             messagebox.showinfo("成功", "工具配置已保存")
             edit_win.destroy()
@@ -375,44 +412,60 @@ class SettingsTab(BaseTab):
 
         logger.info(f"开始{action}工具: {tool.name}")
 
-        # 创建进度窗口
-        progress_win = tk.Toplevel(self.frame)
-        progress_win.title(f"{action} {tool.name}")
-        progress_win.geometry("350x120")
-        progress_win.resizable(False, False)
-        progress_win.transient(self.frame.winfo_toplevel())
-        progress_win.grab_set()
-
-        ttk.Label(progress_win, text=f"正在{action} {tool.name}...").pack(pady=15)
-        progress_bar = ttk.Progressbar(progress_win, length=300, mode="determinate")
-        progress_bar.pack(pady=5)
-        progress_label = ttk.Label(progress_win, text="0%")
-        progress_label.pack(pady=10)
-
-        def update_progress(downloaded: int, total: int):
-            percent = int(downloaded * 100 / total)
-            progress_bar["value"] = percent
-            progress_label.config(text=f"{percent}%")
-            progress_win.update()
-
-        def download_thread():
-            # 如果是更新，先卸载
-            if tool.is_installed():
-                ToolsService.uninstall(tool_id)
-
-            success, msg = ToolsService.download(tool_id, update_progress)
-            progress_win.destroy()
-
+        def on_done(result: tuple[bool, str]) -> None:
+            success, msg = result
             if success:
-                logger.info(f"工具{action}成功: {tool.name}")
-                messagebox.showinfo("成功", f"{tool.name} {action}完成")
-            else:
+                logger.info(f"工具{action}成功: {tool.name}, {msg}")
+            elif msg != "下载已取消":
                 logger.error(f"工具{action}失败: {tool.name}, 原因: {msg}")
                 messagebox.showerror("错误", msg)
+            self._refresh_tools()
+
+        # 更新时只下载变化的文件，替换前旧版本一直可用；进度显示在下载面板中
+        self.start_download(tool_id, on_done, update=tool.is_installed())
+
+    def _verify_selected_tool(self) -> None:
+        """校验选中工具的已安装文件，有损坏时询问是否修复"""
+        selected = self.tools_tree.selection()
+        if not selected:
+            messagebox.showwarning("警告", "请先选择一个工具")
+            return
+
+        tool_id = selected[0]
+        tool = ToolsService.get_tool(tool_id)
+        if not tool:
+            return
+
+        if not tool.is_installed():
+            messagebox.showinfo("提示", f"{tool.name} 尚未安装")
+            return
 
+        def on_verified(result: tuple[bool, str]) -> None:
+            success, msg = result
+            if success:
+                messagebox.showinfo("校验通过", f"{tool.name}: {msg}")
+            elif messagebox.askyesno("校验失败", f"{tool.name}: {msg}\n\n是否修复？"):
+                self.run_background(
+                    lambda: ToolsService.repair(tool_id),
+                    on_repaired,
+                    lambda e: messagebox.showerror("错误", f"修复失败: {e}"),
+                    busy_text=f"正在修复 {tool.name}..."
+                )
+
+        def on_repaired(result: tuple[bool, str]) -> None:
+            success, msg = result
+            if success:
+                messagebox.showinfo("成功", f"{tool.name}: {msg}")
+            else:
+                messagebox.showerror("错误", msg)
             self._refresh_tools()
 
-        threading.Thread(target=download_thread, daemon=True).start()
+        self.run_background(
+            lambda: ToolsService.verify(tool_id),
+            on_verified,
+            lambda e: messagebox.showerror("错误", f"校验失败: {e}"),
+            busy_text=f"正在校验 {tool.name}..."
+        )
 
     def _uninstall_selected_tool(self) -> None:
         """卸载选中的工具"""
@@ -475,6 +528,16 @@ class SettingsTab(BaseTab):
                 messagebox.showwarning("警告", "请输入有效的窗口尺寸数值")
                 return
 
+            # 验证下载设置
+            try:
+                max_downloads = int(self.max_downloads_var.get())
+                download_limit_kb = int(self.download_limit_var.get())
+                if not 1 <= max_downloads <= 8 or download_limit_kb < 0:
+                    raise ValueError
+            except (ValueError, tk.TclError):
+                messagebox.showwarning("警告", "同时下载数应为 1-8，带宽上限不能为负数")
+                return
+
             # 处理工具目录
             tools_dir = self.tools_dir_var.get().strip()
             default_tools_dir = AppSettings.get_default_tools_dir()
@@ -494,7 +557,10 @@ class SettingsTab(BaseTab):
             self.settings.window_height = height
             self.settings.tools_dir = tools_dir
             self.settings.logs_dir = logs_dir
+            self.settings.max_downloads = max_downloads
+            self.settings.download_limit_kb = download_limit_kb
             SettingsService.save(self.settings)
+            DownloadManager.apply_settings()
             logger.info(f"设置已保存: font_size={self.settings.font_size}, window={width}x{height}")
             messagebox.showinfo("成功", "设置已保存，部分设置重启后生效")
         except Exception as e:
@@ -509,8 +575,11 @@ class SettingsTab(BaseTab):
         self.window_height_var.set("650")
         self.tools_dir_var.set(AppSettings.get_default_tools_dir())
         self.logs_dir_var.set(AppSettings.get_default_logs_dir())
+        self.max_downloads_var.set(AppSettings.max_downloads)
+        self.download_limit_var.set(str(AppSettings.download_limit_kb))
         disable_console_log()
         self.settings = AppSettings()
         SettingsService.save(self.settings)
+        DownloadManager.apply_settings()
         logger.info("设置已恢复默认")
         messagebox.showinfo("成功", "已恢复默认设置，重启后生效")
@@ -1,6 +1,5 @@
 """快捷入口选项卡"""
 
-import threading
 import tkinter as tk
 from tkinter import messagebox, ttk
 
@@ -219,33 +218,13 @@ class ShortcutTab(BaseTab):
         if not tool:
             return
 
-        # 创建下载进度窗口
-        progress_win = tk.Toplevel(self.frame)
-        progress_win.title(f"下载 {tool.name}")
-        progress_win.geometry("350x120")
-        progress_win.resizable(False, False)
-        progress_win.transient(self.frame.winfo_toplevel())
-        progress_win.grab_set()
-
-        ttk.Label(progress_win, text=f"正在下载 {tool.name}...").pack(pady=15)
-        progress_bar = ttk.Progressbar(progress_win, length=300, mode="determinate")
-        progress_bar.pack(pady=5)
-        progress_label = ttk.Label(progress_win, text="0%")
-        progress_label.pack(pady=10)
-
-        def update_progress(downloaded: int, total: int):
-            percent = int(downloaded * 100 / total)
-            progress_bar["value"] = percent
-            progress_label.config(text=f"{percent}%")
-            progress_win.update()
-
-        def download_thread():
-            success, msg = ToolsService.download(tool_id, update_progress)
-            progress_win.destroy()
+        def on_done(result: tuple[bool, str]) -> None:
+            success, msg = result
             if success:
                 messagebox.showinfo("成功", f"{tool.name} 下载完成")
                 ToolsService.launch(tool_id)
-            else:
+            elif msg != "下载已取消":
                 messagebox.showerror("错误", msg)
 
-        threading.Thread(target=download_thread, daemon=True).start()
+        # 进度显示在下载面板中
+        self.start_download(tool_id, on_done)
@@ -7,6 +7,7 @@ import webbrowser
 from tkinter import messagebox, ttk
 
 from services.tools import ToolsService
+from utils.fs import DirectorySnapshot
 from utils.logger import logger
 
 from .base import BaseTab
@@ -74,6 +75,9 @@ class SysinternalsTab(BaseTab):
 
     def setup_ui(self) -> None:
         """设置 UI 界面"""
+        # 安装目录的文件名快照，目录未变化时不再逐个检查工具文件
+        self._installed = DirectorySnapshot()
+
         # 标题
         header = ttk.Frame(self.frame)
         header.pack(fill=tk.X, padx=10, pady=10)
@@ -185,6 +189,8 @@ class SysinternalsTab(BaseTab):
 
     def _refresh_status(self) -> None:
         """刷新状态"""
+        # 手动刷新时重新扫描目录
+        self._installed.invalidate()
         tool = ToolsService.get_tool(self.TOOL_ID)
         if tool and tool.is_installed():
             self.status_label.config(text="✓ 已安装", foreground="green")
@@ -197,33 +203,24 @@ class SysinternalsTab(BaseTab):
 
     def _load_tools(self) -> None:
         """加载工具列表"""
-        for item in self.tools_tree.get_children():
-            self.tools_tree.delete(item)
-
-        tool = ToolsService.get_tool(self.TOOL_ID)
-        install_dir = tool.install_dir if tool else ""
-
-        for exe, name, desc in SYSINTERNALS_TOOLS:
-            exe_path = os.path.join(install_dir, exe) if install_dir else ""
-            status = "✓" if exe_path and os.path.exists(exe_path) else "✗"
-            self.tools_tree.insert("", tk.END, values=(exe, name, desc, status))
+        self._filter_tools()
 
     def _filter_tools(self) -> None:
-        """过滤工具列表"""
+        """过滤工具列表（搜索框每次输入都会调用）"""
         keyword = self.search_var.get().lower()
 
         for item in self.tools_tree.get_children():
             self.tools_tree.delete(item)
 
+        # 整个列表只 stat 一次安装目录，各工具是否存在为集合查找
         tool = ToolsService.get_tool(self.TOOL_ID)
-        install_dir = tool.install_dir if tool else ""
+        installed = self._installed.names(tool.install_dir) if tool else frozenset()
 
         for exe, name, desc in SYSINTERNALS_TOOLS:
             if keyword and keyword not in exe.lower() and keyword not in name.lower() and keyword not in desc.lower():
                 continue
 
-            exe_path = os.path.join(install_dir, exe) if install_dir else ""
-            status = "✓" if exe_path and os.path.exists(exe_path) else "✗"
+            status = "✓" if exe.lower() in installed else "✗"
             self.tools_tree.insert("", tk.END, values=(exe, name, desc, status))
 
     def _on_tool_double_click(self, event) -> None:
@@ -255,51 +252,24 @@ class SysinternalsTab(BaseTab):
 
     def _install_suite(self) -> None:
         """安装/更新套件"""
-        import threading
-
         tool = ToolsService.get_tool(self.TOOL_ID)
         if not tool:
             return
 
         action = "更新" if tool.is_installed() else "下载"
 
-        # 创建进度窗口
-        progress_win = tk.Toplevel(self.frame)
-        progress_win.title(f"{action} Sysinternals Suite")
-        progress_win.geometry("350x120")
-        progress_win.resizable(False, False)
-        progress_win.transient(self.frame.winfo_toplevel())
-        progress_win.grab_set()
-
-        ttk.Label(progress_win, text=f"正在{action} Sysinternals Suite...").pack(pady=15)
-        progress_bar = ttk.Progressbar(progress_win, length=300, mode="determinate")
-        progress_bar.pack(pady=5)
-        progress_label = ttk.Label(progress_win, text="0%")
-        progress_label.pack(pady=10)
-
-        def update_progress(downloaded: int, total: int):
-            percent = int(downloaded * 100 / total)
-            progress_bar["value"] = percent
-            progress_label.config(text=f"{percent}%")
-            progress_win.update()
-
-        def download_thread():
-            if tool.is_installed():
-                ToolsService.uninstall(self.TOOL_ID)
-
-            success, msg = ToolsService.download(self.TOOL_ID, update_progress)
-            progress_win.destroy()
-
+        def on_done(result: tuple[bool, str]) -> None:
+            success, msg = result
             if success:
-                logger.info(f"Sysinternals Suite {action}成功")
+                logger.info(f"Sysinternals Suite {action}成功: {msg}")
                 messagebox.showinfo("成功", f"Sysinternals Suite {action}完成")
-            else:
+            elif msg != "下载已取消":
                 logger.error(f"Sysinternals Suite {action}失败: {msg}")
                 messagebox.showerror("错误", msg)
-
             self._refresh_status()
 
-        threading.Thread(target=download_thread, daemon=True).start()
+        # 更新时只下载变化的文件，替换前旧版本一直可用；进度显示在下载面板中
+        self.start_download(self.TOOL_ID, on_done, update=tool.is_installed())
 
     def _open_folder(self) -> None:
         """打开安装目录"""
@@ -1,11 +1,43 @@
-"""工具模块"""
+"""工具模块
+
+导出项按需导入，避免导入任一子模块时顺带初始化日志等模块。
+"""
+
+import importlib
+from typing import Any
+
+# 导出名 -> 子模块名
+_EXPORTS = {
+    "is_admin": "admin",
+    "run_as_admin": "admin",
+    "set_taskbar_icon": "admin",
+    "DirectorySnapshot": "fs",
+    "lazy_import": "lazy",
+    "LazyModule": "lazy",
+    "LazyDeps": "lazy",
+    "logger": "logger",
+    "enable_console_log": "logger",
+    "disable_console_log": "logger",
+    "is_console_log_enabled": "logger",
+    "startup_profiler": "profiler",
+    "run_command": "system",
+    "run_command_async": "system",
+    "open_system_tool": "system",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-from .admin import is_admin, run_as_admin, set_taskbar_icon
-from .logger import disable_console_log, enable_console_log, is_console_log_enabled, logger
-from .system import open_system_tool, run_command
 
 __all__ = [
     "is_admin", "run_as_admin", "set_taskbar_icon",
-    "run_command", "open_system_tool",
-    "logger", "enable_console_log", "disable_console_log", "is_console_log_enabled"
+    "run_command", "run_command_async", "open_system_tool",
+    "DirectorySnapshot",
+    "lazy_import", "LazyModule", "LazyDeps",
+    "logger", "enable_console_log", "disable_console_log", "is_console_log_enabled",
+    "startup_profiler"
 ]
@@ -0,0 +1,60 @@
+"""文件系统工具
+
+DirectorySnapshot 缓存目录中的文件名：一次 os.scandir 得到全部名称，之后只 stat 目录本身，
+目录的修改时间不变就直接用缓存，判断文件是否存在变成集合查找。
+目录中增删、重命名文件都会更新目录的修改时间；文件内容变化不会，因此只适合判断是否存在。
+"""
+
+import os
+import threading
+import time
+
+
+class DirectorySnapshot:
+    """目录文件名快照（按目录修改时间失效）"""
+
+    # 修改时间与扫描时间相差不到此值（纳秒）时，扫描期间可能还有修改落在同一时间戳内，
+    # 下次查询时重新扫描（部分文件系统的时间戳精度为 1~2 秒）
+    RACY_WINDOW_NS = 2_000_000_000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._path = ""
+        # (st_ino, st_mtime_ns)，目录被整个替换时 inode 也会变化
+        self._key: tuple[int, int] | None = None
+        self._racy = False
+        self._names: frozenset[str] = frozenset()
+
+    def names(self, path: str) -> frozenset[str]:
+        """目录中所有条目的名称（小写），目录不存在时为空"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._path, self._key, self._names = path, None, frozenset()
+            return self._names
+
+        key = (st.st_ino, st.st_mtime_ns)
+        with self._lock:
+            if path == self._path and key == self._key and not self._racy:
+                return self._names
+
+            scanned_at = time.time_ns()
+            try:
+                with os.scandir(path) as it:
+                    # Windows 文件名不区分大小写
+                    names = frozenset(entry.name.lower() for entry in it)
+            except OSError:
+                names = frozenset()
+            self._path, self._key, self._names = path, key, names
+            self._racy = scanned_at - st.st_mtime_ns < self.RACY_WINDOW_NS
+            return names
+
+    def contains(self, path: str, name: str) -> bool:
+        """目录中是否有名为 name 的条目"""
+        return name.lower() in self.names(path)
+
+    def invalidate(self) -> None:
+        """丢弃快照，下次查询时重新扫描"""
+        with self._lock:
+            self._key = None
@@ -0,0 +1,88 @@
+"""延迟导入工具
+
+重量级依赖（如 OpenCV）只在首次使用时导入，避免拖慢启动。
+"""
+
+import importlib
+import threading
+from collections.abc import Callable
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule(ModuleType):
+    """延迟导入的模块代理，首次访问属性时才真正导入"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> ModuleType:
+        """导入真实模块"""
+        module = self.__dict__.get("_lazy_module")
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_lazy_module"] = module
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        """是否已导入"""
+        return self.__dict__.get("_lazy_module") is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        if attr.startswith("__"):
+            super().__setattr__(attr, value)
+        else:
+            setattr(self._load(), attr, value)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> LazyModule:
+    """创建延迟导入的模块代理"""
+    return LazyModule(name)
+
+
+class LazyDeps:
+    """一组可选依赖，首次探测时导入并记录是否可用"""
+
+    def __init__(self, *modules: LazyModule, on_load: Callable[[], None] | None = None):
+        self._modules = modules
+        self._on_load = on_load
+        self._probed = False
+        self._available = False
+        self._error: str | None = None
+        self._lock = threading.Lock()
+
+    def probe(self) -> bool:
+        """导入全部依赖，返回是否可用（结果会被缓存）"""
+        with self._lock:
+            if not self._probed:
+                try:
+                    for module in self._modules:
+                        module._load()
+                    if self._on_load:
+                        self._on_load()
+                    self._available = True
+                except ImportError as e:
+                    self._error = f"缺少依赖库: {e}"
+                except Exception as e:
+                    self._error = f"依赖库加载失败: {e}"
+                self._probed = True
+            return self._available
+
+    @property
+    def available(self) -> bool:
+        """依赖是否可用（会触发导入）"""
+        return self.probe()
+
+    @property
+    def error(self) -> str | None:
+        """依赖加载失败原因（会触发导入）"""
+        self.probe()
+        return self._error
@@ -6,6 +6,8 @@ import sys
 
 from loguru import logger
 
+from .profiler import startup_profiler
+
 
 def _get_logs_dir() -> str:
     """获取日志目录（避免循环导入，直接读取配置文件）"""
@@ -26,8 +28,9 @@ def _get_logs_dir() -> str:
 
 
 # 日志目录
-LOG_DIR = _get_logs_dir()
-os.makedirs(LOG_DIR, exist_ok=True)
+with startup_profiler.phase("logger._get_logs_dir"):
+    LOG_DIR = _get_logs_dir()
+    os.makedirs(LOG_DIR, exist_ok=True)
 
 # 移除默认处理器
 logger.remove()
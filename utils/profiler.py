@@ -0,0 +1,119 @@
+"""启动性能追踪
+
+记录启动各阶段的耗时，输出 Chrome Trace Event 格式的 JSON，
+可直接用 chrome://tracing、Perfetto 或 speedscope 以火焰图查看。
+
+启用方式：
+- 环境变量 WINTOOLBOX_STARTUP_TRACE=<输出文件>
+- 命令行参数 --startup-trace [输出文件]
+
+未指定输出文件时写入日志目录下的 startup_trace.json。
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+TRACE_ENV = "WINTOOLBOX_STARTUP_TRACE"
+DEFAULT_TRACE_FILE = "startup_trace.json"
+
+
+class StartupProfiler:
+    """启动阶段耗时记录器（未启用时开销可忽略）"""
+
+    def __init__(self):
+        # 以模块导入时刻为起点，尽量覆盖全部启动过程
+        self._origin: float = time.perf_counter()
+        self._events: list[dict] = []
+        self._lock = threading.Lock()
+        self.enabled = False
+        # 输出文件：None 表示不写文件，空字符串表示日志目录下的默认文件
+        self.output: str | None = None
+
+        env_output = os.environ.get(TRACE_ENV, "")
+        if env_output:
+            self.enable(env_output)
+
+    def enable(self, output: str | None = None) -> None:
+        """启用追踪；output 为 None 时只计时不写文件"""
+        self.enabled = True
+        if output is not None:
+            self.output = output or self.output or ""
+
+    def elapsed_ms(self) -> float:
+        """自起点以来经过的毫秒数"""
+        return (time.perf_counter() - self._origin) * 1000
+
+    def _timestamp_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1_000_000
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """记录一个阶段的耗时（可嵌套）"""
+        if not self.enabled:
+            yield
+            return
+
+        start = self._timestamp_us()
+        try:
+            yield
+        finally:
+            duration = self._timestamp_us() - start
+            self._add_event({"name": name, "ph": "X", "ts": start, "dur": duration})
+
+    def mark(self, name: str) -> None:
+        """记录一个时间点"""
+        if self.enabled:
+            self._add_event({"name": name, "ph": "i", "ts": self._timestamp_us(), "s": "p"})
+
+    def _add_event(self, event: dict) -> None:
+        event["pid"] = os.getpid()
+        event["tid"] = threading.get_ident()
+        with self._lock:
+            self._events.append(event)
+
+    def get_phases(self) -> dict[str, float]:
+        """获取各阶段耗时（毫秒），同名阶段累加"""
+        phases: dict[str, float] = {}
+        with self._lock:
+            for event in self._events:
+                if event["ph"] == "X":
+                    phases[event["name"]] = phases.get(event["name"], 0.0) + event["dur"] / 1000
+        return phases
+
+    def to_dict(self) -> dict:
+        """生成 Trace Event 格式数据"""
+        with self._lock:
+            events = sorted(self._events, key=lambda e: e["ts"])
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "elapsed_ms": round(self.elapsed_ms(), 3),
+                "phases_ms": {k: round(v, 3) for k, v in self.get_phases().items()},
+            },
+        }
+
+    def save(self, output: str | None = None) -> str | None:
+        """写出追踪文件，返回文件路径（未指定输出时不写，返回 None）"""
+        path = output or self.output
+        if path is None:
+            return None
+        if not path:
+            # 在此导入：日志模块本身也会导入本模块
+            from .logger import LOG_DIR
+            path = os.path.join(LOG_DIR, DEFAULT_TRACE_FILE)
+        path = os.path.abspath(path)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        return path
+
+
+# 全局启动追踪器
+startup_profiler = StartupProfiler()
@@ -1,32 +1,152 @@
 """系统工具函数"""
 
+import asyncio
+import os
 import subprocess
+import weakref
+from collections.abc import Callable
 from tkinter import messagebox
 
+# 非 Windows 平台没有该标志
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+# 替身命令目录：设置后优先执行该目录下的同名可执行文件（用于在 Linux 下测试）
+COMMAND_DIR_ENV = "WINTOOLBOX_COMMAND_DIR"
+
+# 异步命令最大并发数
+MAX_CONCURRENT_COMMANDS = 4
+
+# 每个事件循环一个并发信号量
+_command_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def resolve_command(cmd: list[str]) -> list[str]:
+    """解析命令，存在替身命令时替换可执行文件"""
+    command_dir = os.environ.get(COMMAND_DIR_ENV, "")
+    if command_dir and cmd:
+        stand_in = os.path.join(command_dir, cmd[0])
+        if os.path.isfile(stand_in):
+            return [stand_in, *cmd[1:]]
+    return cmd
+
 
 def run_command(
     cmd: list[str],
     shell: bool = False,
-    encoding: str = "gbk"
+    encoding: str = "gbk",
+    timeout: float | None = None
 ) -> subprocess.CompletedProcess:
-    """执行系统命令"""
+    """执行系统命令（超时抛出 subprocess.TimeoutExpired）"""
     return subprocess.run(
-        cmd,
+        resolve_command(cmd),
         capture_output=True,
         text=True,
         encoding=encoding,
         shell=shell,
-        creationflags=subprocess.CREATE_NO_WINDOW
+        timeout=timeout,
+        creationflags=CREATE_NO_WINDOW
     )
 
 
+def _get_command_semaphore() -> asyncio.Semaphore:
+    """获取当前事件循环的并发信号量"""
+    loop = asyncio.get_running_loop()
+    semaphore = _command_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_COMMANDS)
+        _command_semaphores[loop] = semaphore
+    return semaphore
+
+
+async def _read_lines(
+    stream: asyncio.StreamReader,
+    encoding: str,
+    on_line: Callable[[str], None] | None
+) -> str:
+    """逐行读取输出，每读到一行回调一次"""
+    lines = []
+    while True:
+        raw = await stream.readline()
+        if not raw:
+            break
+        line = raw.decode(encoding, errors="replace").replace("\r\n", "\n")
+        lines.append(line)
+        if on_line:
+            on_line(line.rstrip("\r\n"))
+    return "".join(lines)
+
+
+async def _read_all(stream: asyncio.StreamReader, encoding: str) -> str:
+    """读取全部输出"""
+    data = await stream.read()
+    return data.decode(encoding, errors="replace").replace("\r\n", "\n")
+
+
+async def run_command_async(
+    cmd: list[str],
+    encoding: str = "gbk",
+    timeout: float | None = None,
+    on_line: Callable[[str], None] | None = None
+) -> subprocess.CompletedProcess:
+    """异步执行系统命令
+
+    stdout 逐行回调 on_line（不含换行符）；超时抛出 subprocess.TimeoutExpired，
+    超时或任务被取消时终止子进程。同时运行的命令数受 MAX_CONCURRENT_COMMANDS 限制。
+    """
+    async with _get_command_semaphore():
+        process = await asyncio.create_subprocess_exec(
+            *resolve_command(cmd),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            creationflags=CREATE_NO_WINDOW
+        )
+        stdout_stream, stderr_stream = process.stdout, process.stderr
+        assert stdout_stream is not None and stderr_stream is not None
+
+        async def communicate() -> tuple[str, str]:
+            stdout, stderr = await asyncio.gather(
+                _read_lines(stdout_stream, encoding, on_line),
+                _read_all(stderr_stream, encoding)
+            )
+            await process.wait()
+            return stdout, stderr
+
+        try:
+            stdout, stderr = await asyncio.wait_for(communicate(), timeout)
+        except asyncio.TimeoutError:
+            await _kill_process(process)
+            raise subprocess.TimeoutExpired(cmd, timeout or 0) from None
+        except BaseException:
+            # 任务被取消等情况：不留下孤儿进程
+            await _kill_process(process)
+            raise
+
+        return subprocess.CompletedProcess(cmd, process.returncode or 0, stdout, stderr)
+
+
+async def _kill_process(process: asyncio.subprocess.Process) -> None:
+    """终止子进程并回收"""
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+    # 孙进程可能仍持有输出管道，wait() 会等到管道关闭，因此只短暂等待
+    try:
+        await asyncio.wait_for(asyncio.shield(process.wait()), 1)
+    except asyncio.TimeoutError:
+        pass
+
+
 def open_system_tool(cmd: list[str], name: str, shell: bool = False) -> None:
     """打开系统工具"""
     try:
         subprocess.Popen(
             cmd,
             shell=shell,
-            creationflags=subprocess.CREATE_NO_WINDOW
+            creationflags=CREATE_NO_WINDOW
         )
     except Exception as e:
         messagebox.showerror("错误", f"打开{name}失败: {e}")